@@ -0,0 +1,311 @@
+"""
+Offline bulk evaluation of question records.
+
+Streams a JSONL file of QuestionModel records (optionally with an "id")
+through the service layer and appends one result line per record to the
+output JSONL. The output file is the checkpoint: rows that already have a
+result are skipped on the next run, so a crashed run resumes without
+re-billing finished rows. Rows that failed are retried.
+
+Usage:
+    python -m app.bulk run questions.jsonl results.jsonl --concurrency 8 --rate 5
+    python -m app.bulk submit questions.jsonl results.jsonl   # provider batch API
+    python -m app.bulk collect results.jsonl                  # once the batch has finished
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from pydantic import ValidationError
+from .config import OPENAI_API_KEY, OPENAI_MODEL
+from .metrics import labelled
+from .models.index import QuestionModel
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def read_records(path: str):
+    """
+    Yields (row_id, record) for every non-blank line; the id defaults to the
+    line number. A line that is not a JSON object yields (line number, None).
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            if not isinstance(record, dict):
+                yield str(line_number), None
+                continue
+            yield str(record.pop("id", line_number)), record
+
+
+def load_checkpoint(path: str) -> set:
+    """
+    Ids that already have a result in the output file.
+    A line cut off by a crash is truncated away so appends stay valid JSONL.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            f.truncate(end)
+
+    for line in data[:end].splitlines():
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if "result" in row:
+            done.add(str(row["id"]))
+    return done
+
+
+class _Writer:
+    """Appends result lines and flushes each one, so finished rows survive a crash."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+        self.written = 0
+        self.failed = 0
+
+    def write(self, row_id: str, result=None, error: str = None):
+        row = {"id": row_id, "result": result} if error is None else {"id": row_id, "error": error}
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if error is None:
+            self.written += 1
+        else:
+            self.failed += 1
+
+    def close(self):
+        self._file.close()
+
+
+async def run(input_path: str, output_path: str, concurrency: int = 8, rate: float = 0.0,
+              burst: float = None) -> dict:
+    """
+    Evaluates every pending record with `concurrency` workers. With `rate` > 0,
+    upstream calls are limited to that many per second by a token bucket.
+    """
+    from .service.index import aget_question_evaluation, evaluation_store
+    from .tokens import load_encoding
+
+    await asyncio.to_thread(load_encoding)
+    done = load_checkpoint(output_path)
+    bucket = TokenBucket(rate, burst) if rate > 0 else None
+    writer = _Writer(output_path)
+    queue = asyncio.Queue(maxsize=concurrency * 2)  # bounded, so the input is streamed
+    skipped = 0
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            row_id, record = item
+            try:
+                question = QuestionModel(**record)
+                if bucket is not None:
+                    await bucket.acquire()
+                with labelled("bulk"):
+                    writer.write(row_id, await aget_question_evaluation(question))
+            except ValidationError as e:
+                writer.write(row_id, error=f"invalid record: {e.errors()}")
+            except Exception as e:
+                writer.write(row_id, error=f"{type(e).__name__}: {e}")
+
+    start = time.perf_counter()
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        for row_id, record in read_records(input_path):
+            if row_id in done:
+                skipped += 1
+                continue
+            if record is None:
+                writer.write(row_id, error="invalid record")
+                continue
+            await queue.put((row_id, record))
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+        writer.close()
+        evaluation_store.close()
+
+    return {
+        "evaluated": writer.written,
+        "failed": writer.failed,
+        "skipped": skipped,
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+
+# 🔹 Provider batch API (OpenAI): half the price, results within 24h
+
+def _batch_state_path(output_path: str) -> str:
+    return output_path + ".batch.json"
+
+
+def _batch_request(row_id: str, question: QuestionModel) -> dict:
+    from langchain_core.messages import convert_to_openai_messages
+    from .service.index import _build_question_prompt
+
+    return {
+        "custom_id": row_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": OPENAI_MODEL,
+            "temperature": 0,
+            "messages": convert_to_openai_messages(_build_question_prompt(question))
+        }
+    }
+
+
+def submit(input_path: str, output_path: str) -> dict:
+    """Uploads every pending record as one batch job and records its id next to the output."""
+    from openai import OpenAI
+
+    state_path = _batch_state_path(output_path)
+    if os.path.exists(state_path):
+        raise RuntimeError(f"A batch is already pending ({state_path}); collect it first")
+
+    done = load_checkpoint(output_path)
+    writer = _Writer(output_path)
+    lines = []
+    try:
+        for row_id, record in read_records(input_path):
+            if row_id in done:
+                continue
+            if record is None:
+                writer.write(row_id, error="invalid record")
+                continue
+            try:
+                question = QuestionModel(**record)
+            except ValidationError as e:
+                writer.write(row_id, error=f"invalid record: {e.errors()}")
+                continue
+            lines.append(json.dumps(_batch_request(row_id, question), ensure_ascii=False))
+    finally:
+        writer.close()
+
+    if not lines:
+        return {"submitted": 0}
+
+    client = OpenAI(api_key=OPENAI_API_KEY)
+    upload = client.files.create(
+        file=("batch.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=upload.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump({"batch_id": batch.id, "input_file_id": upload.id, "rows": len(lines)}, f)
+    return {"submitted": len(lines), "batch_id": batch.id}
+
+
+def collect(output_path: str) -> dict:
+    """Appends the results of a finished batch job; returns its status while it is still running."""
+    from openai import OpenAI
+    from .parser import parse_json_object
+    from .service.index import _build_question_result
+
+    state_path = _batch_state_path(output_path)
+    with open(state_path, encoding="utf-8") as f:
+        state = json.load(f)
+
+    client = OpenAI(api_key=OPENAI_API_KEY)
+    batch = client.batches.retrieve(state["batch_id"])
+    if batch.status not in ("completed", "failed", "expired", "cancelled"):
+        return {"status": batch.status, "batch_id": batch.id}
+
+    load_checkpoint(output_path)  # drops a half-written last line
+    writer = _Writer(output_path)
+    try:
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in client.files.content(file_id).text.splitlines():
+                row = json.loads(line)
+                response = row.get("response") or {}
+                if row.get("error") or response.get("status_code") != 200:
+                    writer.write(row["custom_id"], error=json.dumps(row.get("error") or response.get("body")))
+                    continue
+                content = response["body"]["choices"][0]["message"]["content"]
+                parsed, _ = parse_json_object(content)
+                writer.write(row["custom_id"], _build_question_result(parsed))
+    finally:
+        writer.close()
+
+    os.remove(state_path)
+    return {"status": batch.status, "evaluated": writer.written, "failed": writer.failed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.bulk", description="Bulk question evaluation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="evaluate through the service layer")
+    run_parser.add_argument("input")
+    run_parser.add_argument("output")
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--rate", type=float, default=0.0, help="max upstream calls per second (0 = off)")
+    run_parser.add_argument("--burst", type=float, default=None, help="token bucket size (default: rate)")
+
+    submit_parser = commands.add_parser("submit", help="submit pending rows to the provider batch API")
+    submit_parser.add_argument("input")
+    submit_parser.add_argument("output")
+
+    collect_parser = commands.add_parser("collect", help="append the results of a finished batch")
+    collect_parser.add_argument("output")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        summary = asyncio.run(run(args.input, args.output, args.concurrency, args.rate, args.burst))
+    elif args.command == "submit":
+        summary = submit(args.input, args.output)
+    else:
+        summary = collect(args.output)
+    json.dump(summary, sys.stdout)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import threading
+import httpx
+from .config import (
+    LLM_POOL_MAX_CONNECTIONS, LLM_POOL_MAX_KEEPALIVE, LLM_POOL_KEEPALIVE_SECONDS, LLM_HTTP2,
+    LLM_WARMUP_CONNECTIONS, LLM_DRAIN_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body that reports back once it is closed, so the request counts as finished."""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            on_close, self._on_close = self._on_close, None
+            if on_close is not None:
+                on_close()
+
+
+class _TrackedTransport(httpx.AsyncBaseTransport):
+    """
+    Counts new TCP connections, TLS handshakes and in-flight requests of one
+    pooled transport. The pool is built on first use and again after
+    aclose(), so a client that models hold on to outlives a lifespan.
+    """
+
+    def __init__(self, factory, registry: "ClientRegistry"):
+        self._factory = factory
+        self._transport = None
+        self._registry = registry
+
+    async def _trace(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.complete":
+            self._registry.connections += 1
+        elif event_name == "connection.start_tls.complete":
+            self._registry.tls_handshakes += 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._transport is None:
+            self._transport = self._factory()
+        request.extensions = {**request.extensions, "trace": self._trace}
+        self._registry._started()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._registry._finished()
+            raise
+        response.stream = _TrackedStream(response.stream, self._registry._finished)
+        return response
+
+    async def aclose(self):
+        transport, self._transport = self._transport, None
+        if transport is not None:
+            await transport.aclose()
+
+
+class _ReopeningTransport(httpx.BaseTransport):
+    """Sync counterpart: the pool is built on first use and again after close()."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._transport = None
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            if self._transport is None:
+                self._transport = self._factory()
+            transport = self._transport
+        return transport.handle_request(request)
+
+    def close(self):
+        with self._lock:
+            transport, self._transport = self._transport, None
+        if transport is not None:
+            transport.close()
+
+
+class ClientRegistry:
+    """
+    Owns the pooled HTTP clients of the LLM providers, one async and one sync
+    client per provider, shared by every model built for it.
+
+    Pool size, keep-alive and HTTP/2 are configurable (LLM_POOL_*, LLM_HTTP2).
+    warm_up() opens `warmup_connections` connections per provider, so the
+    first requests skip the TCP and TLS handshakes. aclose() waits up to
+    `drain_seconds` for in-flight calls before closing the pools. Both are
+    run by the FastAPI lifespan. Clients stay valid after aclose(): models
+    keep their references, and the next request opens a new pool.
+    """
+
+    def __init__(self, max_connections: int = LLM_POOL_MAX_CONNECTIONS, max_keepalive: int = LLM_POOL_MAX_KEEPALIVE,
+                 keepalive_seconds: float = LLM_POOL_KEEPALIVE_SECONDS, http2: bool = LLM_HTTP2,
+                 warmup_connections: int = LLM_WARMUP_CONNECTIONS, drain_seconds: float = LLM_DRAIN_SECONDS,
+                 verify=True):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_seconds
+        )
+        self.http2 = http2
+        self.verify = verify  # CA bundle path or SSLContext, for private gateways
+        self.warmup_connections = warmup_connections
+        self.drain_seconds = drain_seconds
+        self._async_clients = {}  # provider -> httpx.AsyncClient
+        self._sync_clients = {}  # provider -> httpx.Client
+        self._transports = []  # the pools behind those clients, closed by aclose()
+        self._base_urls = {}  # provider -> URL opened by warm_up()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.in_flight = 0
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+        self.warmed = 0
+
+    def _started(self):
+        self.in_flight += 1
+        self.requests += 1
+        self._idle.clear()
+
+    def _finished(self):
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    def async_client(self, provider: str, base_url: str = None) -> httpx.AsyncClient:
+        client = self._async_clients.get(provider)
+        if client is None:
+            transport = _TrackedTransport(
+                lambda: httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2, verify=self.verify), self
+            )
+            client = self._async_clients[provider] = httpx.AsyncClient(transport=transport)
+            self._transports.append(transport)
+        if base_url:
+            self._base_urls[provider] = base_url
+        return client
+
+    def sync_client(self, provider: str) -> httpx.Client:
+        client = self._sync_clients.get(provider)
+        if client is None:
+            transport = _ReopeningTransport(
+                lambda: httpx.HTTPTransport(limits=self.limits, http2=self.http2, verify=self.verify)
+            )
+            client = self._sync_clients[provider] = httpx.Client(transport=transport)
+            self._transports.append(transport)
+        return client
+
+    async def warm_up(self):
+        """Opens `warmup_connections` connections to every provider; one that cannot be reached is only logged."""
+        async def warm(provider: str, url: str):
+            client = self.async_client(provider)
+            # Concurrent requests each need their own connection; any response will do
+            results = await asyncio.gather(
+                *(client.head(url, timeout=10) for _ in range(self.warmup_connections)), return_exceptions=True
+            )
+            failed = [r for r in results if isinstance(r, BaseException)]
+            self.warmed += len(results) - len(failed)
+            if failed:
+                logger.warning("Warm-up of %s connections failed: %s", provider, failed[0])
+
+        if self.warmup_connections > 0:
+            await asyncio.gather(*(warm(p, url) for p, url in self._base_urls.items()))
+
+    async def aclose(self):
+        """
+        Drains in-flight calls (up to drain_seconds), then closes every pool.
+        Only the transports are closed, not the clients: an httpx client
+        cannot be reopened, and models built on it may serve another lifespan.
+        """
+        if self.in_flight:
+            try:
+                await asyncio.wait_for(self._idle.wait(), self.drain_seconds)
+            except TimeoutError:
+                logger.warning("Closing LLM clients with %d calls still in flight", self.in_flight)
+        for transport in self._transports:
+            if isinstance(transport, _TrackedTransport):
+                await transport.aclose()
+            else:
+                transport.close()
+
+    def stats(self) -> dict:
+        return {
+            "providers": len(self._async_clients),
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "connections": self.connections,
+            "tls_handshakes": self.tls_handshakes,
+            "warmed": self.warmed,
+            "http2": self.http2
+        }
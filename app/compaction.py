@@ -0,0 +1,120 @@
+import json
+import logging
+import re
+from html.parser import HTMLParser
+from .config import QUESTION_TOKEN_BUDGET
+from .tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+URL_FIELDS = ("image_url", "audio_url", "response_file_url")
+TRUNCATION_MARK = " …[truncated]"
+
+
+class _TextExtractor(HTMLParser):
+    BLOCK_TAGS = {"p", "br", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    if "<" not in html and "&" not in html:
+        return html.strip()
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    text = "".join(extractor.parts)
+    text = re.sub(r"[ \t]+", " ", text)
+    return re.sub(r"\s*\n\s*", "\n", text).strip()
+
+
+def _truncate(text: str, excess_tokens: int) -> str:
+    keep = max(0, len(text) - excess_tokens * 4 - len(TRUNCATION_MARK))
+    return text[:keep].rstrip() + TRUNCATION_MARK
+
+
+class QuestionCompactor:
+    """
+    Shrinks a question payload before it is sent upstream:
+    - prompt_html is reduced to plain text
+    - null / empty fields (e.g. `options: []`) are dropped
+    - a URL repeated across fields is kept once
+    - the response text and file URL are left out of the question JSON,
+      since the prompt already carries them in the user response section
+    The result is serialized without indentation. If it still exceeds the
+    token budget, the longest text field is truncated with a warning.
+    """
+
+    def __init__(self, budget: int = QUESTION_TOKEN_BUDGET):
+        self.budget = budget
+        self.requests = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.truncations = 0
+
+    def compact(self, payload: dict) -> tuple:
+        """Returns (question_json, response_text) and records the tokens saved."""
+        response_text = payload.get("response_text") or ""
+        response_tokens = count_tokens(response_text)
+        before = count_tokens(json.dumps(payload, ensure_ascii=False, indent=2)) + response_tokens
+
+        compacted = {}
+        seen_urls = {}
+        for key, value in payload.items():
+            if value is None or value == "" or value == [] or key in ("response_text", "response_file_url"):
+                continue
+            if key == "prompt_html":
+                compacted["prompt"] = html_to_text(value)
+                continue
+            if key in URL_FIELDS:
+                if value in seen_urls:
+                    continue
+                seen_urls[value] = key
+            compacted[key] = value
+
+        question_json = json.dumps(compacted, ensure_ascii=False, separators=(",", ":"))
+        question_tokens = count_tokens(question_json)
+        after = question_tokens + response_tokens
+
+        if after > self.budget:
+            self.truncations += 1
+            field = "response_text" if len(response_text) >= len(compacted.get("prompt", "")) else "prompt"
+            logger.warning(
+                "Question payload is %d tokens, over the %d token budget; truncating %s",
+                after, self.budget, field
+            )
+            # Only the truncated part is counted again
+            if field == "response_text":
+                response_text = _truncate(response_text, after - self.budget)
+                response_tokens = count_tokens(response_text)
+            else:
+                compacted["prompt"] = _truncate(compacted["prompt"], after - self.budget)
+                question_json = json.dumps(compacted, ensure_ascii=False, separators=(",", ":"))
+                question_tokens = count_tokens(question_json)
+            after = question_tokens + response_tokens
+
+        self.requests += 1
+        self.tokens_before += before
+        self.tokens_after += after
+        return question_json, response_text
+
+    def stats(self) -> dict:
+        saved = self.tokens_before - self.tokens_after
+        return {
+            "requests": self.requests,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "tokens_saved": saved,
+            "tokens_saved_per_request": saved / self.requests if self.requests else 0.0,
+            "truncations": self.truncations,
+            "budget": self.budget
+        }
@@ -0,0 +1,110 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 🔹 Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")  # DEBUG also logs the compacted question payloads
+
+# 🔹 LLM provider
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+# 🔹 LLM HTTP connection pools (one per provider, owned by the app lifespan)
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "256"))  # per provider
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "256"))  # idle connections kept open
+LLM_POOL_KEEPALIVE_SECONDS = float(os.getenv("LLM_POOL_KEEPALIVE_SECONDS", "60"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "false").lower() == "true"  # needs `pip install httpx[http2]`
+LLM_WARMUP_CONNECTIONS = int(os.getenv("LLM_WARMUP_CONNECTIONS", "4"))  # opened per provider at startup
+LLM_DRAIN_SECONDS = float(os.getenv("LLM_DRAIN_SECONDS", "10"))  # wait for in-flight calls on shutdown
+
+# 🔹 Async service layer
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "256"))  # in-flight calls per worker
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))  # per upstream call
+
+# 🔹 Priority scheduler (admission control in front of the LLM)
+SCHEDULER_MAX_QUEUE = int(os.getenv("SCHEDULER_MAX_QUEUE", "1024"))  # calls waiting for a slot
+SCHEDULER_DEADLINE_INTERACTIVE = float(os.getenv("SCHEDULER_DEADLINE_INTERACTIVE", "5"))  # max queue wait, seconds
+SCHEDULER_DEADLINE_BATCH = float(os.getenv("SCHEDULER_DEADLINE_BATCH", "30"))
+SCHEDULER_DEADLINE_BULK = float(os.getenv("SCHEDULER_DEADLINE_BULK", "120"))
+
+# 🔹 Batch question evaluation
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "15"))  # default fan-out per batch
+
+# 🔹 Evaluation result cache
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "86400"))
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # "memory" or "sqlite" (shared across workers)
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", ".cache/evaluations.sqlite3")
+
+# 🔹 Near-duplicate text answers (same question, same meaning, other wording)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"  # reuses grades; opt in
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))  # cosine similarity to reuse
+SEMANTIC_CACHE_MAX_QUESTIONS = int(os.getenv("SEMANTIC_CACHE_MAX_QUESTIONS", "1000"))  # answer indexes kept (LRU)
+SEMANTIC_CACHE_MAX_ANSWERS = int(os.getenv("SEMANTIC_CACHE_MAX_ANSWERS", "128"))  # per question, oldest replaced
+
+# 🔹 Provider pool
+LLM_PROVIDERS = [p.strip() for p in os.getenv("LLM_PROVIDERS", "openai").split(",") if p.strip()]
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+GOOGLE_MODEL = os.getenv("GOOGLE_MODEL", "gemini-2.0-flash")
+PROVIDER_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_ATTEMPT_TIMEOUT_SECONDS", "20"))  # then fail over
+PROVIDER_STATS_WINDOW = int(os.getenv("PROVIDER_STATS_WINDOW", "100"))  # recent calls used for routing
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))  # consecutive failures
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+# 🔹 Hedged question evaluation (opt-in)
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))  # hedge once the call outlives this
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.05"))  # extra calls per call, at most
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))  # observed calls before hedging starts
+
+# 🔹 Prompt payload compaction
+QUESTION_TOKEN_BUDGET = int(os.getenv("QUESTION_TOKEN_BUDGET", "2000"))  # per-request variable tokens
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "o200k_base")  # tiktoken encoding of the model
+TOKENIZER_CACHE_DIR = os.getenv("TIKTOKEN_CACHE_DIR", ".cache/tiktoken")  # downloaded once, then read from here
+
+# 🔹 Request limits
+MAX_BODY_SIZE = int(os.getenv("MAX_BODY_SIZE", str(1024 * 1024)))  # bytes
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")  # "redis://host:6379" to share across workers
+RATE_LIMIT_REQUESTS = os.getenv("RATE_LIMIT_REQUESTS", "100/minute")  # weighted request units per tenant
+RATE_LIMIT_TOKENS = os.getenv("RATE_LIMIT_TOKENS", "500000/hour")  # LLM tokens per tenant
+RATE_LIMIT_TENANTS = os.getenv("RATE_LIMIT_TENANTS", "")  # JSON (or path): {"<api key>": {"tenant", "requests", "tokens"}}
+
+# 🔹 Media ingestion for image / audio questions
+MEDIA_KINDS = [k.strip() for k in os.getenv("MEDIA_KINDS", "image").split(",") if k.strip()]  # sent inline
+MEDIA_MAX_BYTES = int(os.getenv("MEDIA_MAX_BYTES", str(5 * 1024 * 1024)))  # per file
+MEDIA_TIMEOUT_SECONDS = float(os.getenv("MEDIA_TIMEOUT_SECONDS", "10"))
+MEDIA_CACHE_BYTES = int(os.getenv("MEDIA_CACHE_BYTES", str(64 * 1024 * 1024)))
+MEDIA_MAX_CONNECTIONS = int(os.getenv("MEDIA_MAX_CONNECTIONS", "100"))
+# Hosts media may be fetched from: "cdn.example.com", "*.example.com" or "*"; empty fetches nothing
+MEDIA_ALLOWED_HOSTS = [h.strip() for h in os.getenv("MEDIA_ALLOWED_HOSTS", "").split(",") if h.strip()]
+MEDIA_MAX_REDIRECTS = int(os.getenv("MEDIA_MAX_REDIRECTS", "3"))  # each hop is checked like the first URL
+
+# 🔹 Reference-answer question bank
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH")  # JSON or JSONL of QuestionBankEntry, loaded at startup
+
+# 🔹 Evaluation store (every result, for analytics and re-grading)
+EVALUATION_STORE_PATH = os.getenv("EVALUATION_STORE_PATH", "")  # opt-in, e.g. ".cache/evaluation_store.sqlite3"
+EVALUATION_STORE_BATCH_SIZE = int(os.getenv("EVALUATION_STORE_BATCH_SIZE", "200"))  # rows per write transaction
+EVALUATION_STORE_FLUSH_SECONDS = float(os.getenv("EVALUATION_STORE_FLUSH_SECONDS", "1"))  # max wait to fill a batch
+EVALUATION_STORE_QUEUE_SIZE = int(os.getenv("EVALUATION_STORE_QUEUE_SIZE", "10000"))  # then rows are dropped
+EVALUATION_EXPORT_KEY = os.getenv("EVALUATION_EXPORT_KEY", "")  # X-Admin-Key for the export; "" disables it
+
+# 🔹 Assessment sessions
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))  # in-process sessions
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "86400"))  # since the last answer
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")  # "sqlite" persists and shares across workers
+SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", ".cache/sessions.sqlite3")
+
+# 🔹 Department recommendation
+DEPARTMENT_NARRATIVE_ENABLED = os.getenv("DEPARTMENT_NARRATIVE_ENABLED", "true").lower() == "true"  # LLM reasoning
+DEPARTMENT_BULK_MAX_ITEMS = int(os.getenv("DEPARTMENT_BULK_MAX_ITEMS", "5000"))  # profiles per bulk request
+HR_QUESTION_POOL_SIZE = int(os.getenv("HR_QUESTION_POOL_SIZE", "30"))  # questions generated per department
+HR_QUESTIONS_PER_REQUEST = int(os.getenv("HR_QUESTIONS_PER_REQUEST", "9"))  # sampled from the pool
+HR_QUESTION_POOL_PATH = os.getenv("HR_QUESTION_POOL_PATH", ".cache/hr_question_pool.json")
+HR_QUESTION_POOL_REFRESH_SECONDS = float(os.getenv("HR_QUESTION_POOL_REFRESH_SECONDS", "604800"))  # 0 = never
+HR_QUESTION_POOL_WARM = os.getenv("HR_QUESTION_POOL_WARM", "true").lower() == "true"  # generate at startup
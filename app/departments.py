@@ -0,0 +1,89 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np  # imported on first use, not when the app starts
+
+# Profile dimensions used for ranking, in matrix column order
+DIMENSIONS = ("visual", "auditory", "rhythmic", "subconscious")
+
+# 🔹 How strongly each department draws on each dimension (visual, auditory, rhythmic, subconscious)
+DEPARTMENT_AFFINITIES = {
+    "Software Engineering":          (0.8, 0.2, 0.7, 0.4),
+    "Data & Analytics":              (0.9, 0.2, 0.5, 0.3),
+    "Product Management":            (0.6, 0.6, 0.4, 0.7),
+    "UI/UX Design":                  (1.0, 0.3, 0.4, 0.6),
+    "Marketing & Branding":          (0.7, 0.7, 0.3, 0.8),
+    "Sales & Business Development":  (0.3, 0.9, 0.5, 0.7),
+    "Operations":                    (0.5, 0.4, 0.9, 0.3),
+    "HR & People Operations":        (0.3, 0.8, 0.4, 0.9),
+    "Finance":                       (0.6, 0.2, 0.8, 0.3),
+}
+
+
+class DepartmentScorer:
+    """
+    Ranks departments by cosine similarity between cognitive profiles and
+    the department affinity vectors. Any number of profiles is scored with
+    one matrix product; ties go to the department listed first.
+    """
+
+    def __init__(self, affinities: dict = DEPARTMENT_AFFINITIES):
+        self.departments = list(affinities)
+        self._affinities = [affinities[d] for d in self.departments]
+        self._matrix = None  # (departments, dimensions), built on first use
+        self.profiles_scored = 0
+
+    @staticmethod
+    def to_matrix(profiles: list) -> "np.ndarray":
+        """Profiles (dicts) as a (profiles, dimensions) float matrix."""
+        import numpy as np
+
+        return np.array([[p[d] for d in DIMENSIONS] for p in profiles], dtype=np.float64).reshape(-1, len(DIMENSIONS))
+
+    def warm_up(self) -> "np.ndarray":
+        """Imports NumPy and builds the unit affinity matrix; blocking, so the lifespan runs it in a thread."""
+        if self._matrix is None:
+            import numpy as np
+
+            matrix = np.array(self._affinities, dtype=np.float64)
+            self._matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+        return self._matrix
+
+    def scores(self, profiles: "np.ndarray") -> "np.ndarray":
+        """(profiles, departments) cosine similarities; an all-zero profile scores 0 everywhere."""
+        import numpy as np
+
+        norms = np.linalg.norm(profiles, axis=1, keepdims=True)
+        unit = np.divide(profiles, norms, out=np.zeros_like(profiles), where=norms > 0)
+        return unit @ self.warm_up().T
+
+    def rank(self, profiles: list) -> list:
+        """Primary and secondary department for every profile, in input order."""
+        import numpy as np
+
+        scores = self.scores(self.to_matrix(profiles))
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :2]
+        top = np.take_along_axis(scores, order, axis=1)
+        self.profiles_scored += len(profiles)
+
+        departments = self.departments
+        return [
+            {
+                "primary_department": departments[first],
+                "secondary_department": departments[second],
+                "match": (round(float(first_score), 4), round(float(second_score), 4))
+            }
+            for (first, second), (first_score, second_score) in zip(order.tolist(), top.tolist())
+        ]
+
+    def stats(self) -> dict:
+        return {"departments": len(self.departments), "profiles_scored": self.profiles_scored}
+
+
+def describe_match(pick: dict) -> str:
+    """Deterministic reasoning for a ranked pick, used when no narrative is generated."""
+    primary, secondary = pick["match"]
+    return (
+        f"The profile is closest to {pick['primary_department']} (match {primary:.2f}), "
+        f"followed by {pick['secondary_department']} (match {secondary:.2f})."
+    )
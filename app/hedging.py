@@ -0,0 +1,106 @@
+import asyncio
+import time
+from collections import deque
+from .config import HEDGE_PERCENTILE, HEDGE_MAX_RATIO, HEDGE_MIN_SAMPLES, PROVIDER_STATS_WINDOW
+from .providers import percentile
+
+
+class Hedger:
+    """
+    Hedged calls: when the primary call outlives the `pct` percentile of
+    recently observed upstream latency, a duplicate is started. The first
+    success wins and the other call is cancelled.
+
+    Hedges are capped at `max_ratio` of all calls, so a slow upstream
+    cannot double the load on itself. With `acquire` a hedge also needs a
+    slot of its own and is skipped when none is free.
+    """
+
+    def __init__(self, pct: float = HEDGE_PERCENTILE, max_ratio: float = HEDGE_MAX_RATIO,
+                 min_samples: int = HEDGE_MIN_SAMPLES, window: int = PROVIDER_STATS_WINDOW):
+        self.pct = pct
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.upstream_latencies = deque(maxlen=window)  # each upstream call that completed
+        self.latencies = deque(maxlen=window)  # what callers observed
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self.slot_denied = 0
+
+    def hedge_delay(self):
+        """None until enough latency has been observed."""
+        if len(self.upstream_latencies) < self.min_samples:
+            return None
+        return percentile(self.upstream_latencies, self.pct)
+
+    def _start(self, call, release=None):
+        started = time.perf_counter()
+        task = asyncio.ensure_future(call())
+
+        def observe(t):
+            if release is not None:
+                release()
+            if not t.cancelled() and t.exception() is None:
+                self.upstream_latencies.append(time.perf_counter() - started)
+
+        task.add_done_callback(observe)
+        return task
+
+    async def run(self, call, acquire=None):
+        """
+        `call` is a zero-argument coroutine function; it may be called twice.
+        `acquire` takes a slot for the hedge without waiting: it returns a
+        release function, or None when no slot is free.
+        """
+        self.calls += 1
+        start = time.perf_counter()
+        primary = self._start(call)
+        pending = {primary}
+
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    if self.hedges >= self.max_ratio * self.calls:
+                        self.budget_denied += 1
+                    elif acquire is None:
+                        self.hedges += 1
+                        pending.add(self._start(call))
+                    else:
+                        release = acquire()
+                        if release is None:
+                            self.slot_denied += 1
+                        else:
+                            self.hedges += 1
+                            pending.add(self._start(call, release))
+
+            first_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        self.latencies.append(time.perf_counter() - start)
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_rate": self.hedges / self.calls if self.calls else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+            "slot_denied": self.slot_denied,
+            "hedge_delay_seconds": self.hedge_delay(),
+            "upstream_p99_seconds": percentile(self.upstream_latencies, 99),
+            "p99_seconds": percentile(self.latencies, 99)
+        }
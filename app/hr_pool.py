@@ -0,0 +1,253 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _PoolEntry:
+    __slots__ = ("version", "generated_at", "reasoning", "questions")
+
+    def __init__(self, version: str, generated_at: float, reasoning: str, questions: list):
+        self.version = version
+        self.generated_at = generated_at
+        self.reasoning = reasoning
+        self.questions = tuple(questions)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "generated_at": self.generated_at,
+            "reasoning": self.reasoning,
+            "hr_questions": list(self.questions)
+        }
+
+
+class HRQuestionPool:
+    """
+    Pre-generated interview questions (and the department reasoning) for
+    each department, sampled per request instead of generated per request.
+
+    Pools are tagged with a version (prompt version + model); pools with an
+    older version are regenerated. Generated pools are written to `path`,
+    so a restart is warm without any model calls. Each write goes to its
+    own temporary file and replaces `path` atomically, merged with the pools
+    other workers wrote there; async callers write from a worker thread.
+
+    Requests never wait for the model: ensure() starts generating a cold
+    pool in the background and the caller serves its fallback meanwhile. A
+    department whose generation failed is retried after `retry_seconds`.
+
+    `generate(department)` is an async callable returning a dict with
+    "reasoning" and "hr_questions"; it is supplied by the service layer.
+    """
+
+    def __init__(self, departments: list, version: str, path: str = None,
+                 refresh_seconds: float = 0, min_questions: int = 1, retry_seconds: float = 30):
+        self.departments = list(departments)
+        self.version = version
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.min_questions = min_questions
+        self.retry_seconds = retry_seconds
+        self._pools = {}  # department -> _PoolEntry
+        self._tasks = []
+        self._refreshing = {}  # department -> asyncio.Task
+        self._failed_at = {}  # department -> time of its last failed generation
+        self._changes = 0  # pool installs so far; a write older than the last one written is skipped
+        self._written = 0
+        self._write_lock = threading.Lock()
+        self.served = 0
+        self.generated = 0
+        self.failures = 0
+        if path:
+            self.load_file(path)
+
+    def _read_file(self, path: str) -> dict:
+        """Saved pools of this version, by department; {} when there is no readable file."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("HR question pool file %s unreadable: %s", path, e)
+            return {}
+        return {
+            department: _PoolEntry(
+                entry["version"], entry.get("generated_at", 0), entry.get("reasoning", ""), entry["hr_questions"]
+            )
+            for department, entry in saved.items()
+            if entry.get("version") == self.version and entry.get("hr_questions")
+        }
+
+    def load_file(self, path: str) -> int:
+        """Loads pools saved by a previous run; pools of another version are skipped."""
+        self._pools.update(self._read_file(path))
+        return len(self._pools)
+
+    def _write(self, pools: dict, change: int):
+        """
+        Writes `pools` (a snapshot) merged with the file's newer entries, through a
+        temporary file of its own and an atomic rename. Blocking.
+        """
+        with self._write_lock:
+            if change <= self._written:
+                return  # a later snapshot is already on disk
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            merged = self._read_file(self.path)
+            for department, entry in pools.items():
+                if department not in merged or merged[department].generated_at < entry.generated_at:
+                    merged[department] = entry
+            data = {d: e.to_dict() for d, e in merged.items()}
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=directory, prefix=os.path.basename(self.path) + ".", suffix=".tmp",
+                delete=False
+            ) as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            try:
+                os.replace(f.name, self.path)
+            except OSError:
+                os.unlink(f.name)
+                raise
+            self._written = change
+
+    def _save(self):
+        if self.path:
+            self._write(dict(self._pools), self._changes)
+
+    async def _asave(self):
+        if self.path:
+            try:
+                await asyncio.to_thread(self._write, dict(self._pools), self._changes)
+            except OSError as e:
+                logger.warning("HR question pool not saved to %s: %s", self.path, e)
+
+    def is_warm(self, department: str) -> bool:
+        return department in self._pools
+
+    def _is_stale(self, department: str) -> bool:
+        entry = self._pools.get(department)
+        if entry is None:
+            return True
+        return bool(self.refresh_seconds) and time.time() - entry.generated_at >= self.refresh_seconds
+
+    def sample(self, department: str, count: int, seed: str = None) -> dict:
+        """
+        Reasoning and `count` questions from the department's pool.
+        The same seed always draws the same questions. Returns None while cold.
+        """
+        entry = self._pools.get(department)
+        if entry is None:
+            return None
+        self.served += 1
+        questions = random.Random(seed).sample(entry.questions, min(count, len(entry.questions)))
+        return {"reasoning": entry.reasoning, "hr_questions": questions}
+
+    def _install(self, department: str, generated: dict) -> bool:
+        """Installs a generated pool in memory; a pool with too few questions is rejected."""
+        questions = list(dict.fromkeys(q for q in generated.get("hr_questions") or [] if isinstance(q, str)))
+        if len(questions) < self.min_questions:
+            self.failures += 1
+            self._failed_at[department] = time.monotonic()
+            logger.warning("HR question pool for %s rejected: only %d questions", department, len(questions))
+            return False
+
+        self._pools[department] = _PoolEntry(self.version, time.time(), generated.get("reasoning", ""), questions)
+        self._failed_at.pop(department, None)
+        self._changes += 1
+        self.generated += 1
+        return True
+
+    def put(self, department: str, generated: dict) -> bool:
+        """Installs a generated pool and saves it; blocking, for sync callers."""
+        installed = self._install(department, generated)
+        if installed:
+            self._save()
+        return installed
+
+    def _start_refresh(self, department: str, generate) -> asyncio.Task:
+        """The running generation of `department`, or a new one."""
+        task = self._refreshing.get(department)
+        if task is None:
+            # An empty context: generation is background work, not part of (or billed to) the request that started it
+            task = contextvars.Context().run(asyncio.ensure_future, self._generate(department, generate))
+            self._refreshing[department] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(department, None))
+        return task
+
+    async def refresh(self, department: str, generate) -> bool:
+        """
+        Regenerates one pool; on failure the previous pool keeps being served.
+        Concurrent refreshes of the same department share one generation.
+        """
+        return await asyncio.shield(self._start_refresh(department, generate))
+
+    async def _generate(self, department: str, generate) -> bool:
+        try:
+            generated = await generate(department)
+        except Exception as e:
+            self.failures += 1
+            self._failed_at[department] = time.monotonic()
+            logger.warning("HR question pool for %s not refreshed: %s", department, e)
+            return False
+        if not self._install(department, generated):
+            return False
+        await self._asave()
+        return True
+
+    def ensure(self, department: str, generate) -> bool:
+        """
+        True when the department has a pool. Otherwise starts generating it in
+        the background (unless it failed less than `retry_seconds` ago) and
+        returns False at once; the caller serves its fallback meanwhile.
+        """
+        if self.is_warm(department):
+            return True
+        failed_at = self._failed_at.get(department)
+        if failed_at is None or time.monotonic() - failed_at >= self.retry_seconds:
+            self._start_refresh(department, generate)
+        return False
+
+    async def warm(self, generate):
+        """Generates every missing or stale pool concurrently."""
+        stale = [d for d in self.departments if self._is_stale(d)]
+        await asyncio.gather(*(self.refresh(d, generate) for d in stale))
+
+    async def _refresh_loop(self, generate):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            await self.warm(generate)
+
+    def start(self, generate, warm: bool = True):
+        """Starts warm-up and periodic refresh in the background."""
+        if warm:
+            self._tasks.append(asyncio.create_task(self.warm(generate)))
+        if self.refresh_seconds:
+            self._tasks.append(asyncio.create_task(self._refresh_loop(generate)))
+
+    async def stop(self):
+        tasks = self._tasks + list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "version": self.version,
+            "warm_departments": len(self._pools),
+            "departments": len(self.departments),
+            "served": self.served,
+            "generated": self.generated,
+            "failures": self.failures,
+            "oldest_pool_age_seconds": max((now - e.generated_at for e in self._pools.values()), default=None)
+        }
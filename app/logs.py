@@ -0,0 +1,41 @@
+import logging
+import logging.handlers
+import queue
+import sys
+
+_listener = None
+_handler = None
+
+
+def configure_logging(level: str = "INFO"):
+    """
+    Routes the app's log records through a queue. Request handlers only
+    enqueue; a background thread formats them and writes to stderr.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    records = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(level.upper())
+    _handler = logging.handlers.QueueHandler(records)
+    app_logger.addHandler(_handler)
+    app_logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Flushes queued records and detaches the queue; called on shutdown."""
+    global _listener, _handler
+    if _listener is not None:
+        app_logger = logging.getLogger("app")
+        app_logger.removeHandler(_handler)
+        app_logger.propagate = True
+        _listener.stop()
+        _listener = _handler = None
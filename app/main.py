@@ -1,38 +1,133 @@
-from fastapi import FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+from .config import (
+    MAX_BODY_SIZE, LOG_LEVEL, RATE_LIMIT_ENABLED, RATE_LIMIT_STORAGE_URI, RATE_LIMIT_REQUESTS, RATE_LIMIT_TOKENS,
+    RATE_LIMIT_TENANTS
+)
+from .logs import configure_logging, stop_logging
+from .metrics import MetricsMiddleware, registry
+from .middleware import BodySizeLimitMiddleware
+from .ratelimit import RateLimiter, RateLimitMiddleware, load_tenants
 from .router.index import router
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
-
-app = FastAPI(
-    title="Mtn Music GPT API",
-    description="A structured FastAPI service to get JSON output from GPT",
-    version="1.0.0"
+from .service.index import (
+    media_fetcher, hr_question_pool, start_hr_question_pool, evaluation_cache, semantic_cache, inflight, hedger,
+    question_compactor, question_bank, department_scorer, scheduler,
+    session_store, evaluation_store, client_registry, load_models
 )
+from .startup import Readiness
+from .tokens import load_encoding
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Non-blocking logging for the app's loggers, undone by stop_logging() below
+    configure_logging(LOG_LEVEL)
+    # Import the rate limiter and provider SDKs, load the tokenizer and open LLM connections in
+    # the background; /ready flips when done
+    app.state.readiness.start([
+        ("rate_limiter", lambda: asyncio.to_thread(app.state.rate_limiter.warm_up)),
+        ("models", lambda: asyncio.to_thread(load_models)),
+        ("tokenizer", lambda: asyncio.to_thread(load_encoding)),
+        ("llm_connections", client_registry.warm_up)
+    ])
+    # Warm the HR question pools in the background; requests do not wait for it
+    start_hr_question_pool()
+    yield
+    await app.state.readiness.stop()
+    await hr_question_pool.stop()
+    # Let in-flight LLM calls finish, then close their pools
+    await client_registry.aclose()
+    # Close pooled connections on shutdown
+    await media_fetcher.aclose()
+    # Write out queued evaluation results
+    evaluation_store.close()
+    stop_logging()
+
+
+def create_app() -> FastAPI:
+    """
+    Builds the ASGI app. Serve it with `uvicorn app.main:create_app --factory`;
+    `app.main:app` builds the same app on first access.
+    """
+    app = FastAPI(
+        title="Mtn Music GPT API",
+        description="A structured FastAPI service to get JSON output from GPT",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+    readiness = app.state.readiness = Readiness()
+
+    # Mount router
+    app.include_router(router, prefix="/api/py", tags=["Chat"])
+
+    # Per-tenant request and token quotas, shared by every worker using the same store
+    rate_limiter = app.state.rate_limiter = RateLimiter(
+        RATE_LIMIT_STORAGE_URI, RATE_LIMIT_REQUESTS, RATE_LIMIT_TOKENS, load_tenants(RATE_LIMIT_TENANTS)
+    )
+
+    # Reject oversized request bodies without buffering them
+    app.add_middleware(BodySizeLimitMiddleware, max_body_size=MAX_BODY_SIZE)
+
+    # Over-quota requests get a 429 before the body is read or any tokens are spent
+    if RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
+    # Outermost, so rejected requests are counted too
+    app.add_middleware(MetricsMiddleware)
+
+    # Subsystem counters, exported as gauges on /metrics
+    for subsystem, stats in {
+        "cache": evaluation_cache.stats,
+        "semantic_cache": semantic_cache.stats,
+        "singleflight": inflight.stats,
+        "hedging": hedger.stats,
+        "compaction": question_compactor.stats,
+        "media": media_fetcher.stats,
+        "question_bank": question_bank.stats,
+        "departments": department_scorer.stats,
+        "hr_questions": hr_question_pool.stats,
+        "rate_limit": rate_limiter.stats,
+        "scheduler": scheduler.stats,
+        "sessions": session_store.stats,
+        "evaluations": evaluation_store.stats,
+        "llm_clients": client_registry.stats,
+        "startup": readiness.stats
+    }.items():
+        registry.register_stats(subsystem, stats)
+
+    @app.get("/")
+    def root():
+        return {"message": "OK"}
+
+    @app.get("/ready")
+    def ready():
+        """Readiness probe: 503 until the provider SDKs are loaded and LLM connections warmed."""
+        stats = readiness.stats()
+        return JSONResponse(stats, status_code=200 if stats["ready"] else 503)
 
-# Mount router
-app.include_router(router, prefix="/api/py", tags=["Chat"])
+    @app.get("/api/py/llm-clients/stats", tags=["Chat"])
+    def llm_client_stats():
+        """Requests, in-flight calls, new connections and TLS handshakes of the pooled LLM clients."""
+        return client_registry.stats()
 
-# Create the limiter — using client IP address as the key
-limiter = Limiter(key_func=get_remote_address, default_limits=["100/minute"])
+    @app.get("/api/py/rate-limit/stats", tags=["Chat"])
+    def rate_limit_stats():
+        """Requests admitted and refused by the quota check, and tokens charged."""
+        return rate_limiter.stats()
 
-# Register global exception handler
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics():
+        """Prometheus text exposition of request, stage, token and subsystem metrics."""
+        return registry.render()
 
-# Attach limiter to app
-app.state.limiter = limiter
+    return app
 
-# Middleware to limit payload size
-MAX_BODY_SIZE = 1024 * 1024  # 1 MB
-@app.middleware("http")
-async def limit_payload_size(request: Request, call_next):
-    body = await request.body()
-    if len(body) > MAX_BODY_SIZE:
-        raise HTTPException(status_code=413, detail="Payload too large (limit 1 MB)")
-    # Recreate the request stream (since .body() consumes it)
-    request._receive = lambda: {"type": "http.request", "body": body, "more_body": False}
-    return await call_next(request)
 
-@app.get("/")
-def root():
-    return {"message": "OK"}
+def __getattr__(name: str):
+    # `uvicorn app.main:app` and `from app.main import app` keep working; the app is built once
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
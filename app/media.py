@@ -0,0 +1,249 @@
+import asyncio
+import base64
+import ipaddress
+import logging
+import mimetypes
+import socket
+import threading
+from collections import OrderedDict
+import httpx
+from .config import (
+    MEDIA_KINDS, MEDIA_MAX_BYTES, MEDIA_TIMEOUT_SECONDS, MEDIA_CACHE_BYTES, MEDIA_MAX_CONNECTIONS,
+    MEDIA_ALLOWED_HOSTS, MEDIA_MAX_REDIRECTS
+)
+
+logger = logging.getLogger(__name__)
+
+_REDIRECTS = {301, 302, 303, 307, 308}
+
+# Provider-facing names for common audio types
+_AUDIO_MIME_ALIASES = {"audio/mpeg": "audio/mp3", "audio/x-wav": "audio/wav", "audio/wave": "audio/wav"}
+
+
+class MediaTooLarge(ValueError):
+    pass
+
+
+class MediaBlocked(ValueError):
+    """The URL is not an allowed http(s) location on a public address."""
+
+
+def host_allowed(host: str, allowed_hosts) -> bool:
+    """Exact host names, "*.example.com" for any subdomain, "*" for any host."""
+    host = host.lower().rstrip(".")
+    for pattern in allowed_hosts:
+        if pattern == "*" or host == pattern or (pattern.startswith("*.") and host.endswith(pattern[1:])):
+            return True
+    return False
+
+
+def is_public_address(address: str) -> bool:
+    """False for private, loopback, link-local, reserved, multicast and unspecified addresses."""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+class MediaItem:
+    __slots__ = ("url", "mime_type", "data", "etag", "last_modified")
+
+    def __init__(self, url: str, mime_type: str, data: bytes, etag: str = None, last_modified: str = None):
+        self.url = url
+        self.mime_type = mime_type
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def kind(self) -> str:
+        return self.mime_type.split("/", 1)[0]
+
+    def content_part(self) -> dict:
+        """LangChain standard content block; providers convert it to their own format."""
+        mime_type = _AUDIO_MIME_ALIASES.get(self.mime_type, self.mime_type)
+        return {
+            "type": self.kind,
+            "base64": base64.b64encode(self.data).decode("ascii"),
+            "mime_type": mime_type
+        }
+
+
+class MediaFetcher:
+    """
+    Downloads question media through one connection-pooled HTTP client.
+
+    Each download is capped at `max_bytes` and is aborted as soon as it
+    passes the cap. Downloads are cached by URL, up to `cache_bytes` in
+    total. A cached URL is revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged file costs a 304 rather than a
+    re-download.
+
+    URLs come from request bodies, so only http(s) URLs on `allowed_hosts`
+    are fetched. The host is resolved first and refused if any address is
+    not public (unless `allow_private`); the connection then goes to the
+    vetted address, so a second DNS answer cannot redirect it. Redirects
+    are followed by hand and every hop is vetted the same way.
+    """
+
+    def __init__(self, max_bytes: int = MEDIA_MAX_BYTES, timeout: float = MEDIA_TIMEOUT_SECONDS,
+                 cache_bytes: int = MEDIA_CACHE_BYTES, max_connections: int = MEDIA_MAX_CONNECTIONS,
+                 allowed_hosts=MEDIA_ALLOWED_HOSTS, max_redirects: int = MEDIA_MAX_REDIRECTS,
+                 allow_private: bool = False):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.cache_bytes = cache_bytes
+        self.max_connections = max_connections
+        self.allowed_hosts = [h.lower() for h in allowed_hosts]
+        self.max_redirects = max_redirects
+        self.allow_private = allow_private
+        self._client = None
+        self._cache = OrderedDict()  # url -> MediaItem
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self.downloads = 0
+        self.revalidated = 0
+        self.failures = 0
+        self.blocked = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=False,  # each hop is vetted in _open
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def allows(self, url: str) -> bool:
+        """Whether `url` passes the scheme and host checks; fetching may still refuse its address."""
+        try:
+            url = httpx.URL(url)
+        except httpx.InvalidURL:
+            return False
+        return url.scheme in ("http", "https") and bool(url.host) and host_allowed(url.host, self.allowed_hosts)
+
+    async def _vet(self, url: httpx.URL) -> httpx.URL:
+        """`url` pinned to a vetted address of its host; raises MediaBlocked."""
+        if url.scheme not in ("http", "https"):
+            raise MediaBlocked(f"{url}: only http and https URLs are fetched")
+        if not url.host or not host_allowed(url.host, self.allowed_hosts):
+            raise MediaBlocked(f"{url}: host is not in MEDIA_ALLOWED_HOSTS")
+        port = url.port or (443 if url.scheme == "https" else 80)
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(url.host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise MediaBlocked(f"{url}: cannot resolve host ({e})")
+        addresses = [info[4][0] for info in infos]
+        if not self.allow_private and not all(is_public_address(a) for a in addresses):
+            raise MediaBlocked(f"{url}: host resolves to a non-public address")
+        return url.copy_with(host=addresses[0])
+
+    async def _open(self, url: str, headers: dict) -> httpx.Response:
+        """Streamed GET of `url`, following up to `max_redirects` redirects."""
+        target = httpx.URL(url)
+        for _ in range(self.max_redirects + 1):
+            try:
+                pinned = await self._vet(target)
+            except MediaBlocked:
+                self.blocked += 1
+                raise
+            request = self.client.build_request(
+                "GET", pinned, headers={**headers, "Host": target.netloc.decode("ascii")},
+                extensions={"sni_hostname": target.host}  # TLS still verifies the original host name
+            )
+            response = await self.client.send(request, stream=True)
+            if response.status_code not in _REDIRECTS or "location" not in response.headers:
+                return response
+            await response.aclose()
+            target = target.join(response.headers["location"])
+        raise MediaBlocked(f"{url}: more than {self.max_redirects} redirects")
+
+    async def fetch(self, url: str) -> MediaItem:
+        cached = self._cache.get(url)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        response = await self._open(url, headers)
+        try:
+            if response.status_code == 304 and cached is not None:
+                self.revalidated += 1
+                self._remember(cached)
+                return cached
+            response.raise_for_status()
+
+            declared = response.headers.get("content-length")
+            if declared and int(declared) > self.max_bytes:
+                raise MediaTooLarge(f"{url} is {declared} bytes (limit {self.max_bytes})")
+
+            chunks, size = [], 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise MediaTooLarge(f"{url} exceeds {self.max_bytes} bytes")
+                chunks.append(chunk)
+        finally:
+            await response.aclose()
+
+        mime_type = response.headers.get("content-type", "").split(";")[0].strip()
+        if not mime_type or mime_type == "application/octet-stream":
+            mime_type = mimetypes.guess_type(url)[0] or "application/octet-stream"
+
+        item = MediaItem(url, mime_type, b"".join(chunks),
+                         response.headers.get("etag"), response.headers.get("last-modified"))
+        self.downloads += 1
+        self._remember(item)
+        return item
+
+    def _remember(self, item: MediaItem):
+        with self._lock:
+            previous = self._cache.pop(item.url, None)
+            if previous is not None:
+                self._cached_bytes -= len(previous.data)
+            if len(item.data) > self.cache_bytes:
+                return
+            self._cache[item.url] = item
+            self._cached_bytes += len(item.data)
+            while self._cached_bytes > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_bytes -= len(evicted.data)
+
+    async def fetch_many(self, labelled_urls: list) -> list:
+        """
+        Fetches (label, url) pairs concurrently. Returns (label, MediaItem)
+        for each download that succeeded and is a kind we send inline;
+        failures are logged and skipped so the evaluation can go ahead on text.
+        """
+        async def one(label, url):
+            try:
+                return label, await self.fetch(url)
+            except Exception as e:
+                self.failures += 1
+                logger.warning("Could not fetch media %s: %s", url, e)
+                return label, None
+
+        results = await asyncio.gather(*(one(label, url) for label, url in labelled_urls))
+        return [(label, item) for label, item in results if item is not None and item.kind in MEDIA_KINDS]
+
+    def stats(self) -> dict:
+        return {
+            "downloads": self.downloads,
+            "revalidated": self.revalidated,
+            "failures": self.failures,
+            "blocked": self.blocked,
+            "cached_files": len(self._cache),
+            "cached_bytes": self._cached_bytes
+        }
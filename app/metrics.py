@@ -0,0 +1,232 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .ratelimit import token_meter
+
+# Endpoint label for spans and token counters; set by the router, "service" for direct calls
+endpoint_label = ContextVar("endpoint_label", default="service")
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_INF = 'le="+Inf"'
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}  # label values -> float
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *label_values) -> int:
+        series = self._series.get(label_values)
+        return series[-1] if series else 0
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in self._series.items():
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(self.labels, label_values, f'le="{bound:g}"')
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, _INF)} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {series[-2]:g}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """
+    Metrics rendered in the Prometheus text format.
+
+    Besides counters and histograms, any `stats()` callable can be registered
+    as a collector; its numeric values are exported as gauges.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._metrics = []
+        self._collectors = {}  # subsystem -> stats callable
+
+    def counter(self, name: str, help_text: str, labels: tuple = ()) -> Counter:
+        metric = Counter(f"{self.prefix}_{name}", help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(f"{self.prefix}_{name}", help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_stats(self, subsystem: str, stats):
+        self._collectors[subsystem] = stats
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for subsystem, stats in self._collectors.items():
+            for key, value in stats().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"{self.prefix}_{subsystem}_{key}"
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry("mtnp")
+
+# 🔹 Question evaluation
+STAGE_LABELS = ("endpoint", "stage", "dimension", "level", "response_type", "model")
+stage_seconds = registry.histogram(
+    "stage_seconds", "Time spent in each question evaluation stage.", STAGE_LABELS
+)
+parses = registry.counter("parses_total", "Model completions parsed.", ("endpoint", "model"))
+parse_fallbacks = registry.counter(
+    "parse_fallbacks_total", "Completions that needed the incremental fallback parser.", ("endpoint", "model")
+)
+llm_tokens = registry.counter(
+    "llm_tokens_total", "Tokens reported in LLM response metadata.", ("endpoint", "model", "kind")
+)
+
+# 🔹 HTTP
+http_requests = registry.counter("http_requests_total", "HTTP requests served.", ("method", "route", "status"))
+http_seconds = registry.histogram("http_request_seconds", "HTTP request latency.", ("method", "route"))
+
+
+class QuestionSpans:
+    """Stage timings for one question, labelled by endpoint, question fields and model."""
+
+    __slots__ = ("endpoint", "model", "_labels")
+
+    def __init__(self, question, model_name: str, endpoint: str = None):
+        self.endpoint = endpoint or endpoint_label.get()
+        self.model = model_name
+        self._labels = (question.dimension, question.level, question.response_type, model_name)
+
+    def observe(self, stage_name: str, seconds: float):
+        stage_seconds.observe(seconds, self.endpoint, stage_name, *self._labels)
+
+    @contextmanager
+    def stage(self, stage_name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage_name, time.perf_counter() - start)
+
+
+def record_usage(response, model_name: str):
+    """Adds the token counts LangChain reports for `response`, when there are any."""
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return
+    endpoint = endpoint_label.get()
+    model_name = (getattr(response, "response_metadata", None) or {}).get("model_name") or model_name
+    for kind in ("input_tokens", "output_tokens"):
+        if usage.get(kind):
+            llm_tokens.inc(endpoint, model_name, kind.removesuffix("_tokens"), amount=usage[kind])
+
+    # Charged to the tenant's token quota once the request completes
+    meter = token_meter.get()
+    if meter is not None:
+        meter.tokens += usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+
+
+@contextmanager
+def labelled(endpoint: str):
+    """Labels the metrics recorded inside the block with `endpoint`."""
+    token = endpoint_label.set(endpoint)
+    try:
+        yield
+    finally:
+        endpoint_label.reset(token)
+
+
+def _route_label(scope) -> str:
+    """
+    Template of the matched route as it appears in request URLs, with the
+    prefix of the router it was included under ("/api/py/question").
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Newer FastAPI matches included routes below their prefix and keeps the full path here
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    return scope.get("root_path", "") + (getattr(effective, "path", None) or route.path_format)
+
+
+class MetricsMiddleware:
+    """Pure ASGI request counter and latency histogram, labelled by the full route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        scope.setdefault("state", {})["request_start"] = start
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = _route_label(scope)
+            http_requests.inc(scope["method"], route, str(status))
+            http_seconds.observe(time.perf_counter() - start, scope["method"], route)
@@ -0,0 +1,77 @@
+import json
+from starlette.exceptions import HTTPException
+
+
+class PayloadTooLarge(HTTPException):
+    def __init__(self, limit: int):
+        super().__init__(status_code=413, detail=f"Payload too large (limit {limit // (1024 * 1024)} MB)")
+
+
+class BodySizeLimitMiddleware:
+    """
+    Pure ASGI request body limit.
+
+    A declared Content-Length over the limit is rejected before any of the
+    body is read. Otherwise bytes are counted as chunks arrive and the
+    request is aborted as soon as the count passes the limit, so an
+    oversized body is never held in memory.
+    """
+
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    return await self._reject(send, 400, "Invalid Content-Length header")
+                if declared > self.max_body_size:
+                    error = PayloadTooLarge(self.max_body_size)
+                    return await self._reject(send, error.status_code, error.detail)
+                break
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Raised as an HTTPException so FastAPI's handlers turn it into a 413
+                    raise PayloadTooLarge(self.max_body_size)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except PayloadTooLarge as e:
+            if response_started:
+                raise
+            await self._reject(send, e.status_code, e.detail)
+
+    @staticmethod
+    async def _reject(send, status_code: int, detail: str):
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"connection", b"close")
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -12,8 +12,9 @@ class TodayResponse(BaseModel):
     summary: str = Field(..., description="Brief summary or note about today")
 
 
-from pydantic import BaseModel, HttpUrl, field_validator, model_validator
-from typing import Optional, List, Literal
+from pydantic import BaseModel, Field, HttpUrl, ValidationError, field_validator, model_validator
+from typing import Any, Optional, List, Literal
+from ..config import BATCH_MAX_ITEMS, BATCH_MAX_CONCURRENCY, DEPARTMENT_BULK_MAX_ITEMS
 
 
 class QuestionModel(BaseModel):
@@ -60,6 +61,24 @@ class QuestionModel(BaseModel):
 
 class EvaluateQuestionRequest(BaseModel):
     question: QuestionModel
+    candidate_id: Optional[str] = None  # attributes the stored result to a candidate
+
+
+class EvaluateQuestionBatchRequest(BaseModel):
+    questions: List[QuestionModel] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+    max_concurrency: int = Field(BATCH_MAX_CONCURRENCY, ge=1, le=BATCH_MAX_ITEMS)
+    candidate_id: Optional[str] = None
+
+
+class QuestionBankEntry(BaseModel):
+    """Reference answer for a closed-form question, graded locally without the LLM."""
+    prompt_html: str
+    image_url: Optional[HttpUrl] = None
+    audio_url: Optional[HttpUrl] = None
+    answer: str
+    accepted: List[str] = Field(default_factory=list)  # other spellings of the correct answer
+    options: Optional[List[str]] = None  # MCQ: any other option is graded incorrect locally
+    reason: Optional[str] = None
 
 
 class CognitiveProfile(BaseModel):
@@ -72,3 +91,51 @@ class CognitiveProfile(BaseModel):
 
 class DepartmentAssessmentRequest(BaseModel):
     cognitive_profile: CognitiveProfile
+    candidate_id: Optional[str] = None
+
+
+class SessionCreateRequest(BaseModel):
+    candidate_id: Optional[str] = None  # stored results of the session's answers carry it
+
+
+class DepartmentBulkRequest(BaseModel):
+    profiles: List[CognitiveProfile] = Field(..., min_length=1, max_length=DEPARTMENT_BULK_MAX_ITEMS)
+    narrative: bool = False  # add the cached per-department reasoning and HR questions
+
+
+# 🔹 Model output schemas
+# Parsed completions are validated straight into these. A field the model
+# omitted or got wrong falls back to its default instead of failing the request.
+
+class LLMOutputModel(BaseModel):
+
+    @field_validator("*", mode="wrap")
+    @classmethod
+    def default_on_invalid(cls, value: Any, handler, info):
+        try:
+            return handler(value)
+        except ValidationError:
+            return cls.model_fields[info.field_name].get_default(call_default_factory=True)
+
+
+class QuestionEvaluationOutput(LLMOutputModel):
+    confidence: float = Field(0.5, ge=0, le=1)
+    is_correct: bool = False
+    reason: str = "Model returned invalid reason."
+    candidates_approach: str = "No approach analysis available."
+    demonstrated_strengths: str = "No strengths analysis available."
+    omissions_or_delays: str = "No omissions analysis available."
+    hr_interpretation: str = "No HR interpretation available."
+
+
+class DepartmentNarrativeOutput(LLMOutputModel):
+    reasoning: str = "Model returned insufficient reasoning."
+    hr_questions: List[str] = Field(default_factory=list)
+
+    # keep only string questions
+    @field_validator("hr_questions", mode="before")
+    @classmethod
+    def drop_non_string_questions(cls, v):
+        if isinstance(v, list):
+            return [q for q in v if isinstance(q, str)]
+        return v
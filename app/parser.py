@@ -1,14 +1,217 @@
 import json
-from langchain_core.output_parsers import BaseOutputParser
+import re
 
-class JSONOutputParser(BaseOutputParser):
-    """Ensures model returns valid JSON only."""
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class IncrementalJSONParser:
+    """
+    Single-pass parser for a JSON object that arrives in chunks.
+
+    Call feed() with each chunk; it returns the events completed by that chunk:
+      ("field", key, value)        a top-level field is complete
+      ("item", key, index, value)  an element of a top-level array is complete
+
+    Text before the first "{" (markdown fences, prose) and after the closing
+    "}" is ignored. Completed fields accumulate in `result`; close() also
+    recovers the field that was being written when the output was cut off.
+    """
+
+    _WHITESPACE = " \t\r\n"
+    _CLOSERS = {"{": "}", "[": "]"}
+
+    def __init__(self):
+        self.result = {}
+        self.done = False
+        self._text = ""
+        self._pos = 0
+        self._stack = []  # open containers, the top-level object included
+        self._in_string = False
+        self._expect = "start"  # start | key | colon | value | in_value | comma
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self._items = None  # completed elements while inside a top-level array
+        self._item_start = None
+
+    def feed(self, chunk: str) -> list:
+        self._text += chunk
+        events = []
+        text = self._text
+        stack = self._stack
+        n = len(text)
+        i = self._pos
+
+        while i < n and not self.done:
+            if self._in_string:
+                # Jump straight to the next quote or escape
+                match = _STRING_SPECIAL.search(text, i)
+                if match is None:
+                    i = n
+                    break
+                i = match.start()
+                if text[i] == "\\":
+                    i += 2  # may step past the chunk; the next feed resumes after the escaped char
+                    continue
+                self._in_string = False
+                if self._key_start is not None:
+                    self._key = json.loads(text[self._key_start:i + 1])
+                    self._key_start = None
+                    self._expect = "colon"
+                i += 1
+                continue
+
+            if self._expect == "start":
+                i = text.find("{", i)
+                if i == -1:
+                    i = n
+                    break
+                stack.append("{")
+                self._expect = "key"
+                i += 1
+                continue
+
+            c = text[i]
+            if c in self._WHITESPACE:
+                i += 1
+                continue
+
+            depth = len(stack)
+
+            # 🔹 Elements of a top-level array
+            if self._items is not None and depth == 2 and self._item_start is None and c not in ",]":
+                self._item_start = i
+
+            if c == '"':
+                self._in_string = True
+                if depth == 1 and self._expect == "key":
+                    self._key_start = i
+                elif depth == 1 and self._expect == "value":
+                    self._value_start = i
+                    self._expect = "in_value"
+            elif c == ":" and depth == 1 and self._expect == "colon":
+                self._expect = "value"
+            elif c in "{[":
+                if depth == 1 and self._expect == "value":
+                    self._value_start = i
+                    self._expect = "in_value"
+                    if c == "[":
+                        self._items = []
+                stack.append(c)
+            elif c in "}]":
+                if depth == 2 and self._items is not None:
+                    self._finish_item(events, i)
+                stack.pop()
+                if depth == 2 and self._expect == "in_value":
+                    self._finish_field(events, i + 1)
+                elif depth == 1:
+                    if self._expect == "in_value":
+                        self._finish_field(events, i)
+                    self.done = True
+            elif c == ",":
+                if depth == 1 and self._expect in ("in_value", "comma"):
+                    if self._expect == "in_value":
+                        self._finish_field(events, i)
+                    self._expect = "key"
+                elif depth == 2 and self._items is not None:
+                    self._finish_item(events, i)
+            elif depth == 1 and self._expect == "value":
+                # number, true, false or null
+                self._value_start = i
+                self._expect = "in_value"
+            i += 1
+
+        self._pos = i
+        return events
+
+    def close(self) -> dict:
+        """
+        Ends the input and returns every field recovered from it.
+        A field cut off mid-value is kept when it can be closed into valid JSON;
+        a cut-off array keeps the elements that were complete.
+        """
+        if self.done or self._expect != "in_value":
+            return self.result
+
+        fragment = self._text[self._value_start:]
+        if self._in_string:
+            fragment = fragment.removesuffix("\\") + '"'
+        fragment = fragment.rstrip(self._WHITESPACE + ",:")
+        fragment += "".join(self._CLOSERS[c] for c in reversed(self._stack[1:]))
 
-    def parse(self, text: str):
-        text = text.strip()
         try:
-            if text.startswith("```json"):
-                text = text.removeprefix("```json").removesuffix("```").strip()
-            return json.loads(text)
+            self.result[self._key] = json.loads(fragment)
         except json.JSONDecodeError:
+            if self._items:
+                self.result[self._key] = self._items
+        return self.result
+
+    def _finish_item(self, events: list, end: int):
+        if self._item_start is None:
+            return
+        try:
+            value = json.loads(self._text[self._item_start:end])
+        except json.JSONDecodeError:
+            pass
+        else:
+            events.append(("item", self._key, len(self._items), value))
+            self._items.append(value)
+        self._item_start = None
+
+    def _finish_field(self, events: list, end: int):
+        try:
+            value = json.loads(self._text[self._value_start:end])
+        except json.JSONDecodeError:
+            pass
+        else:
+            self.result[self._key] = value
+            events.append(("field", self._key, value))
+        self._key = None
+        self._value_start = None
+        self._items = None
+        self._expect = "comma"
+
+
+def parse_json_fast(text: str):
+    """The outermost {...} through json.loads (C); None when that is not a whole object."""
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            parsed = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+        if isinstance(parsed, dict):
+            return parsed
+    return None
+
+
+def parse_json_partial(text: str) -> tuple:
+    """Incremental parse of a malformed or truncated completion; returns (fields, complete)."""
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.close(), parser.done
+
+
+def parse_json_object(text: str) -> tuple:
+    """
+    Parses a whole completion in one pass.
+    Returns (fields, complete); complete is False when the object was cut off.
+    """
+    # Fast path: the outermost {...} is usually the whole object
+    parsed = parse_json_fast(text)
+    if parsed is not None:
+        return parsed, True
+    return parse_json_partial(text)
+
+
+class JSONOutputParser:
+    """
+    Ensures model returns a complete JSON object. Same parse() as a LangChain
+    output parser, without importing langchain_core when the app starts.
+    """
+
+    def parse(self, text: str):
+        parsed, complete = parse_json_object(text)
+        if not complete:
             raise ValueError(f"Model did not return valid JSON:\n{text}")
+        return parsed
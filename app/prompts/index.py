@@ -1,75 +1,130 @@
-PROMPTS = {
-    "evaluate_question": """
-You are an automated evaluator for a neuro-profiling question. 
-You will receive a JSON object describing the question and the user's response.
+class RegisteredPrompt:
+    """
+    A versioned chat prompt, compiled once on first use (or by compile()
+    during warm-up), so importing the prompts does not load langchain_core.
+
+    The system message holds only static instructions, so every request
+    shares the same prefix and the provider-side prompt cache can reuse it.
+    Per-request data goes last, in the human message template.
+    Bump `version` whenever either part changes; it is part of cache keys.
+    """
+
+    def __init__(self, name: str, version: str, system: str, human: str):
+        self.name = name
+        self.version = version
+        self.system = system.strip()
+        self.human = human.strip()
+        self._template = None
 
-Your task:
-- Understand the question details.
-- Identify the type of user response.
-- Evaluate the correctness and confidence of the response.
+    def compile(self):
+        if self._template is None:
+            from langchain_core.messages import SystemMessage
+            from langchain_core.prompts import ChatPromptTemplate
+            self._template = ChatPromptTemplate.from_messages([
+                SystemMessage(content=self.system),
+                ("human", self.human)
+            ])
+        return self._template
 
----
+    def render(self, **variables) -> list:
+        return self.compile().format_messages(**variables)
 
-### QUESTION OBJECT STRUCTURE
+
+TODAY_SUMMARY_SYSTEM = """
+You are a strict JSON generator.
+Return ONLY a valid JSON object in this format:
 {
-  "dimension": string,               # e.g. "visual", "logical", "auditory"
-  "level": string,                   # e.g. "basic", "intermediate", "advanced"
-  "type": string,                    # e.g. "written", "audio", "image"
-  "prompt_html": string,             # the text or HTML prompt of the question
-  "image_url": string | null,        # optional reference image (may be null)
-  "audio_url": string | null,        # optional reference audio (may be null)
-  "options": array | null,           # optional multiple choice options
-  "response_type": string,           # "text", "image", or "audio"
-  "response_file_url": string | null,# if response_type is "image" or "audio", use this for evaluation
-  "response_text": string | null     # if response_type is "text", use this for evaluation
+  "date": "YYYY-MM-DD",
+  "festivals": ["festival_name_1", "festival_name_2"],
+  "summary": "short sentence about today"
 }
+"""
+
+TODAY_SUMMARY_HUMAN = """
+Today's date is {today}.
+User prompt: {prompt}
+"""
 
----
 
-### EVALUATION RULES
-1. Determine which response field to use:
-   - If `response_type` == `"text"`, evaluate the answer in `response_text`.
-   - If `response_type` == `"image"` or `"audio"`, evaluate the file provided in `response_file_url`.
-2. Evaluate how accurate or appropriate the user's response is to the question.
-3. Output only one JSON object with the evaluation result.
+EVALUATE_QUESTION_SYSTEM = """
+You are an expert evaluator for MTNP, which produces long-form HR interpretation reports
+based on how users visually interpret structured information. This is not a scoring system,
+personality test, musical test, or psychometric questionnaire.
 
----
+You will receive the user's response followed by the question details.
 
-### STRICT OUTPUT FORMAT
-Return **only** a valid JSON object matching the schema below — no explanations, no markdown, no extra text:
+TASK:
+-----
+Evaluate the user's response and provide:
+1. Correctness assessment (is_correct: true/false)
+2. Brief explanation (reason)
+3. Confidence score (0 to 1)
+4. HR analysis (approach, strengths, omissions, workplace interpretation)
 
+RETURN STRICT JSON ONLY IN THIS FORMAT:
 {
-  "confidence_score": float,   # number between 0.0 and 1.0
-  "is_correct": boolean,       # true if the response is correct, false otherwise
-  "reason": string             # concise explanation (1-2 sentences)
+  "confidence": 0.75,
+  "is_correct": true,
+  "reason": "brief explanation",
+  "candidates_approach": "how they approached the material",
+  "demonstrated_strengths": "what they did well",
+  "omissions_or_delays": "what they missed or delayed",
+  "hr_interpretation": "workplace implications"
 }
 
-Rules:
-- `confidence_score` must be within [0.0, 1.0].
-- `is_correct` must be either true or false.
-- `reason` should summarize why the evaluation was made.
-- Do not include any other text, comments, or keys.
-- The output must be parseable JSON.
+Output JSON only. No markdown, no comments.
+"""
+
+EVALUATE_QUESTION_HUMAN = """
+{user_response_section}
+
+QUESTION DETAILS:
+-----------------
+{question_json}
+"""
 
----
 
-### EXAMPLE INPUT
+DEPARTMENT_NARRATIVE_SYSTEM = """
+You are an expert corporate psychologist and talent assessment specialist.
+
+A candidate's cognitive profile, derived from 15 evaluation questions, has already been
+matched to a corporate department. You will receive that department.
+
+Rules:
+- Explain clearly what makes a candidate suited to this department.
+- Then generate the requested number of distinct HR interview questions
+  tailored specifically for this department. They are sampled for individual
+  candidates, so each question must stand on its own.
+
+RETURN STRICT JSON ONLY IN THIS FORMAT:
 {
-  "dimension": "visual",
-  "level": "basic",
-  "type": "written",
-  "prompt_html": "Look at this 4-bar melody in C major. Count how many notes move by <b>step</b> (not skip).",
-  "image_url": "https://storage.googleapis.com/mtnp-assets/visual/q21.png",
-  "audio_url": null,
-  "options": null,
-  "response_type": "text",
-  "response_file_url": "https://storage.googleapis.com/mtnp-assets/visual/q21.png",
-  "response_text": "6"
+  "reasoning": "",
+  "hr_questions": []
 }
 
-### EXAMPLE OUTPUT
-{"confidence_score": 0.92, "is_correct": true, "reason": "The user correctly counted 6 stepwise movements in the melody."}
+Do not include markdown, comments, or extra text.
+Output JSON only.
+"""
 
-Now analyze the input question and provide only the JSON evaluation object.
+DEPARTMENT_NARRATIVE_HUMAN = """
+DEPARTMENT: {department}
+NUMBER OF QUESTIONS: {question_count}
 """
+
+
+PROMPTS = {
+    prompt.name: prompt for prompt in (
+        RegisteredPrompt("today_summary", "v2", TODAY_SUMMARY_SYSTEM, TODAY_SUMMARY_HUMAN),
+        RegisteredPrompt("evaluate_question", "v3", EVALUATE_QUESTION_SYSTEM, EVALUATE_QUESTION_HUMAN),
+        RegisteredPrompt("department_narrative", "v2", DEPARTMENT_NARRATIVE_SYSTEM, DEPARTMENT_NARRATIVE_HUMAN)
+    )
 }
+
+# Cached results are keyed by these, so a prompt change never reuses old results
+PROMPT_VERSIONS = {name: prompt.version for name, prompt in PROMPTS.items()}
+
+
+def compile_prompts():
+    """Builds every template ahead of the first request; blocking, it imports langchain_core."""
+    for prompt in PROMPTS.values():
+        prompt.compile()
@@ -0,0 +1,289 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from .config import (
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_BASE_URL, GOOGLE_API_KEY, GOOGLE_MODEL, PROVIDER_ATTEMPT_TIMEOUT_SECONDS,
+    PROVIDER_STATS_WINDOW, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS
+)
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Every provider in the pool failed or has its circuit open."""
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class CircuitBreaker:
+    """
+    closed    -> calls flow; `failure_threshold` consecutive failures open it
+    open      -> calls are skipped until `reset_seconds` have passed
+    half_open -> one trial call; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self._changed_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        # open, or a half-open trial that never reported back
+        if time.monotonic() - self._changed_at >= self.reset_seconds:
+            self.state = "half_open"
+            self._changed_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self._changed_at = time.monotonic()
+
+
+class Provider:
+    """
+    One chat model plus its recent latency / error history. `failure_cost`
+    is what a failed call is taken to cost, in seconds: about the attempt
+    timeout, which is how long a failing call can hold up its failover.
+    """
+
+    def __init__(self, name: str, model, window: int = PROVIDER_STATS_WINDOW, breaker: CircuitBreaker = None,
+                 failure_cost: float = PROVIDER_ATTEMPT_TIMEOUT_SECONDS):
+        self.name = name
+        self.model = model
+        self.breaker = breaker or CircuitBreaker()
+        self.failure_cost = failure_cost
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)  # True for success
+        self.calls = 0
+        self.failures = 0
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.model, "model_name", None) or getattr(self.model, "model", None) or self.name
+
+    def p50(self) -> float:
+        return percentile(self.latencies, 50)
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def score(self) -> float:
+        """
+        Lower is better: p50 latency plus the error rate times `failure_cost`.
+        The penalty is added, not multiplied, so a provider that has only
+        failed (no latency yet) ranks behind the working ones. Providers
+        without history score 0 so they get tried.
+        """
+        return self.p50() + self.error_rate() * self.failure_cost
+
+    def record_success(self, latency: float):
+        self.calls += 1
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.breaker.record_success()
+
+    def record_failure(self):
+        self.calls += 1
+        self.failures += 1
+        self.outcomes.append(False)
+        self.breaker.record_failure()
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model_name,
+            "p50_seconds": self.p50(),
+            "p99_seconds": percentile(self.latencies, 99),
+            "error_rate": self.error_rate(),
+            "circuit": self.breaker.state,
+            "calls": self.calls,
+            "failures": self.failures
+        }
+
+
+class ProviderPool:
+    """
+    Routes each call to the provider with the best recent p50 latency and
+    error rate. A provider that errors, or does not answer within
+    `attempt_timeout`, is skipped and the call fails over to the next one.
+
+    Exposes the chat model methods the service layer uses, so it can stand
+    in for a single model.
+    """
+
+    def __init__(self, providers: list, attempt_timeout: float = PROVIDER_ATTEMPT_TIMEOUT_SECONDS):
+        self.providers = providers
+        self.attempt_timeout = attempt_timeout
+        self.failovers = 0
+
+    @property
+    def model_name(self) -> str:
+        return "|".join(p.model_name for p in self.providers)
+
+    def ranked(self) -> list:
+        order = {id(p): i for i, p in enumerate(self.providers)}
+        return sorted(self.providers, key=lambda p: (p.score(), order[id(p)]))
+
+    def _unavailable(self, last_error):
+        return last_error or ProviderUnavailableError("No LLM provider available (all circuits open).")
+
+    def invoke(self, prompt, **kwargs):
+        last_error = None
+        for provider in self.ranked():
+            if not provider.breaker.allow():
+                continue
+            if last_error is not None:
+                self.failovers += 1
+            start = time.perf_counter()
+            try:
+                result = provider.model.invoke(prompt, **kwargs)
+            except Exception as e:
+                provider.record_failure()
+                last_error = e
+                continue
+            provider.record_success(time.perf_counter() - start)
+            return result
+        raise self._unavailable(last_error)
+
+    async def ainvoke(self, prompt, **kwargs):
+        last_error = None
+        for provider in self.ranked():
+            if not provider.breaker.allow():
+                continue
+            if last_error is not None:
+                self.failovers += 1
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(provider.model.ainvoke(prompt, **kwargs), self.attempt_timeout)
+            except Exception as e:
+                provider.record_failure()
+                last_error = e
+                continue
+            provider.record_success(time.perf_counter() - start)
+            return result
+        raise self._unavailable(last_error)
+
+    async def astream(self, prompt, **kwargs):
+        """Fails over only before the first chunk; a stream cannot be resumed elsewhere."""
+        last_error = None
+        for provider in self.ranked():
+            if not provider.breaker.allow():
+                continue
+            if last_error is not None:
+                self.failovers += 1
+            start = time.perf_counter()
+            started = False
+            try:
+                async for chunk in provider.model.astream(prompt, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                provider.record_failure()
+                if started:
+                    raise
+                last_error = e
+                continue
+            provider.record_success(time.perf_counter() - start)
+            return
+        raise self._unavailable(last_error)
+
+    def load(self):
+        """Builds every provider's model now instead of on its first call."""
+        for provider in self.providers:
+            load = getattr(provider.model, "load", None)
+            if load is not None:
+                load()
+
+    def stats(self) -> dict:
+        return {
+            "failovers": self.failovers,
+            "providers": {p.name: p.stats() for p in self.providers}
+        }
+
+
+def build_chat_model(name: str, clients=None):
+    """`clients` (a ClientRegistry) supplies the pooled HTTP clients where the provider accepts them."""
+    if name == "openai":
+        from langchain_openai import ChatOpenAI
+        pooled = {}
+        if clients is not None:
+            pooled = {"http_async_client": clients.async_client(name, OPENAI_BASE_URL),
+                      "http_client": clients.sync_client(name)}
+        # stream_usage adds token counts to streamed responses too
+        return ChatOpenAI(
+            model=OPENAI_MODEL, temperature=0, api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, stream_usage=True,
+            **pooled
+        )
+    if name == "google":
+        # The Gemini SDK manages its own transport
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model=GOOGLE_MODEL, temperature=0, google_api_key=GOOGLE_API_KEY)
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+MODEL_NAMES = {"openai": OPENAI_MODEL, "google": GOOGLE_MODEL}
+
+
+class LazyChatModel:
+    """
+    A provider's chat model, built on first use. Importing a provider SDK
+    (langchain_openai pulls in the whole openai client) is the slowest part
+    of worker start-up, so it happens in load(): the app lifespan calls it
+    in a thread, and the async methods do so too if a call comes first.
+    """
+
+    def __init__(self, name: str, clients=None):
+        self.name = name
+        self.model_name = MODEL_NAMES.get(name, name)
+        self._clients = clients
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = build_chat_model(self.name, self._clients)
+        return self._model
+
+    async def aload(self):
+        return self._model if self._model is not None else await asyncio.to_thread(self.load)
+
+    def invoke(self, prompt, **kwargs):
+        return self.load().invoke(prompt, **kwargs)
+
+    async def ainvoke(self, prompt, **kwargs):
+        return await (await self.aload()).ainvoke(prompt, **kwargs)
+
+    async def astream(self, prompt, **kwargs):
+        async for chunk in (await self.aload()).astream(prompt, **kwargs):
+            yield chunk
+
+
+def build_provider_pool(names: list, clients=None) -> ProviderPool:
+    """Models are built lazily, see LazyChatModel."""
+    for name in names:
+        if name not in MODEL_NAMES:  # fail at start-up, not on the first call
+            raise ValueError(f"Unknown LLM provider: {name}")
+    return ProviderPool([Provider(name, LazyChatModel(name, clients)) for name in names])
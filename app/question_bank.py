@@ -0,0 +1,95 @@
+import hashlib
+import json
+import re
+from .compaction import html_to_text
+from .models.index import QuestionBankEntry, QuestionEvaluationOutput
+
+_PUNCTUATION = re.compile(r"[\s.,;:!?\"'()\[\]]+")
+
+
+def normalize_text(text: str) -> str:
+    """Case-folded, with punctuation and whitespace runs collapsed to one space."""
+    return _PUNCTUATION.sub(" ", text.casefold()).strip()
+
+
+def question_fingerprint(prompt_html: str, image_url=None, audio_url=None) -> str:
+    key = "\x1f".join((normalize_text(html_to_text(prompt_html)), str(image_url or ""), str(audio_url or "")))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class _IndexedEntry:
+    __slots__ = ("accepted", "options", "answer", "reason")
+
+    def __init__(self, entry: QuestionBankEntry):
+        self.answer = entry.answer
+        self.accepted = frozenset(normalize_text(a) for a in [entry.answer, *entry.accepted])
+        self.options = frozenset(normalize_text(o) for o in entry.options) if entry.options else frozenset()
+        self.reason = entry.reason
+
+
+class QuestionBank:
+    """
+    Reference answers for closed-form questions, keyed by the normalized
+    prompt and the question's media URLs.
+
+    A text response matching an accepted answer is graded correct locally.
+    For MCQ entries, a response matching a different option is graded
+    incorrect locally. Anything else returns None and goes to the LLM.
+    """
+
+    def __init__(self):
+        self._index = {}
+        self.lookups = 0
+        self.served_locally = 0
+
+    def __len__(self):
+        return len(self._index)
+
+    def load(self, entries) -> int:
+        """Bulk-loads entries (dicts or QuestionBankEntry); returns how many were indexed."""
+        count = 0
+        for entry in entries:
+            if not isinstance(entry, QuestionBankEntry):
+                entry = QuestionBankEntry.model_validate(entry)
+            key = question_fingerprint(entry.prompt_html, entry.image_url, entry.audio_url)
+            self._index[key] = _IndexedEntry(entry)
+            count += 1
+        return count
+
+    def load_file(self, path: str) -> int:
+        """Loads a JSON array or a JSONL file of entries."""
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                return self.load(json.loads(line) for line in f if line.strip())
+            return self.load(json.load(f))
+
+    def grade(self, question):
+        """Evaluation result for a locally gradable response, else None."""
+        if not self._index or not question.response_text:
+            return None
+        self.lookups += 1
+
+        entry = self._index.get(question_fingerprint(question.prompt_html, question.image_url, question.audio_url))
+        if entry is None:
+            return None
+
+        response = normalize_text(question.response_text)
+        if response in entry.accepted:
+            is_correct = True
+            reason = entry.reason or "The response matches the reference answer."
+        elif response in entry.options:
+            is_correct = False
+            reason = f"The response selects a different option than the reference answer ({entry.answer})."
+        else:
+            return None
+
+        self.served_locally += 1
+        return QuestionEvaluationOutput(confidence=1.0, is_correct=is_correct, reason=reason).model_dump()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._index),
+            "lookups": self.lookups,
+            "served_locally": self.served_locally,
+            "local_fraction": self.served_locally / self.lookups if self.lookups else 0.0
+        }
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import math
+import time
+from contextvars import ContextVar
+
+# Tokens used by the current request; record_usage() adds to it while it is set
+token_meter = ContextVar("token_meter", default=None)
+
+# 🔹 Request weight per route: what one call costs against the request quota
+ENDPOINT_COSTS = {
+    "/api/py/chat": 1,
+    "/api/py/question": 1,
+    "/api/py/question/stream": 1,
+    "/api/py/question/batch": 10,
+    "/api/py/assessment/department": 3,
+    "/api/py/assessment/department/stream": 3,
+    "/api/py/assessment/department/bulk": 20,
+    "/api/py/assessment/session/{session_id}/answer": 1,
+    "/api/py/assessment/session/{session_id}/finalize": 3,
+    "/api/py/evaluations/export": 10,
+}
+
+_SESSION_PREFIX = "/api/py/assessment/session/"
+
+# Starting guess of LLM tokens per request, refined from observed usage
+_INITIAL_TOKEN_ESTIMATE = 1000
+_ESTIMATE_WEIGHT = 0.1  # EWMA weight of the newest observation
+
+
+class TokenMeter:
+    __slots__ = ("tokens",)
+
+    def __init__(self):
+        self.tokens = 0
+
+
+class TenantQuota:
+    """A tenant and its request and token limits, as `limits` strings ("100/minute")."""
+    __slots__ = ("tenant", "requests", "tokens")
+
+    def __init__(self, tenant: str, requests: str, tokens: str):
+        self.tenant = tenant
+        self.requests = requests
+        self.tokens = tokens
+
+
+class RateLimiter:
+    """
+    Per-tenant request and LLM token quotas in a shared store.
+
+    Counters live in a `limits` storage, so every worker that points at the
+    same store (e.g. "redis://...") shares them; "memory://" is the
+    single-process stand-in (pass `store` to share one between limiters).
+    Tenants are the keys in RATE_LIMIT_TENANTS (sent as X-API-Key); every other
+    request, with an unknown key or none, is limited by client IP.
+
+    A request is refused up front when its weighted cost exceeds the request
+    quota, or when the tokens it is expected to use (a running average for the
+    route) no longer fit in the token quota. Tokens actually used are charged
+    once the response is complete.
+
+    The `limits` package is imported when the first request is checked (or
+    by warm_up()), not when the app is built.
+    """
+
+    def __init__(self, storage_uri: str, default_requests: str, default_tokens: str, tenants: dict = None,
+                 store=None):
+        if not storage_uri.startswith("async+"):
+            storage_uri = "async+" + storage_uri
+        self._storage_uri = storage_uri
+        self._store = store
+        self._strategy = None
+        self._items = {}  # limit string -> parsed RateLimitItem
+        self._default_requests = default_requests
+        self._default_tokens = default_tokens
+        self._tenants = {
+            key: TenantQuota(spec.get("tenant", _key_id(key)), spec.get("requests", default_requests),
+                             spec.get("tokens", default_tokens))
+            for key, spec in (tenants or {}).items()
+        }
+        self._estimates = {}  # route -> expected tokens per request
+        self.allowed = 0
+        self.limited_requests = 0
+        self.limited_tokens = 0
+        self.tokens_charged = 0
+
+    def warm_up(self):
+        """
+        Imports `limits`, connects the store and parses every configured limit,
+        so a malformed one is reported at startup; blocking, so the lifespan runs it in a thread.
+        """
+        self._limiter
+        for quota in self._tenants.values():
+            self._item(quota.requests)
+            self._item(quota.tokens)
+        self._item(self._default_requests)
+        self._item(self._default_tokens)
+
+    @property
+    def _limiter(self):
+        if self._strategy is None:
+            from limits import storage
+            from limits.aio.strategies import SlidingWindowCounterRateLimiter
+            if self._store is None:
+                self._store = storage.storage_from_string(self._storage_uri)
+            self._strategy = SlidingWindowCounterRateLimiter(self._store)
+        return self._strategy
+
+    def _item(self, limit: str):
+        item = self._items.get(limit)
+        if item is None:
+            from limits import parse
+            item = self._items[limit] = parse(limit)
+        return item
+
+    def quota_for(self, api_key: str, client_ip: str) -> TenantQuota:
+        """Configured keys get their own quota; any other key counts against the client IP."""
+        if api_key and api_key in self._tenants:
+            return self._tenants[api_key]
+        # Unknown keys are free to mint, so they must not open a fresh bucket each
+        return TenantQuota(f"ip:{client_ip}", self._default_requests, self._default_tokens)
+
+    def expected_tokens(self, route: str) -> int:
+        return int(self._estimates.get(route, _INITIAL_TOKEN_ESTIMATE))
+
+    async def admit(self, quota: TenantQuota, route: str, cost: int):
+        """Returns None when admitted, else (reason, retry_after_seconds)."""
+        limiter, tokens, requests = self._limiter, self._item(quota.tokens), self._item(quota.requests)
+        if not await limiter.test(tokens, quota.tenant, "tokens", cost=self.expected_tokens(route)):
+            self.limited_tokens += 1
+            return "token quota", await self._retry_after(tokens, quota.tenant, "tokens")
+
+        if not await limiter.hit(requests, quota.tenant, "requests", cost=cost):
+            self.limited_requests += 1
+            return "request quota", await self._retry_after(requests, quota.tenant, "requests")
+
+        self.allowed += 1
+        return None
+
+    async def charge(self, quota: TenantQuota, route: str, tokens: int):
+        """Books the tokens a request used and updates the route's estimate."""
+        previous = self._estimates.get(route, _INITIAL_TOKEN_ESTIMATE)
+        self._estimates[route] = previous + _ESTIMATE_WEIGHT * (tokens - previous)
+        if not tokens:
+            return
+        self.tokens_charged += tokens
+        limiter, item = self._limiter, self._item(quota.tokens)
+        if not await limiter.hit(item, quota.tenant, "tokens", cost=tokens):
+            # Overran the quota: fill what is left, so the next request is refused early
+            remaining = (await limiter.get_window_stats(item, quota.tenant, "tokens")).remaining
+            if remaining > 0:
+                await limiter.hit(item, quota.tenant, "tokens", cost=remaining)
+
+    async def _retry_after(self, item, *identifiers) -> int:
+        stats = await self._limiter.get_window_stats(item, *identifiers)
+        return max(1, math.ceil(stats.reset_time - time.time()))
+
+    def stats(self) -> dict:
+        decisions = self.allowed + self.limited_requests + self.limited_tokens
+        return {
+            "allowed": self.allowed,
+            "limited_requests": self.limited_requests,
+            "limited_tokens": self.limited_tokens,
+            "limited_ratio": (self.limited_requests + self.limited_tokens) / decisions if decisions else 0.0,
+            "tokens_charged": self.tokens_charged,
+            "tenants_configured": len(self._tenants)
+        }
+
+
+def _key_id(api_key: str) -> str:
+    # Counters are keyed by a digest, so API keys never reach the shared store
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def load_tenants(raw: str) -> dict:
+    """RATE_LIMIT_TENANTS: inline JSON, or the path of a JSON file."""
+    if not raw:
+        return {}
+    if raw.lstrip().startswith("{"):
+        return json.loads(raw)
+    with open(raw, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def route_key(path: str) -> str:
+    """ENDPOINT_COSTS key of a path; session ids are folded into one template per action."""
+    if path.startswith(_SESSION_PREFIX):
+        return f"{_SESSION_PREFIX}{{session_id}}/{path.rsplit('/', 1)[-1]}"
+    return path
+
+
+class RateLimitMiddleware:
+    """Pure ASGI quota check for the routes in ENDPOINT_COSTS; answers 429 with Retry-After."""
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        route = route_key(scope["path"]) if scope["type"] == "http" else None
+        cost = ENDPOINT_COSTS.get(route)
+        if not cost:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        api_key = headers.get(b"x-api-key", b"").decode("latin-1")
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        quota = self.limiter.quota_for(api_key, client_ip)
+
+        refused = await self.limiter.admit(quota, route, cost)
+        if refused is not None:
+            reason, retry_after = refused
+            return await self._reject(send, reason, retry_after)
+
+        meter = TokenMeter()
+        token = token_meter.set(meter)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            token_meter.reset(token)
+            await self.limiter.charge(quota, route, meter.tokens)
+
+    @staticmethod
+    async def _reject(send, reason: str, retry_after: int):
+        body = json.dumps({"detail": f"Rate limit exceeded ({reason}). Retry after {retry_after}s."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
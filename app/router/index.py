@@ -1,19 +1,103 @@
-from fastapi import APIRouter, HTTPException
+import json
+import secrets
+import time
+from typing import Literal, Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from ..models.index import ChatRequest, TodayResponse
-from ..service.index import get_today_summary, get_question_evaluation, get_department_recommendation
-from ..models.index import EvaluateQuestionRequest, DepartmentAssessmentRequest
+from ..service.index import (
+    aget_today_summary, aget_question_evaluation, aget_question_evaluations, aget_department_recommendation,
+    aget_department_recommendations, department_scorer, hr_question_pool, acreate_session, aget_session,
+    aadd_session_answer, afinalize_session, session_store, evaluation_store,
+    astream_question_evaluation, astream_department_recommendation,
+    evaluation_cache, semantic_cache, inflight, hedger, question_compactor, media_fetcher, question_bank, scheduler,
+    get_provider_stats, get_model_name
+)
+from ..config import EVALUATION_EXPORT_KEY
+from ..metrics import QuestionSpans, labelled
+from ..providers import ProviderUnavailableError
+from ..scheduler import OverloadedError
+from ..sessions import SessionClosedError, SessionNotFoundError
+from ..models.index import (
+    EvaluateQuestionRequest, EvaluateQuestionBatchRequest, DepartmentAssessmentRequest, DepartmentBulkRequest,
+    SessionCreateRequest
+)
+from ..store import attributed
 
 router = APIRouter()
 
+
+async def _await_llm(coro):
+    """Awaits a service call, mapping upstream timeouts (504), shed load (503) and session errors (404 / 409)."""
+    try:
+        return await coro
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Upstream model call timed out.")
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except ProviderUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session {e.args[0]}.")
+    except SessionClosedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+def _observe_validation(request: Request, questions: list, endpoint: str):
+    """Per-question share of the time spent reading and validating the request body."""
+    start = getattr(request.state, "request_start", None)
+    if start is None:
+        return
+    elapsed = (time.perf_counter() - start) / len(questions)
+    model_name = get_model_name()
+    for question in questions:
+        QuestionSpans(question, model_name, endpoint).observe("validation", elapsed)
+
+
+async def _stream_response(events, stream_format: str, endpoint: str, candidate_id: str = None) -> StreamingResponse:
+    """
+    Encodes service events as NDJSON lines or server-sent events. The first event is
+    awaited before the response starts (the model call holds its scheduler slot by then),
+    so a call that is shed or times out gets a real 503 / 504 instead of a 200.
+    """
+    def encode(event: dict) -> str:
+        data = json.dumps(event, ensure_ascii=False)
+        if stream_format == "sse":
+            return f"event: {event['event']}\ndata: {data}\n\n"
+        return data + "\n"
+
+    with labelled(endpoint), attributed(candidate_id):
+        first = await _await_llm(anext(events))
+
+    async def body():
+        try:
+            yield encode(first)
+            with labelled(endpoint), attributed(candidate_id):
+                async for event in events:
+                    yield encode(event)
+        except Exception as e:
+            # Headers are already sent, so errors travel in-band
+            yield encode({"event": "error", "detail": str(e) or type(e).__name__})
+        finally:
+            await events.aclose()  # releases the slot if the client went away
+
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
+
+
+StreamFormat = Literal["ndjson", "sse"]
+
+
 @router.post("/chat", response_model=TodayResponse)
 async def chat(req: ChatRequest):
     """POST endpoint for GPT-based structured response."""
-    result = get_today_summary(req.prompt)
+    with labelled("chat"):
+        result = await _await_llm(aget_today_summary(req.prompt))
     return result
 
 
 @router.post("/question", response_model=dict)
-async def evaluate_question(req: EvaluateQuestionRequest):
+async def evaluate_question(req: EvaluateQuestionRequest, request: Request):
 
     """
     POST endpoint for evaluating a question and user response.
@@ -39,16 +123,64 @@ async def evaluate_question(req: EvaluateQuestionRequest):
     if not question:
         raise HTTPException(status_code=400, detail="Missing 'question' field in request body.")
 
-    result = get_question_evaluation(question)
+    _observe_validation(request, [question], "question")
+    with labelled("question"), attributed(req.candidate_id):
+        result = await _await_llm(aget_question_evaluation(question))
     # result = {"is_correct": True, "reason": "Correct answer!", "confidence": 1}
     return result
 
+@router.post("/question/stream")
+async def evaluate_question_stream(req: EvaluateQuestionRequest, request: Request,
+                                   stream_format: StreamFormat = Query("ndjson", alias="format")):
+    """
+    Streaming variant of /question (?format=ndjson or ?format=sse).
+
+    Emits one event per completed field, then the validated result:
+    {"event": "field", "key": "reason", "value": "..."}
+    {"event": "result", "value": { ...same shape as /question... }}
+    """
+    _observe_validation(request, [req.question], "question_stream")
+    return await _stream_response(
+        astream_question_evaluation(req.question), stream_format, "question_stream", req.candidate_id
+    )
+
+
+@router.post("/question/batch", response_model=dict)
+async def evaluate_question_batch(req: EvaluateQuestionBatchRequest, request: Request):
+    """
+    POST endpoint for evaluating a whole assessment in one round trip.
+    Questions are evaluated concurrently; each item reports its own result or error.
+
+    Expected payload format:
+    {
+        "questions": [ { ...same shape as /question... }, ... ],
+        "max_concurrency": 15
+    }
+
+    Response format:
+    {
+        "results": [
+            {"index": 0, "ok": true, "result": { ...same shape as /question... }},
+            {"index": 1, "ok": false, "error": "..."}
+        ]
+    }
+    """
+    _observe_validation(request, req.questions, "question_batch")
+    with labelled("question_batch"), attributed(req.candidate_id):
+        results = await _await_llm(
+            aget_question_evaluations(req.questions, req.max_concurrency)
+        )
+    return {"results": results}
+
 @router.post("/assessment/department", response_model=dict)
-async def evaluate_department(req: DepartmentAssessmentRequest):
+async def evaluate_department(req: DepartmentAssessmentRequest, narrative: bool = True):
     """
     POST endpoint for evaluating the user's cognitive profile
     and identifying the most suitable corporate department.
 
+    Departments are ranked locally. The reasoning and HR questions are sampled
+    from a pre-generated pool per department; ?narrative=false skips them.
+
     Expected payload format:
     {
         "cognitive_profile": {
@@ -69,10 +201,194 @@ async def evaluate_department(req: DepartmentAssessmentRequest):
             detail="Missing 'cognitive_profile' in request body."
         )
 
-    # Build ChatGPT prompt
-    result = get_department_recommendation(profile.dict())
+    with labelled("department"), attributed(req.candidate_id):
+        result = await _await_llm(aget_department_recommendation(profile.dict(), narrative))
 
     return result
 
 
+@router.post("/assessment/department/bulk", response_model=dict)
+async def evaluate_departments_bulk(req: DepartmentBulkRequest):
+    """
+    Ranks departments for many cognitive profiles in one vectorized pass.
+
+    Expected payload format:
+    {
+        "profiles": [{ "visual": 8.2, "auditory": 4.1, "rhythmic": 5.3, "subconscious": 8.7, "confidence": 0.81 }],
+        "narrative": false
+    }
+
+    Results come back in input order, each shaped like /assessment/department.
+    """
+    with labelled("department_bulk"):
+        results = await _await_llm(
+            aget_department_recommendations([p.model_dump() for p in req.profiles], req.narrative)
+        )
+    return {"results": results}
+
+
+@router.post("/assessment/department/stream")
+async def evaluate_department_stream(req: DepartmentAssessmentRequest, narrative: bool = True,
+                                     stream_format: StreamFormat = Query("ndjson", alias="format")):
+    """
+    Streaming variant of /assessment/department (?format=ndjson or ?format=sse).
+
+    The department picks are emitted first, then each sampled HR question:
+    {"event": "field", "key": "primary_department", "value": "Data & Analytics"}
+    {"event": "item", "key": "hr_questions", "index": 0, "value": "..."}
+    {"event": "result", "value": { ...same shape as /assessment/department... }}
+    """
+    return await _stream_response(
+        astream_department_recommendation(req.cognitive_profile.model_dump(), narrative), stream_format,
+        "department_stream", req.candidate_id
+    )
+
+
+@router.post("/assessment/session", response_model=dict)
+async def create_session(req: Optional[SessionCreateRequest] = None):
+    """
+    Starts an assessment session. Answers posted to it are evaluated and folded
+    into running per-dimension scores, so the profile is ready when the last one lands.
+    The body is optional: {"candidate_id": "..."}.
+
+    Response format:
+    {"session_id": "...", "candidate_id": null, "answers": 0, "finalized": false,
+     "profile": { ...CognitiveProfile... }, "recommendation": null}
+    """
+    return await acreate_session(req.candidate_id if req else None)
+
+
+@router.get("/assessment/session/{session_id}", response_model=dict)
+async def get_session(session_id: str):
+    """Answer count and current profile of a session, plus its recommendation once finalized."""
+    return await _await_llm(aget_session(session_id))
+
+
+@router.post("/assessment/session/{session_id}/answer", response_model=dict)
+async def add_session_answer(session_id: str, req: EvaluateQuestionRequest, request: Request):
+    """
+    Evaluates one answer (same payload as /question) and adds it to the session.
+    The response carries the evaluation under "result" and the updated profile.
+    """
+    _observe_validation(request, [req.question], "session_answer")
+    with labelled("session_answer"):
+        return await _await_llm(aadd_session_answer(session_id, req.question))
+
+
+@router.post("/assessment/session/{session_id}/finalize", response_model=dict)
+async def finalize_session(session_id: str, narrative: bool = True):
+    """
+    Closes the session and recommends departments from its profile, in the same
+    shape as /assessment/department, under "recommendation". Repeating it returns the same result.
+    """
+    with labelled("session_finalize"):
+        return await _await_llm(afinalize_session(session_id, narrative))
+
+
+@router.get("/evaluations/export")
+def export_evaluations(kind: Optional[Literal["question", "department"]] = None, candidate_id: Optional[str] = None,
+                       session_id: Optional[str] = None, fingerprint: Optional[str] = None,
+                       dimension: Optional[str] = None, level: Optional[str] = None,
+                       prompt_version: Optional[str] = None, since: Optional[float] = None,
+                       limit: Optional[int] = Query(None, ge=1),
+                       x_admin_key: Optional[str] = Header(None)):
+    """
+    Streams stored evaluation results as NDJSON, oldest first, one row per line:
+    {"id": 1, "created_at": 1734567890.1, "kind": "question", "candidate_id": "...", "session_id": null,
+     "fingerprint": "...", "dimension": "visual", "level": "basic", "prompt_version": "v1",
+     "model": "gpt-4o-mini", "request": { ... }, "result": { ... }}
+
+    Every filter is optional; `since` is a Unix timestamp. Rows are read in
+    chunks, so exports of any size run in constant memory. Candidate data:
+    disabled unless EVALUATION_EXPORT_KEY is set, and the X-Admin-Key header must match it.
+    """
+    if not EVALUATION_EXPORT_KEY:
+        raise HTTPException(status_code=404, detail="Evaluation export is disabled.")
+    if not secrets.compare_digest((x_admin_key or "").encode(), EVALUATION_EXPORT_KEY.encode()):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Admin-Key.")
+    rows = evaluation_store.iter_results(
+        since=since, limit=limit, kind=kind, candidate_id=candidate_id, session_id=session_id,
+        fingerprint=fingerprint, dimension=dimension, level=level, prompt_version=prompt_version
+    )
+    # A sync generator: Starlette iterates it in a worker thread, off the event loop
+    return StreamingResponse(
+        (json.dumps(row, ensure_ascii=False) + "\n" for row in rows), media_type="application/x-ndjson"
+    )
+
+
+@router.get("/cache/stats", response_model=dict)
+async def cache_stats():
+    """Hit / miss / eviction counters of the evaluation result cache."""
+    return evaluation_cache.stats()
+
+
+@router.get("/semantic-cache/stats", response_model=dict)
+async def semantic_cache_stats():
+    """Lookups, hits and mean hit similarity of the near-duplicate answer cache."""
+    return semantic_cache.stats()
+
+
+@router.get("/singleflight/stats", response_model=dict)
+async def singleflight_stats():
+    """How many concurrent identical evaluations were collapsed into one upstream call."""
+    return inflight.stats()
+
+
+@router.get("/providers/stats", response_model=dict)
+async def provider_stats():
+    """Per-provider latency, error rate and circuit state used for routing."""
+    return get_provider_stats()
+
+
+@router.get("/hedging/stats", response_model=dict)
+async def hedging_stats():
+    """Hedge rate, hedge wins and p99 latency of question evaluation calls."""
+    return hedger.stats()
+
+
+@router.get("/compaction/stats", response_model=dict)
+async def compaction_stats():
+    """Input tokens saved by question payload compaction."""
+    return question_compactor.stats()
+
+
+@router.get("/media/stats", response_model=dict)
+async def media_stats():
+    """Media downloads, ETag / Last-Modified revalidations and cache size."""
+    return media_fetcher.stats()
+
+
+@router.get("/question-bank/stats", response_model=dict)
+async def question_bank_stats():
+    """Size of the reference-answer bank and the fraction of answers graded locally."""
+    return question_bank.stats()
+
+
+@router.get("/departments/stats", response_model=dict)
+async def department_stats():
+    """Profiles ranked by the local department scorer."""
+    return department_scorer.stats()
+
+
+@router.get("/hr-questions/stats", response_model=dict)
+async def hr_question_pool_stats():
+    """Warm department pools, their age and how often they were sampled."""
+    return hr_question_pool.stats()
+
+
+@router.get("/scheduler/stats", response_model=dict)
+async def scheduler_stats():
+    """Active and queued upstream calls per priority class, and how many were shed."""
+    return scheduler.stats()
+
+
+@router.get("/sessions/stats", response_model=dict)
+async def session_stats():
+    """Sessions created, answers added and sessions finalized."""
+    return session_store.stats()
+
 
+@router.get("/evaluations/stats", response_model=dict)
+async def evaluation_store_stats():
+    """Results recorded, written in batches, still queued and dropped by the evaluation store."""
+    return evaluation_store.stats()
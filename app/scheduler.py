@@ -0,0 +1,191 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from .config import (
+    LLM_MAX_CONCURRENCY, SCHEDULER_MAX_QUEUE, SCHEDULER_DEADLINE_INTERACTIVE, SCHEDULER_DEADLINE_BATCH,
+    SCHEDULER_DEADLINE_BULK
+)
+from .metrics import endpoint_label, registry
+
+# 🔹 Priority classes, most urgent first
+PRIORITIES = ("interactive", "batch", "bulk")
+
+# Endpoint label -> priority class; anything else (bulk jobs, background warm-up) is "bulk"
+ENDPOINT_PRIORITIES = {
+    "chat": "interactive",
+    "question": "interactive",
+    "question_stream": "interactive",
+    "question_batch": "batch",
+    "session_answer": "interactive",
+}
+
+_SERVICE_ESTIMATE_WEIGHT = 0.1  # EWMA weight of the newest slot hold time
+
+scheduler_wait_seconds = registry.histogram(
+    "scheduler_wait_seconds", "Time spent queued for an upstream call slot.", ("priority",)
+)
+scheduler_shed = registry.counter(
+    "scheduler_shed_total", "Upstream calls shed by admission control.", ("priority", "reason")
+)
+
+
+class OverloadedError(Exception):
+    """Raised when a call cannot start before its deadline; mapped to 503."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def current_priority() -> str:
+    return ENDPOINT_PRIORITIES.get(endpoint_label.get(), "bulk")
+
+
+class PriorityScheduler:
+    """
+    Admission control in front of the LLM.
+
+    At most `capacity` upstream calls run at once. Further calls wait in a
+    bounded queue and are started in priority order, FIFO within a class, so
+    interactive submissions overtake bulk jobs when traffic spikes.
+
+    Each class has a deadline: the longest a call may wait for its slot. A
+    call is shed with OverloadedError up front when the queue is full or the
+    estimated wait already exceeds its deadline, and later if the deadline
+    passes while it is still queued.
+    """
+
+    def __init__(self, capacity: int = LLM_MAX_CONCURRENCY, max_queue: int = SCHEDULER_MAX_QUEUE,
+                 deadlines: dict = None):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.deadlines = deadlines or {
+            "interactive": SCHEDULER_DEADLINE_INTERACTIVE,
+            "batch": SCHEDULER_DEADLINE_BATCH,
+            "bulk": SCHEDULER_DEADLINE_BULK
+        }
+        self.active = 0
+        self._heap = []  # (priority rank, sequence, future)
+        self._queued = {p: 0 for p in PRIORITIES}
+        self._sequence = itertools.count()
+        self._service_seconds = None  # EWMA of how long a slot is held
+        self.admitted = {p: 0 for p in PRIORITIES}
+        self.shed = {p: 0 for p in PRIORITIES}
+
+    @property
+    def queued(self) -> int:
+        return sum(self._queued.values())
+
+    def estimated_wait(self, priority: str) -> float:
+        """Rough wait for a new call: the calls queued ahead of it drain `capacity` at a time."""
+        if self.active < self.capacity and not self.queued:
+            return 0.0
+        rank = PRIORITIES.index(priority)
+        ahead = sum(self._queued[p] for p in PRIORITIES[:rank + 1])
+        return (ahead // self.capacity + 1) * (self._service_seconds or 0.0)
+
+    def _shed(self, priority: str, reason: str, retry_after: float):
+        self.shed[priority] += 1
+        scheduler_shed.inc(priority, reason)
+        raise OverloadedError(
+            f"Server busy ({reason}); retry later.", max(1, math.ceil(retry_after))
+        )
+
+    async def _acquire(self, priority: str):
+        if self.active < self.capacity and not self.queued:
+            self.active += 1
+            return
+
+        deadline = self.deadlines[priority]
+        if self.queued >= self.max_queue:
+            self._shed(priority, "queue_full", self.estimated_wait(priority))
+        estimate = self.estimated_wait(priority)
+        if estimate > deadline:
+            self._shed(priority, "deadline", estimate)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (PRIORITIES.index(priority), next(self._sequence), future))
+        self._queued[priority] += 1
+        try:
+            await asyncio.wait({future}, timeout=deadline)
+        except BaseException:
+            # Caller cancelled: hand a slot it was just given to the next call
+            if future.done() and not future.cancelled():
+                self._release()
+            else:
+                self._dequeue(priority, future)
+            raise
+        if not future.done():
+            self._dequeue(priority, future)
+            self._shed(priority, "deadline", self.estimated_wait(priority))
+
+    def _dequeue(self, priority: str, future):
+        # Left in the heap and skipped by _release; only the count changes here
+        future.cancel()
+        self._queued[priority] -= 1
+
+    def _release(self):
+        """Passes the slot straight to the most urgent waiter, or frees it."""
+        while self._heap:
+            rank, _, future = heapq.heappop(self._heap)
+            if future.cancelled():
+                continue
+            self._queued[PRIORITIES[rank]] -= 1
+            future.set_result(None)
+            return
+        self.active -= 1
+
+    def try_acquire(self, priority: str = None):
+        """
+        Takes a free slot without queueing, for optional extra calls (hedges).
+        Returns a function that releases it, or None when no slot is free or
+        calls are already waiting.
+        """
+        if self.active >= self.capacity or self.queued:
+            return None
+        self.active += 1
+        self.admitted[priority or current_priority()] += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self._release()
+
+        return release
+
+    @asynccontextmanager
+    async def slot(self, priority: str = None):
+        """Holds one upstream call slot; the class defaults to the current endpoint's."""
+        priority = priority or current_priority()
+        queued_at = time.perf_counter()
+        await self._acquire(priority)
+        start = time.perf_counter()
+        scheduler_wait_seconds.observe(start - queued_at, priority)
+        self.admitted[priority] += 1
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - start
+            if self._service_seconds is None:
+                self._service_seconds = held
+            else:
+                self._service_seconds += _SERVICE_ESTIMATE_WEIGHT * (held - self._service_seconds)
+            self._release()
+
+    def stats(self) -> dict:
+        stats = {
+            "capacity": self.capacity,
+            "active": self.active,
+            "queued": self.queued,
+            "service_seconds": self._service_seconds or 0.0
+        }
+        for priority in PRIORITIES:
+            stats[f"queued_{priority}"] = self._queued[priority]
+            stats[f"admitted_{priority}"] = self.admitted[priority]
+            stats[f"shed_{priority}"] = self.shed[priority]
+        return stats
@@ -0,0 +1,228 @@
+import math
+import re
+import threading
+import zlib
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from .cache import LRUCache
+from .compaction import html_to_text
+from .config import (
+    SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MAX_QUESTIONS, SEMANTIC_CACHE_MAX_ANSWERS, CACHE_TTL_SECONDS
+)
+from .question_bank import normalize_text
+
+if TYPE_CHECKING:
+    import numpy as np  # imported on first use, not when the app starts
+
+FEATURES = 256  # hashed feature dimensions; an index takes FEATURES * 4 bytes per answer
+ECHO_WEIGHT = 0.25  # answer words that repeat the question ("6 notes" to "how many notes") count for less
+
+# 🔹 Answer normalization
+_CONTRACTED_NOT = re.compile(r"n['’]t\b")
+NUMBER_WORDS = {
+    word: str(value) for value, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen "
+        "sixteen seventeen eighteen nineteen twenty".split()
+    )
+}
+NUMBER_WORDS.update({"thirty": "30", "forty": "40", "fifty": "50", "sixty": "60", "seventy": "70",
+                     "eighty": "80", "ninety": "90", "hundred": "100"})
+FILLER_WORDS = frozenset(
+    "a an the i i'm im me my we our you it its is are was were am be been there here that this "
+    "think guess believe heard hear see saw count counted answer total so um uh".split()
+)
+NEGATIONS = frozenset({"no", "not", "none", "never", "nothing", "neither", "nor", "without"})
+
+
+def answer_tokens(text: str) -> list:
+    """Normalized words of an answer: number words as digits, filler words dropped."""
+    text = _CONTRACTED_NOT.sub(" not", text.casefold())
+    tokens = (NUMBER_WORDS.get(t, t) for t in normalize_text(text).split())
+    return [t for t in tokens if t not in FILLER_WORDS]
+
+
+def answer_signature(tokens: list, contrast: frozenset = frozenset()) -> int:
+    """
+    What must match exactly for a grade to carry over: the numbers, whether
+    the answer is negated, and which of the question's alternatives it names.
+    """
+    return hash((
+        tuple(sorted(t for t in tokens if t.isdigit())),
+        any(t in NEGATIONS for t in tokens),
+        tuple(sorted({t for t in tokens if t in contrast}))
+    ))
+
+
+def question_terms(prompt_html: str, options: list = None) -> tuple:
+    """
+    (echo, contrast) words of a question. Contrast words are the alternatives
+    it offers ("higher or lower", MCQ options); echo words are the rest of
+    the prompt, which an answer may repeat without changing its meaning.
+    """
+    words = [NUMBER_WORDS.get(t, t) for t in normalize_text(html_to_text(prompt_html)).split()]
+    contrast = {words[i + d] for i, w in enumerate(words) if w == "or" for d in (-1, 1) if 0 <= i + d < len(words)}
+    for option in options or ():
+        contrast.update(answer_tokens(option))
+    contrast = frozenset(w for w in contrast if w not in FILLER_WORDS)
+    echo = frozenset(w for w in words if not w.isdigit() and w not in NEGATIONS and w not in contrast)
+    return echo, contrast
+
+
+@lru_cache(maxsize=65536)
+def _token_features(token: str, features: int) -> tuple:
+    """Hashed features of one word (the word and its character trigrams): indexes and signs."""
+    import numpy as np
+
+    padded = f" {token} "
+    grams = [token, *(padded[i:i + 3] for i in range(len(padded) - 2))]
+    hashes = [zlib.crc32(g.encode("utf-8")) for g in grams]
+    indexes = np.array([h % features for h in hashes], dtype=np.intp)
+    signs = np.array([1.0 if h & 0x80000000 else -1.0 for h in hashes], dtype=np.float32)
+    return indexes, signs / math.sqrt(len(grams))
+
+
+def embed(tokens: list, echo: frozenset = frozenset(), features: int = FEATURES):
+    """Unit vector of an answer, each word weighted equally (ECHO_WEIGHT for echoes); None when empty."""
+    import numpy as np
+
+    vector = np.zeros(features, dtype=np.float32)
+    for token in tokens:
+        indexes, signs = _token_features(token, features)
+        np.add.at(vector, indexes, signs * (ECHO_WEIGHT if token in echo else 1.0))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else None
+
+
+class _AnswerIndex:
+    """Embedded answers to one question and their graded results; full, the oldest answer is replaced."""
+
+    __slots__ = ("echo", "contrast", "capacity", "vectors", "signatures", "results", "size", "_next")
+
+    def __init__(self, echo: frozenset, contrast: frozenset, capacity: int, features: int):
+        import numpy as np
+
+        self.echo = echo
+        self.contrast = contrast
+        self.capacity = capacity
+        rows = min(capacity, 8)  # grows by doubling
+        self.vectors = np.zeros((rows, features), dtype=np.float32)
+        self.signatures = np.zeros(rows, dtype=np.int64)
+        self.results = []
+        self.size = 0
+        self._next = 0
+
+    def nearest(self, vector: "np.ndarray", signature: int) -> tuple:
+        """(similarity, result) of the closest answer with the same signature, or (0.0, None)."""
+        if not self.size:
+            return 0.0, None
+        similarities = self.vectors[:self.size] @ vector
+        similarities[self.signatures[:self.size] != signature] = -1.0
+        best = int(similarities.argmax())
+        if similarities[best] < 0:
+            return 0.0, None
+        return float(similarities[best]), self.results[best]
+
+    def add(self, vector: "np.ndarray", signature: int, result: dict):
+        if self.size < self.capacity:
+            if self.size == len(self.vectors):
+                import numpy as np
+
+                rows = min(self.capacity, 2 * len(self.vectors))
+                self.vectors = np.resize(self.vectors, (rows, self.vectors.shape[1]))
+                self.signatures = np.resize(self.signatures, rows)
+            slot = self.size
+            self.size += 1
+            self.results.append(result)
+        else:
+            slot = self._next
+            self._next = (self._next + 1) % self.capacity
+            self.results[slot] = result
+        self.vectors[slot] = vector
+        self.signatures[slot] = signature
+
+
+class SemanticAnswerCache:
+    """
+    Graded results of open text answers, reused for later answers to the
+    same question that only differ in wording ("six", "6 notes", "6").
+
+    Answers are normalized, embedded as hashed word and character trigram
+    features, and kept in one NumPy matrix per question, so a lookup is a
+    single matrix-vector product. The nearest earlier answer is reused when
+    its cosine similarity reaches `threshold` and it has the same numbers,
+    negation and named alternatives, the words most likely to flip a grade.
+
+    `key` identifies the question without its response (prompt, media,
+    prompt version, model); the service derives it like the exact cache key.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, max_questions: int = SEMANTIC_CACHE_MAX_QUESTIONS,
+                 max_answers: int = SEMANTIC_CACHE_MAX_ANSWERS, ttl_seconds: float = CACHE_TTL_SECONDS,
+                 features: int = FEATURES):
+        self.threshold = threshold
+        self.max_answers = max_answers
+        self.features = features
+        self._indexes = LRUCache(max_questions, ttl_seconds)
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.added = 0
+        self._hit_similarity = 0.0
+
+    @staticmethod
+    def applies(question) -> bool:
+        return question.response_type == "text" and bool(question.response_text)
+
+    def _vector(self, question, index: _AnswerIndex) -> tuple:
+        tokens = answer_tokens(question.response_text)
+        return embed(tokens, index.echo, self.features), answer_signature(tokens, index.contrast)
+
+    def lookup(self, key: str, question):
+        """Graded result of the nearest earlier answer, or None below the threshold."""
+        if not self.applies(question):
+            return None
+        self.lookups += 1
+        index = self._indexes.get(key)
+        if index is None:
+            return None
+        vector, signature = self._vector(question, index)
+        if vector is None:
+            return None
+        with self._lock:
+            similarity, result = index.nearest(vector, signature)
+        if result is None or similarity < self.threshold:
+            return None
+        self.hits += 1
+        self._hit_similarity += similarity
+        return result
+
+    def add(self, key: str, question, result: dict):
+        """Indexes a result graded by the model."""
+        if not self.applies(question):
+            return
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                echo, contrast = question_terms(question.prompt_html, question.options)
+                index = _AnswerIndex(echo, contrast, self.max_answers, self.features)
+            self._indexes.set(key, index)  # also renews the TTL
+        vector, signature = self._vector(question, index)
+        if vector is None:
+            return
+        with self._lock:
+            index.add(vector, signature, result)
+        self.added += 1
+
+    def clear(self):
+        self._indexes.clear()
+
+    def stats(self) -> dict:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_ratio": self.hits / self.lookups if self.lookups else 0.0,
+            "mean_hit_similarity": self._hit_similarity / self.hits if self.hits else 0.0,
+            "added": self.added,
+            "questions": len(self._indexes),
+            "threshold": self.threshold
+        }
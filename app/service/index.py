@@ -1,19 +1,166 @@
-import os
+import asyncio
 import json
+import logging
+import time
 from datetime import datetime
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
-from ..parser import JSONOutputParser
-from ..prompts.index import PROMPTS
-
-load_dotenv()
-
-# Initialize GPT model once
-model = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0,
-    api_key=os.getenv("OPENAI_API_KEY")
+from ..clients import ClientRegistry
+from ..compaction import QuestionCompactor
+from ..departments import DepartmentScorer, describe_match
+from ..cache import EvaluationCache, LRUCache, SQLiteBackend, make_cache_key
+from ..config import (
+    OPENAI_MODEL, LLM_PROVIDERS, LLM_TIMEOUT_SECONDS, BATCH_MAX_CONCURRENCY,
+    CACHE_ENABLED, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_BACKEND, CACHE_SQLITE_PATH, HEDGING_ENABLED,
+    MEDIA_KINDS, QUESTION_BANK_PATH, DEPARTMENT_NARRATIVE_ENABLED, HR_QUESTION_POOL_SIZE, HR_QUESTIONS_PER_REQUEST,
+    HR_QUESTION_POOL_PATH, HR_QUESTION_POOL_REFRESH_SECONDS, HR_QUESTION_POOL_WARM, SESSION_MAX_ENTRIES,
+    SESSION_TTL_SECONDS, SESSION_BACKEND, SESSION_SQLITE_PATH, SEMANTIC_CACHE_ENABLED
 )
+from ..hedging import Hedger
+from ..hr_pool import HRQuestionPool
+from ..media import MediaFetcher
+from ..models.index import QuestionEvaluationOutput, DepartmentNarrativeOutput
+from ..metrics import QuestionSpans, parses, parse_fallbacks, record_usage
+from ..parser import JSONOutputParser, IncrementalJSONParser, parse_json_object, parse_json_fast, parse_json_partial
+from ..prompts.index import PROMPTS, PROMPT_VERSIONS, compile_prompts
+from ..providers import build_provider_pool
+from ..question_bank import QuestionBank, question_fingerprint
+from ..scheduler import PriorityScheduler
+from ..semantic_cache import SemanticAnswerCache
+from ..sessions import SessionStore, SQLiteSessionBackend, SessionClosedError
+from ..store import EvaluationStore, attributed
+from ..singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Pooled HTTP clients of the LLM providers; warmed and drained by the app lifespan
+client_registry = ClientRegistry()
+
+# Initialize the model pool once; with a single provider it behaves like that model.
+# Provider SDKs are imported on first use or by load_models(), not here.
+model = build_provider_pool(LLM_PROVIDERS, client_registry)
+
+# Caps how many upstream calls this worker keeps in flight; interactive calls go first
+scheduler = PriorityScheduler()
+
+
+# Shrinks question payloads before they are sent upstream
+question_compactor = QuestionCompactor()
+
+
+# Downloads question media through one pooled HTTP client
+media_fetcher = MediaFetcher()
+
+
+# Reference answers for closed-form questions, graded without the LLM
+question_bank = QuestionBank()
+if QUESTION_BANK_PATH:
+    question_bank.load_file(QUESTION_BANK_PATH)
+
+
+# Ranks departments locally; the LLM only writes the per-department narrative
+department_scorer = DepartmentScorer()
+
+# Pre-generated reasoning and HR questions per department, sampled per request
+hr_question_pool = HRQuestionPool(
+    department_scorer.departments,
+    version=f"{PROMPT_VERSIONS['department_narrative']}:{getattr(model, 'model_name', None) or OPENAI_MODEL}"
+            f":{HR_QUESTION_POOL_SIZE}",
+    path=HR_QUESTION_POOL_PATH or None,
+    refresh_seconds=HR_QUESTION_POOL_REFRESH_SECONDS,
+    min_questions=HR_QUESTIONS_PER_REQUEST
+)
+
+
+# Every question and department result, written behind the request path
+evaluation_store = EvaluationStore()
+
+
+# Assessment sessions: answers are folded into running per-dimension scores
+session_store = SessionStore(
+    SESSION_MAX_ENTRIES, SESSION_TTL_SECONDS,
+    SQLiteSessionBackend(SESSION_SQLITE_PATH, SESSION_TTL_SECONDS) if SESSION_BACKEND == "sqlite" else None
+)
+
+
+# Opt-in hedging of question evaluation calls
+hedger = Hedger()
+
+
+# Results of deterministic (temperature=0) evaluations, keyed by content
+evaluation_cache = EvaluationCache(
+    LRUCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS),
+    SQLiteBackend(CACHE_SQLITE_PATH, CACHE_TTL_SECONDS) if CACHE_BACKEND == "sqlite" else None
+)
+
+
+# Concurrent identical evaluations share one upstream call
+inflight = SingleFlight()
+
+
+# Graded open text answers, reused for rewordings of the same answer (opt in)
+semantic_cache = SemanticAnswerCache()
+
+
+def load_models():
+    """
+    Builds the provider models, importing their SDKs, compiles the prompt
+    templates and the department matrix; blocking, so the lifespan runs it in a thread.
+    """
+    load = getattr(model, "load", None)
+    if load is not None:
+        load()
+    compile_prompts()
+    department_scorer.warm_up()
+
+
+def get_provider_stats() -> dict:
+    stats = getattr(model, "stats", None)
+    return stats() if stats else {}
+
+
+def get_model_name() -> str:
+    return getattr(model, "model_name", None) or OPENAI_MODEL
+
+
+async def _ainvoke(prompt: list, hedge: bool = False):
+    """
+    Non-blocking model call, admitted by the scheduler and bounded by a per-call
+    timeout. With `hedge` (and HEDGING_ENABLED) a slow call is raced against a duplicate,
+    which needs a free scheduler slot of its own.
+    """
+    async with scheduler.slot():
+        if hedge and HEDGING_ENABLED:
+            call = hedger.run(lambda: model.ainvoke(prompt), acquire=scheduler.try_acquire)
+        else:
+            call = model.ainvoke(prompt)
+        response = await asyncio.wait_for(call, timeout=LLM_TIMEOUT_SECONDS)
+    record_usage(response, get_model_name())
+    return response
+
+
+def _stream_event(event: tuple) -> dict:
+    if event[0] == "item":
+        _, key, index, value = event
+        return {"event": "item", "key": key, "index": index, "value": value}
+    _, key, value = event
+    return {"event": "field", "key": key, "value": value}
+
+
+async def _astream_events(prompt: list, parser: IncrementalJSONParser):
+    """
+    Streams the model output through `parser`, yielding each field / array item
+    as soon as it is complete. The timeout applies to the gap between chunks.
+    """
+    async with scheduler.slot():
+        stream = model.astream(prompt).__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(stream.__anext__(), timeout=LLM_TIMEOUT_SECONDS)
+            except StopAsyncIteration:
+                break
+            record_usage(chunk, get_model_name())
+            for event in parser.feed(chunk.content):
+                yield _stream_event(event)
+
 
 def clamp_score(value):
     if isinstance(value, int) and 1 <= value <= 10:
@@ -21,41 +168,33 @@ def clamp_score(value):
     return 5  # safe neutral fallback
 
 
-def get_today_summary(prompt: str):
-    """Handles GPT interaction and JSON parsing."""
+def _build_today_prompt(prompt: str) -> list:
     today = datetime.now().strftime("%Y-%m-%d")
+    return PROMPTS["today_summary"].render(today=today, prompt=prompt)
 
-    system_prompt = f"""
-You are a strict JSON generator. 
-Return ONLY a valid JSON object in this format:
-{{
-  "date": "YYYY-MM-DD",
-  "festivals": ["festival_name_1", "festival_name_2"],
-  "summary": "short sentence about today"
-}}
-
-Today's date is {today}. 
-User prompt: {prompt}
-"""
 
-    response = model.invoke(system_prompt)
+def get_today_summary(prompt: str):
+    """Handles GPT interaction and JSON parsing."""
+    response = model.invoke(_build_today_prompt(prompt))
+    record_usage(response, get_model_name())
     parser = JSONOutputParser()
     return parser.parse(response.content)
 
-def get_question_evaluation(question: dict):
-    response_type = question.response_type
-    response_text = question.response_text
-    response_file_url = question.response_file_url
-
 
-    question_json = json.dumps(
-    question.model_dump(mode="json"),
-    ensure_ascii=False,
-    indent=2)
+async def aget_today_summary(prompt: str):
+    """Async variant of get_today_summary built on model.ainvoke."""
+    response = await _ainvoke(_build_today_prompt(prompt))
+    parser = JSONOutputParser()
+    return parser.parse(response.content)
 
 
-    print(question_json)
+def _build_question_prompt(question) -> list:
+    response_type = question.response_type
+    response_file_url = question.response_file_url
 
+    # Compact the payload (plain-text prompt, no nulls or duplicate URLs) within the token budget
+    question_json, response_text = question_compactor.compact(question.model_dump(mode="json"))
+    logger.debug("Compacted question payload: %s", question_json)
 
     if response_type == "text":
         user_response_section = f"""
@@ -71,206 +210,419 @@ The user has submitted a file for evaluation: {response_file_url}
 (This may be an image or audio file.)
 """
 
-    # Build prompt with dynamic injected section
-    system_prompt = f"""
-You are an expert evaluator for MTNP, which produces long-form HR interpretation reports 
-based on how users visually interpret structured information. This is not a scoring system, 
-personality test, musical test, or psychometric questionnaire.
-
-{user_response_section}
-
-QUESTION DETAILS:
------------------
-{question_json}
-
-TASK:
------
-Evaluate the user's response and provide:
-1. Correctness assessment (is_correct: true/false)
-2. Brief explanation (reason)
-3. Confidence score (0 to 1)
-4. HR analysis (approach, strengths, omissions, workplace interpretation)
-
-RETURN STRICT JSON ONLY IN THIS FORMAT:
-{{
-  "confidence": 0.75,
-  "is_correct": true,
-  "reason": "brief explanation",
-  "candidates_approach": "how they approached the material",
-  "demonstrated_strengths": "what they did well",
-  "omissions_or_delays": "what they missed or delayed",
-  "hr_interpretation": "workplace implications"
-}}
-
-Output JSON only. No markdown, no comments.
-"""
+    # Static instructions go first; the per-request data goes last
+    return PROMPTS["evaluate_question"].render(
+        user_response_section=user_response_section.strip(),
+        question_json=question_json
+    )
 
-    # Call model
-    response = model.invoke(system_prompt)
 
-    # Parse JSON
-    parser = JSONOutputParser()
-    try:
-        parsed = parser.parse(response.content)
-    except:
-        raw = response.content.strip()
-        try:
-            parsed = json.loads(raw)
-        except:
-            start, end = raw.find("{"), raw.rfind("}")
-            if start != -1 and end != -1:
-                try:
-                    parsed = json.loads(raw[start:end+1])
-                except:
-                    parsed = {}
-            else:
-                parsed = {}
-
-    # Validate output
-    confidence = parsed.get("confidence")
-    is_correct = parsed.get("is_correct")
-    reason = parsed.get("reason")
-
-    # Set static cognitive dimension scores (not computed by GPT)
-    visual = 1
-    auditory = 1
-    rhythmic = 1
-    subconscious = 1
-
-    # Extract new HR analysis fields
-    candidates_approach = parsed.get("candidates_approach")
-    demonstrated_strengths = parsed.get("demonstrated_strengths")
-    omissions_or_delays = parsed.get("omissions_or_delays")
-    hr_interpretation = parsed.get("hr_interpretation")
-
-    if not isinstance(confidence, int) or not (0 <= confidence <= 1):
-        confidence = 0.5
-
-    if not isinstance(is_correct, bool):
-        is_correct = False
-
-    if not isinstance(reason, str):
-        reason = "Model returned invalid reason."
-
-    # Validate HR analysis fields
-    if not isinstance(candidates_approach, str):
-        candidates_approach = "No approach analysis available."
-
-    if not isinstance(demonstrated_strengths, str):
-        demonstrated_strengths = "No strengths analysis available."
-
-    if not isinstance(omissions_or_delays, str):
-        omissions_or_delays = "No omissions analysis available."
-
-    if not isinstance(hr_interpretation, str):
-        hr_interpretation = "No HR interpretation available."
+def _question_media_urls(question) -> list:
+    """
+    (label, url) for each media file the model should see, skipping kinds not sent
+    inline and hosts off MEDIA_ALLOWED_HOSTS: media that would be refused changes
+    neither the cache key nor whether a result is cached.
+    """
+    candidates = [
+        ("image", "Reference image for the question:", question.image_url),
+        ("audio", "Reference audio for the question:", question.audio_url)
+    ]
+    if question.response_type in ("image", "audio"):
+        candidates.append((question.response_type, "File submitted by the user:", question.response_file_url))
+
+    urls, seen = [], set()
+    for kind, label, url in candidates:
+        if url and kind in MEDIA_KINDS and str(url) not in seen and media_fetcher.allows(str(url)):
+            seen.add(str(url))
+            urls.append((label, str(url)))
+    return urls
+
+
+async def _abuild_question_prompt(question) -> tuple:
+    """
+    (messages, complete): the evaluation prompt with the question media
+    attached as multimodal content parts. Downloads start first and are in
+    flight while the text prompt is built; media that cannot be fetched is
+    left out and the model gets the URLs only, as in the text prompt.
+    `complete` is False then, and the result must not be cached.
+    """
+    urls = _question_media_urls(question)
+    if not urls:
+        return _build_question_prompt(question), True
+
+    media_task = asyncio.ensure_future(media_fetcher.fetch_many(urls))
+    await asyncio.sleep(0)  # let the downloads start (DNS lookups, connects) before building the prompt
+    messages = _build_question_prompt(question)
+    media = await media_task
+
+    if media:
+        from langchain_core.messages import HumanMessage
+
+        parts = [{"type": "text", "text": messages[-1].content}]
+        for label, item in media:
+            parts.append({"type": "text", "text": label})
+            parts.append(item.content_part())
+        messages[-1] = HumanMessage(content=parts)
+    return messages, len(media) == len(urls)
+
+
+# Static cognitive dimension scores (not computed by GPT)
+STATIC_DIMENSION_SCORES = {"visual": 1, "auditory": 1, "rhythmic": 1, "subconscious": 1}
+
+
+def _build_question_result(parsed: dict) -> dict:
+    # Validate output; invalid or missing fields fall back to defaults
+    output = QuestionEvaluationOutput.model_validate(parsed)
+    return {**output.model_dump(), **STATIC_DIMENSION_SCORES}
+
+
+def _parse_question_completion(content: str, spans: QuestionSpans) -> tuple:
+    """parse_json_object, with the fast and fallback paths timed and counted separately."""
+    parses.inc(spans.endpoint, spans.model)
+    with spans.stage("parse"):
+        parsed = parse_json_fast(content)
+    if parsed is not None:
+        return parsed, True
+
+    parse_fallbacks.inc(spans.endpoint, spans.model)
+    with spans.stage("fallback_parse"):
+        return parse_json_partial(content)
+
+
+def _finish_question(content: str, spans: QuestionSpans) -> tuple:
+    """Parses and validates a completion; returns (result, complete)."""
+    parsed, complete = _parse_question_completion(content, spans)
+    with spans.stage("post_validation"):
+        return _build_question_result(parsed), complete
+
+
+async def _abuild_question_prompt_timed(question, spans: QuestionSpans) -> tuple:
+    with spans.stage("prompt_build"):
+        return await _abuild_question_prompt(question)
+
+
+async def _acached_call(key: str, compute):
+    """Cache lookup first; misses go through single-flight so duplicates share one call."""
+    if CACHE_ENABLED:
+        cached = await evaluation_cache.aget(key)
+        if cached is not None:
+            return cached
+    return await inflight.do(key, compute)
+
+
+def _question_prompt_version(question) -> str:
+    """The prompt version, plus the media kinds sent inline: attached media changes what the model sees."""
+    version = PROMPT_VERSIONS["evaluate_question"]
+    if _question_media_urls(question):
+        version += "+media:" + ",".join(sorted(MEDIA_KINDS))
+    return version
+
+
+def _question_key(question, exclude: set = None):
+    payload = question.model_dump(mode="json", exclude=exclude)
+    return make_cache_key("evaluate_question", payload, _question_prompt_version(question), get_model_name())
 
-    return {
-        "confidence": float(confidence),
-        "is_correct": is_correct,
-        "reason": reason,
-        "visual": visual,
-        "auditory": auditory,
-        "rhythmic": rhythmic,
-        "subconscious": subconscious,
-        "candidates_approach": candidates_approach,
-        "demonstrated_strengths": demonstrated_strengths,
-        "omissions_or_delays": omissions_or_delays,
-        "hr_interpretation": hr_interpretation
-    }
 
-def get_department_recommendation(cognitive_profile: dict):
-    profile_json = json.dumps(
-        cognitive_profile,
-        ensure_ascii=False,
-        indent=2
+def _answer_index_key(question):
+    """The exact cache key without the response: one semantic answer index per question."""
+    return _question_key(question, exclude={"response_text"})
+
+
+def _similar_answer(question):
+    """Result of an earlier answer to the same question worded differently, or None."""
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    return semantic_cache.lookup(_answer_index_key(question), question)
+
+
+def _remember_answer(question, result: dict):
+    if SEMANTIC_CACHE_ENABLED:
+        semantic_cache.add(_answer_index_key(question), question, result)
+
+
+def _grade_locally(question):
+    """Result from the question bank, or None when the LLM has to grade it."""
+    result = question_bank.grade(question)
+    return {**result, **STATIC_DIMENSION_SCORES} if result else None
+
+
+def _recorded_question(question, result: dict) -> dict:
+    evaluation_store.record(
+        "question", question, result, PROMPT_VERSIONS["evaluate_question"], get_model_name(),
+        question_fingerprint(question.prompt_html, question.image_url, question.audio_url),
+        question.dimension, question.level
     )
+    return result
 
-    system_prompt = f"""
-You are an expert corporate psychologist and talent assessment specialist.
-
-Based on the following cognitive profile derived from 15 evaluation questions,
-identify the MOST SUITABLE corporate department for this user.
-
-COGNITIVE PROFILE:
-------------------
-{profile_json}
-
-Available departments:
-- Software Engineering
-- Data & Analytics
-- Product Management
-- UI/UX Design
-- Marketing & Branding
-- Sales & Business Development
-- Operations
-- HR & People Operations
-- Finance
-
-Rules:
-- Choose ONE primary department.
-- Optionally suggest one secondary department.
-- Explain reasoning clearly.
-- Then generate 8–10 relevant HR interview questions
-  tailored specifically for the selected department.
-
-RETURN STRICT JSON ONLY IN THIS FORMAT:
-{{
-  "primary_department": "",
-  "secondary_department": "",
-  "reasoning": "",
-  "hr_questions": []
-}}
-
-Do not include markdown, comments, or extra text.
-Output JSON only.
-"""
 
-    # 🔹 Call LLM
-    response = model.invoke(system_prompt)
+def get_question_evaluation(question: dict):
+    local = _grade_locally(question)
+    if local is not None:
+        return _recorded_question(question, local)
 
-    # 🔹 Parse JSON
-    parser = JSONOutputParser()
-    try:
-        parsed = parser.parse(response.content)
-    except:
-        raw = response.content.strip()
-        try:
-            parsed = json.loads(raw)
-        except:
-            start, end = raw.find("{"), raw.rfind("}")
-            if start != -1 and end != -1:
-                try:
-                    parsed = json.loads(raw[start:end + 1])
-                except:
-                    parsed = {}
-            else:
-                parsed = {}
-
-    # 🔹 Validate output
-    primary_department = parsed.get("primary_department")
-    secondary_department = parsed.get("secondary_department")
-    reasoning = parsed.get("reasoning")
-    hr_questions = parsed.get("hr_questions")
-
-    if not isinstance(primary_department, str):
-        primary_department = "Unknown"
-
-    if not isinstance(secondary_department, str):
-        secondary_department = ""
-
-    if not isinstance(reasoning, str):
-        reasoning = "Model returned insufficient reasoning."
-
-    if not isinstance(hr_questions, list):
-        hr_questions = []
-
-    # keep only string questions
-    hr_questions = [q for q in hr_questions if isinstance(q, str)]
+    key = _question_key(question)
+    cached = evaluation_cache.get(key) if CACHE_ENABLED else None
+    if cached is None:
+        cached = _similar_answer(question)
+    if cached is not None:
+        return _recorded_question(question, cached)
+
+    spans = QuestionSpans(question, get_model_name())
+    with spans.stage("prompt_build"):
+        prompt = _build_question_prompt(question)
+
+    # Call model
+    with spans.stage("llm_call"):
+        response = model.invoke(prompt)
+    record_usage(response, spans.model)
 
+    # Parse JSON
+    result, complete = _finish_question(response.content, spans)
+    complete = complete and not _question_media_urls(question)  # graded without the media it is keyed with
+
+    # Truncated or unparseable output falls back to defaults; never cache those
+    if CACHE_ENABLED and complete:
+        evaluation_cache.set(key, result)
+    if complete:
+        _remember_answer(question, result)
+    return _recorded_question(question, result)
+
+
+async def aget_question_evaluation(question: dict):
+    """Async variant of get_question_evaluation built on model.ainvoke."""
+    local = _grade_locally(question)
+    if local is not None:
+        return _recorded_question(question, local)
+
+    key = _question_key(question)
+
+    async def compute():
+        similar = _similar_answer(question)
+        if similar is not None:
+            return similar
+        spans = QuestionSpans(question, get_model_name())
+        prompt, media_complete = await _abuild_question_prompt_timed(question, spans)
+        with spans.stage("llm_call"):
+            response = await _ainvoke(prompt, hedge=True)
+        result, complete = _finish_question(response.content, spans)
+        complete = complete and media_complete
+        if CACHE_ENABLED and complete:
+            await evaluation_cache.aset(key, result)
+        if complete:
+            _remember_answer(question, result)
+        return result
+
+    return _recorded_question(question, await _acached_call(key, compute))
+
+
+async def astream_question_evaluation(question: dict):
+    """
+    Streaming variant of aget_question_evaluation.
+    Yields field events while the model writes, then the validated result.
+    """
+    key = _question_key(question)
+    result = _grade_locally(question)
+    if result is None and CACHE_ENABLED:
+        result = await evaluation_cache.aget(key)
+    if result is None:
+        result = _similar_answer(question)
+
+    if result is None:
+        spans = QuestionSpans(question, get_model_name())
+        prompt, media_complete = await _abuild_question_prompt_timed(question, spans)
+        parser = IncrementalJSONParser()
+        start = time.perf_counter()
+        async for event in _astream_events(prompt, parser):
+            yield event
+        spans.observe("llm_call", time.perf_counter() - start)
+        with spans.stage("post_validation"):
+            result = _build_question_result(parser.close())
+        if CACHE_ENABLED and parser.done and media_complete:
+            await evaluation_cache.aset(key, result)
+        if parser.done and media_complete:
+            _remember_answer(question, result)
+
+    yield {"event": "result", "value": _recorded_question(question, result)}
+
+
+def _batch_item(index: int, outcome) -> dict:
+    if isinstance(outcome, BaseException):
+        return {"index": index, "ok": False, "error": str(outcome) or type(outcome).__name__}
+    return {"index": index, "ok": True, "result": outcome}
+
+
+async def aget_question_evaluations(questions: list, max_concurrency: int = BATCH_MAX_CONCURRENCY):
+    """
+    Evaluates several questions concurrently, at most `max_concurrency` at a time.
+    One item's failure never fails the batch; results keep the input order.
+    Each question takes the single-question path, so identical questions share one upstream call.
+    """
+    batch_semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def evaluate(question):
+        async with batch_semaphore:
+            return await aget_question_evaluation(question)
+
+    outcomes = await asyncio.gather(*(evaluate(q) for q in questions), return_exceptions=True)
+    return [_batch_item(i, outcome) for i, outcome in enumerate(outcomes)]
+
+
+def _build_department_prompt(department: str) -> list:
+    return PROMPTS["department_narrative"].render(department=department, question_count=HR_QUESTION_POOL_SIZE)
+
+
+def _build_department_result(pick: dict, narrative: dict = None) -> dict:
+    # 🔹 Validate output; invalid or missing fields fall back to defaults
+    if narrative is None:
+        narrative = {"reasoning": describe_match(pick), "hr_questions": []}
+    output = DepartmentNarrativeOutput.model_validate(narrative)
     return {
-        "primary_department": primary_department,
-        "secondary_department": secondary_department,
-        "reasoning": reasoning,
-        "hr_questions": hr_questions
+        "primary_department": pick["primary_department"],
+        "secondary_department": pick["secondary_department"],
+        **output.model_dump()
     }
+
+
+def _wants_narrative(narrative: bool) -> bool:
+    return narrative and DEPARTMENT_NARRATIVE_ENABLED
+
+
+def _parse_department_pool(content: str) -> dict:
+    parsed, complete = parse_json_object(content)
+    if not complete:
+        raise ValueError("Model returned an incomplete question pool.")
+    return DepartmentNarrativeOutput.model_validate(parsed).model_dump()
+
+
+async def _agenerate_department_pool(department: str) -> dict:
+    """One LLM call for a department's reasoning and its pool of HR questions."""
+    response = await _ainvoke(_build_department_prompt(department))
+    return _parse_department_pool(response.content)
+
+
+def start_hr_question_pool():
+    """Warms missing pools and schedules the periodic refresh; called on startup."""
+    if DEPARTMENT_NARRATIVE_ENABLED:
+        hr_question_pool.start(_agenerate_department_pool, warm=HR_QUESTION_POOL_WARM)
+
+
+def _sample_questions(pick: dict, cognitive_profile: dict):
+    # The same profile always draws the same questions
+    seed = json.dumps(cognitive_profile, sort_keys=True)
+    return hr_question_pool.sample(pick["primary_department"], HR_QUESTIONS_PER_REQUEST, seed)
+
+
+def _recorded_department(cognitive_profile: dict, result: dict, narrative: bool) -> dict:
+    # Ranking alone involves no prompt or model
+    evaluation_store.record(
+        "department", cognitive_profile, result,
+        PROMPT_VERSIONS["department_narrative"] if narrative else None, get_model_name() if narrative else None
+    )
+    return result
+
+
+def get_department_recommendation(cognitive_profile: dict, narrative: bool = True):
+    pick = department_scorer.rank([cognitive_profile])[0]
+    if not _wants_narrative(narrative):
+        return _recorded_department(cognitive_profile, _build_department_result(pick), False)
+
+    department = pick["primary_department"]
+    if not hr_question_pool.is_warm(department):
+        # 🔹 Cold pool: generate it once with the LLM
+        response = model.invoke(_build_department_prompt(department))
+        record_usage(response, get_model_name())
+        hr_question_pool.put(department, _parse_department_pool(response.content))
+    result = _build_department_result(pick, _sample_questions(pick, cognitive_profile))
+    return _recorded_department(cognitive_profile, result, True)
+
+
+async def aget_department_recommendation(cognitive_profile: dict, narrative: bool = True):
+    """
+    Async variant of get_department_recommendation. Never waits on the LLM: while
+    a department's pool is cold it is generated in the background, and the
+    result carries the describe_match reasoning and no questions.
+    """
+    pick = department_scorer.rank([cognitive_profile])[0]
+    if not _wants_narrative(narrative):
+        return _recorded_department(cognitive_profile, _build_department_result(pick), False)
+
+    hr_question_pool.ensure(pick["primary_department"], _agenerate_department_pool)
+    result = _build_department_result(pick, _sample_questions(pick, cognitive_profile))
+    return _recorded_department(cognitive_profile, result, True)
+
+
+async def aget_department_recommendations(cognitive_profiles: list, narrative: bool = False) -> list:
+    """
+    Ranks every profile in one vectorized pass. With `narrative`, questions are
+    sampled from the department pools; cold pools fall back as in
+    aget_department_recommendation and are generated in the background.
+    """
+    picks = department_scorer.rank(cognitive_profiles)
+    narrative = _wants_narrative(narrative)
+    if narrative:
+        for department in dict.fromkeys(pick["primary_department"] for pick in picks):
+            hr_question_pool.ensure(department, _agenerate_department_pool)
+    return [
+        _recorded_department(
+            profile, _build_department_result(pick, _sample_questions(pick, profile) if narrative else None), narrative
+        )
+        for pick, profile in zip(picks, cognitive_profiles)
+    ]
+
+
+async def astream_department_recommendation(cognitive_profile: dict, narrative: bool = True):
+    """
+    Streaming variant of aget_department_recommendation.
+    The department picks are yielded at once, then the sampled HR questions.
+    """
+    pick = department_scorer.rank([cognitive_profile])[0]
+    yield {"event": "field", "key": "primary_department", "value": pick["primary_department"]}
+    yield {"event": "field", "key": "secondary_department", "value": pick["secondary_department"]}
+
+    if not _wants_narrative(narrative):
+        result = _build_department_result(pick)
+        yield {"event": "result", "value": _recorded_department(cognitive_profile, result, False)}
+        return
+
+    hr_question_pool.ensure(pick["primary_department"], _agenerate_department_pool)
+    result = _build_department_result(pick, _sample_questions(pick, cognitive_profile))
+    yield {"event": "field", "key": "reasoning", "value": result["reasoning"]}
+    for index, question in enumerate(result["hr_questions"]):
+        yield {"event": "item", "key": "hr_questions", "index": index, "value": question}
+    yield {"event": "result", "value": _recorded_department(cognitive_profile, result, True)}
+
+
+async def acreate_session(candidate_id: str = None) -> dict:
+    session = await session_store.acreate(candidate_id)
+    return session.summary()
+
+
+async def aget_session(session_id: str) -> dict:
+    session = await session_store.aget(session_id)
+    return session.summary()
+
+
+async def aadd_session_answer(session_id: str, question) -> dict:
+    """
+    Evaluates one answer and folds it into the session's running profile. Answering
+    the same question again replaces the earlier answer, so a retried request is not counted twice.
+    """
+    session = await session_store.aget(session_id)
+    if session.finalized:
+        raise SessionClosedError(f"Session {session_id} is already finalized.")
+    with attributed(session.candidate_id, session_id):
+        result = await aget_question_evaluation(question)
+    key = question_fingerprint(question.prompt_html, question.image_url, question.audio_url)
+    session = await session_store.aadd_answer(session_id, key, question.dimension, question.level, result)
+    return {**session.summary(), "result": result}
+
+
+async def afinalize_session(session_id: str, narrative: bool = True) -> dict:
+    """Recommends departments from the session's profile; finalizing twice returns the first result."""
+    session = await session_store.aget(session_id)
+    if session.finalized:
+        return session.summary()
+    with attributed(session.candidate_id, session_id):
+        recommendation = await aget_department_recommendation(session.profile(), narrative)
+    session = await session_store.afinalize(session_id, recommendation)
+    return session.summary()
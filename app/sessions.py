@@ -0,0 +1,268 @@
+import asyncio
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from array import array
+from .cache import LRUCache
+from .departments import DIMENSIONS
+
+# 🔹 How an evaluated answer moves its dimension's score (0-10, like CognitiveProfile)
+MAX_SCORE = 10.0
+NEUTRAL_SCORE = 5.0  # dimensions without answers yet
+LEVEL_WEIGHTS = {"basic": 1.0, "intermediate": 1.5, "advanced": 2.0}
+
+
+class SessionNotFoundError(KeyError):
+    pass
+
+
+class SessionClosedError(Exception):
+    """The session was finalized; it takes no more answers."""
+
+
+class AssessmentSession:
+    """
+    Running per-dimension scores of one candidate's assessment.
+
+    Each answer adds MAX_SCORE (correct) or 0 to its dimension, weighted by
+    the evaluator's confidence and the question level. The profile is read
+    from weighted sums, so adding an answer and reading the profile are both
+    O(1) however many answers there are.
+
+    Answers are keyed by question fingerprint: answering a question again
+    (a client retry, a corrected answer) replaces its earlier contribution
+    instead of counting twice.
+    """
+
+    __slots__ = ("session_id", "candidate_id", "created_at", "updated_at", "answers", "_weights", "_totals",
+                 "_confidence_total", "_contributions", "result")
+
+    def __init__(self, session_id: str, candidate_id: str = None):
+        self.session_id = session_id
+        self.candidate_id = candidate_id
+        self.created_at = self.updated_at = time.time()
+        self.answers = 0
+        self._weights = array("d", [0.0] * len(DIMENSIONS))  # sum of weights per dimension
+        self._totals = array("d", [0.0] * len(DIMENSIONS))  # sum of weight * score per dimension
+        self._confidence_total = 0.0
+        self._contributions = {}  # question fingerprint -> [dimension index, weight, weight * score, confidence]
+        self.result = None  # department recommendation, once finalized
+
+    @property
+    def finalized(self) -> bool:
+        return self.result is not None
+
+    def add_answer(self, key: str, dimension: str, level: str, is_correct: bool, confidence: float) -> bool:
+        """Adds the answer to question `key`, replacing an earlier one; True when it replaced."""
+        if self.finalized:
+            raise SessionClosedError(f"Session {self.session_id} is already finalized.")
+        previous = self._contributions.get(key)
+        if previous is not None:
+            j, weight, total, previous_confidence = previous
+            self._weights[j] -= weight
+            self._totals[j] -= total
+            self._confidence_total -= previous_confidence
+            if self._weights[j] < 1e-9:  # no weight left: drop the rounding residue
+                self._weights[j] = self._totals[j] = 0.0
+        else:
+            self.answers += 1
+        i = DIMENSIONS.index(dimension)
+        weight = confidence * LEVEL_WEIGHTS.get(level, 1.0)
+        total = weight * (MAX_SCORE if is_correct else 0.0)
+        self._weights[i] += weight
+        self._totals[i] += total
+        self._confidence_total += confidence
+        self._contributions[key] = [i, weight, total, confidence]
+        self.updated_at = time.time()
+        return previous is not None
+
+    def profile(self) -> dict:
+        """The CognitiveProfile so far: confidence-weighted mean per dimension, mean confidence."""
+        profile = {
+            d: round(self._totals[i] / self._weights[i], 2) if self._weights[i] else NEUTRAL_SCORE
+            for i, d in enumerate(DIMENSIONS)
+        }
+        profile["confidence"] = round(self._confidence_total / self.answers, 2) if self.answers else 0.0
+        return profile
+
+    def finalize(self, result: dict) -> dict:
+        """Stores the recommendation; a session finalized concurrently keeps its first result."""
+        if self.result is None:
+            self.result = result
+            self.updated_at = time.time()
+        return self.result
+
+    def summary(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "candidate_id": self.candidate_id,
+            "answers": self.answers,
+            "finalized": self.finalized,
+            "profile": self.profile(),
+            "recommendation": self.result
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "candidate_id": self.candidate_id,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "answers": self.answers,
+            "weights": list(self._weights),
+            "totals": list(self._totals),
+            "confidence_total": self._confidence_total,
+            "contributions": self._contributions,
+            "result": self.result
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "AssessmentSession":
+        session = cls(state["session_id"], state.get("candidate_id"))
+        session.created_at = state["created_at"]
+        session.updated_at = state["updated_at"]
+        session.answers = state["answers"]
+        session._weights = array("d", state["weights"])
+        session._totals = array("d", state["totals"])
+        session._confidence_total = state["confidence_total"]
+        session._contributions = state.get("contributions", {})
+        session.result = state["result"]
+        return session
+
+
+class SQLiteSessionBackend:
+    """
+    Sessions in a local SQLite file, so they survive restarts and every
+    uvicorn worker on the host sees the same state. Updates run in one
+    write transaction, so concurrent answers are never lost.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _get(self, session_id: str):
+        row = self._conn.execute(
+            "SELECT state FROM sessions WHERE session_id = ? AND expires_at > ?", (session_id, time.time())
+        ).fetchone()
+        return AssessmentSession.from_dict(json.loads(row[0])) if row else None
+
+    def _put(self, session: AssessmentSession):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, state, expires_at) VALUES (?, ?, ?)",
+            (session.session_id, json.dumps(session.to_dict(), ensure_ascii=False), time.time() + self.ttl_seconds)
+        )
+
+    def get(self, session_id: str):
+        with self._lock:
+            return self._get(session_id)
+
+    def put(self, session: AssessmentSession):
+        with self._lock:
+            self._put(session)
+
+    def update(self, session_id: str, apply):
+        """Runs `apply(session)` inside a write transaction; returns (session, its result)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                session = self._get(session_id)
+                if session is None:
+                    raise SessionNotFoundError(session_id)
+                outcome = apply(session)
+                self._put(session)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return session, outcome
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+class SessionStore:
+    """
+    Assessment sessions, in process (an LRU with TTL) or in a shared backend.
+
+    With a backend the backend is the only copy, so workers never act on a
+    stale session. Backend I/O runs off the event loop.
+    """
+
+    def __init__(self, max_sessions: int, ttl_seconds: float, backend: SQLiteSessionBackend = None):
+        self.local = LRUCache(max_sessions, ttl_seconds)
+        self.backend = backend
+        self.created = 0
+        self.answers = 0
+        self.replaced = 0
+        self.finalized = 0
+
+    async def acreate(self, candidate_id: str = None) -> AssessmentSession:
+        session = AssessmentSession(secrets.token_urlsafe(16), candidate_id)
+        if self.backend is not None:
+            await asyncio.to_thread(self.backend.put, session)
+        else:
+            self.local.set(session.session_id, session)
+        self.created += 1
+        return session
+
+    async def aget(self, session_id: str) -> AssessmentSession:
+        if self.backend is not None:
+            session = await asyncio.to_thread(self.backend.get, session_id)
+        else:
+            session = self.local.get(session_id)
+        if session is None:
+            raise SessionNotFoundError(session_id)
+        return session
+
+    async def aupdate(self, session_id: str, apply) -> tuple:
+        """Applies `apply(session)` atomically; returns (session, its result)."""
+        if self.backend is not None:
+            return await asyncio.to_thread(self.backend.update, session_id, apply)
+        session = await self.aget(session_id)
+        outcome = apply(session)
+        self.local.set(session_id, session)  # also renews the TTL
+        return session, outcome
+
+    async def aadd_answer(self, session_id: str, key: str, dimension: str, level: str,
+                          result: dict) -> AssessmentSession:
+        """Adds the answer to question `key`; a repeated answer replaces the earlier one."""
+        session, replaced = await self.aupdate(
+            session_id, lambda s: s.add_answer(key, dimension, level, result["is_correct"], result["confidence"])
+        )
+        self.answers += 1
+        self.replaced += replaced
+        return session
+
+    async def afinalize(self, session_id: str, result: dict) -> AssessmentSession:
+        session, _ = await self.aupdate(session_id, lambda s: s.finalize(result))
+        self.finalized += 1
+        return session
+
+    def stats(self) -> dict:
+        return {
+            "created": self.created,
+            "answers": self.answers,
+            "replaced": self.replaced,
+            "finalized": self.finalized,
+            "sessions": len(self.local) if self.backend is None else len(self.backend),
+            "backend": type(self.backend).__name__ if self.backend is not None else None
+        }
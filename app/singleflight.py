@@ -0,0 +1,38 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into one upstream call.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task instead of starting their own.
+    """
+
+    def __init__(self):
+        self._inflight = {}  # key -> asyncio.Task
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key: str, compute):
+        """Returns the result of `compute()`, sharing it with concurrent callers of `key`."""
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.collapsed += 1
+
+        # Shielded so one cancelled caller does not cancel the work for the others
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        total = self.calls + self.collapsed
+        return {
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "collapse_ratio": self.collapsed / total if total else 0.0,
+            "in_flight": len(self._inflight)
+        }
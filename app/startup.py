@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """
+    Warm-up steps run in the background once the app serves requests, and
+    the state the readiness probe reports.
+
+    The worker is ready once every step has run. A step that fails is logged
+    and does not hold readiness back: requests still do that work on first
+    use, only slower.
+    """
+
+    def __init__(self):
+        self.started_at = None
+        self.ready_at = None
+        self.steps = {}  # step name -> seconds taken, or None if it failed
+        self._task = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    def start(self, steps: list):
+        """`steps` are (name, async callable) pairs, run one after the other."""
+        if self._task is None:
+            self.started_at = time.monotonic()
+            self.ready_at = None
+            self.steps = {}
+            self._task = asyncio.create_task(self._run(steps))
+
+    async def _run(self, steps: list):
+        for name, step in steps:
+            start = time.perf_counter()
+            try:
+                await step()
+                self.steps[name] = time.perf_counter() - start
+            except Exception as e:
+                logger.warning("Warm-up step %s failed: %s", name, e)
+                self.steps[name] = None
+        self.ready_at = time.monotonic()
+
+    async def stop(self):
+        """Cancels unfinished warm-up on shutdown."""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "seconds_to_ready": self.ready_at - self.started_at if self.ready else None,
+            "steps": dict(self.steps),
+            "failed_steps": sum(1 for seconds in self.steps.values() if seconds is None)
+        }
@@ -0,0 +1,218 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .config import (
+    EVALUATION_STORE_PATH, EVALUATION_STORE_BATCH_SIZE, EVALUATION_STORE_FLUSH_SECONDS, EVALUATION_STORE_QUEUE_SIZE
+)
+
+# (candidate_id, session_id) the evaluations recorded in this context belong to; set by the router
+attribution = ContextVar("attribution", default=(None, None))
+
+_STOP = object()
+
+_COLUMNS = (
+    "created_at", "kind", "candidate_id", "session_id", "fingerprint", "dimension", "level",
+    "prompt_version", "model", "request", "result"
+)
+
+# 🔹 Filters accepted by iter_results, each backed by an index
+FILTERS = ("kind", "candidate_id", "session_id", "fingerprint", "dimension", "level", "prompt_version")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS evaluations ("
+    "id INTEGER PRIMARY KEY, created_at REAL NOT NULL, kind TEXT NOT NULL, candidate_id TEXT, session_id TEXT, "
+    "fingerprint TEXT, dimension TEXT, level TEXT, prompt_version TEXT, model TEXT, "
+    "request TEXT NOT NULL, result TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS evaluations_candidate ON evaluations (candidate_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS evaluations_session ON evaluations (session_id)",
+    "CREATE INDEX IF NOT EXISTS evaluations_fingerprint ON evaluations (fingerprint, prompt_version)",
+    "CREATE INDEX IF NOT EXISTS evaluations_dimension ON evaluations (dimension, level)",
+    "CREATE INDEX IF NOT EXISTS evaluations_prompt_version ON evaluations (prompt_version, kind)",
+)
+
+
+@contextmanager
+def attributed(candidate_id: str = None, session_id: str = None):
+    """Attributes the evaluations recorded inside the block to a candidate and / or session."""
+    token = attribution.set((candidate_id, session_id))
+    try:
+        yield
+    finally:
+        attribution.reset(token)
+
+
+def _to_json(value) -> str:
+    if hasattr(value, "model_dump"):
+        value = value.model_dump(mode="json")
+    return json.dumps(value, ensure_ascii=False)
+
+
+class EvaluationStore:
+    """
+    Every evaluation result, kept in a local SQLite file (WAL mode).
+
+    record() only enqueues; a background thread serializes the rows and
+    writes them in batches of up to `batch_size`, one transaction each,
+    so requests never wait on disk. When the queue is full, rows are
+    dropped and counted rather than slowing requests down.
+
+    Without a path the store records nothing.
+    """
+
+    def __init__(self, path: str = EVALUATION_STORE_PATH, batch_size: int = EVALUATION_STORE_BATCH_SIZE,
+                 flush_seconds: float = EVALUATION_STORE_FLUSH_SECONDS, max_queue: int = EVALUATION_STORE_QUEUE_SIZE):
+        self.path = path or None
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._writer = None
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+
+    def record(self, kind: str, request, result: dict, prompt_version: str = None, model: str = None,
+               fingerprint: str = None, dimension: str = None, level: str = None):
+        """Queues one result; `request` may be a dict or a Pydantic model."""
+        if self.path is None:
+            return
+        self._ensure_writer()
+        candidate_id, session_id = attribution.get()
+        row = (time.time(), kind, candidate_id, session_id, fingerprint, dimension, level, prompt_version, model,
+               request, result)
+        try:
+            self._queue.put_nowait(row)
+            self.recorded += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="evaluation-store", daemon=True)
+                self._writer.start()
+
+    def _run(self):
+        conn = self._connect()
+        conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL; a crash loses at most the last batches
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(conn, batch)
+            for _ in range(len(batch) + stopping):
+                self._queue.task_done()
+        conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: list):
+        try:
+            rows = [(*row[:-2], _to_json(row[-2]), _to_json(row[-1])) for row in batch]
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO evaluations ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    rows
+                )
+            self.written += len(rows)
+            self.batches += 1
+        except (sqlite3.Error, TypeError, ValueError):
+            self.write_errors += len(batch)
+
+    def flush(self):
+        """Blocks until every queued row is written."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        """Writes what is queued and stops the writer; called on shutdown."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(_STOP)
+            writer.join()
+
+    def iter_results(self, since: float = None, limit: int = None, fetch_size: int = 500, **filters):
+        """
+        Yields stored results oldest first, `fetch_size` rows at a time, so an
+        export never holds more than one chunk in memory. Filters are FILTERS
+        columns (exact match) plus `since` (a Unix timestamp).
+        """
+        if self.path is None:
+            return
+        clauses, params = [], []
+        for column in FILTERS:
+            if filters.get(column) is not None:
+                clauses.append(f"{column} = ?")
+                params.append(filters[column])
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        sql = f"SELECT id, {', '.join(_COLUMNS)} FROM evaluations"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        conn = self._connect()
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    item = dict(zip(("id", *_COLUMNS), row))
+                    item["request"] = json.loads(item["request"])
+                    item["result"] = json.loads(item["result"])
+                    yield item
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.path is not None,
+            "recorded": self.recorded,
+            "written": self.written,
+            "batches": self.batches,
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+            "write_errors": self.write_errors
+        }
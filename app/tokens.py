@@ -0,0 +1,37 @@
+import logging
+import os
+import threading
+from .config import TOKENIZER_ENCODING, TOKENIZER_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+_encoding = None
+_encoding_loaded = False
+_lock = threading.Lock()
+
+
+def load_encoding():
+    """
+    Loads the tiktoken encoding once. The first load may download it into
+    TOKENIZER_CACHE_DIR, so call this off the event loop (the lifespan
+    warm-up does). Returns None when it is not available.
+    """
+    global _encoding, _encoding_loaded
+    with _lock:
+        if not _encoding_loaded:
+            try:
+                if TOKENIZER_CACHE_DIR:
+                    os.environ.setdefault("TIKTOKEN_CACHE_DIR", TOKENIZER_CACHE_DIR)
+                import tiktoken
+                _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+            except Exception as e:
+                logger.warning("Tokenizer %s unavailable, estimating tokens from length: %s", TOKENIZER_ENCODING, e)
+            _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Exact once load_encoding has run; until then (or without tiktoken) estimated from the length."""
+    if _encoding is None:
+        return (len(text) + 3) // 4  # ~4 characters per token for English text
+    return len(_encoding.encode(text, disallowed_special=()))
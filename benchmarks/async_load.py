@@ -0,0 +1,85 @@
+"""
+Compares the blocking and async service layers under concurrent load.
+
+Both runs drive POST /api/py/question through the ASGI app with a
+FakeChatModel in place of ChatOpenAI. The "blocking" run restores the old
+behaviour by routing the handler through the sync get_question_evaluation.
+
+Usage:
+    python -m benchmarks.async_load --requests 200 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["CACHE_ENABLED"] = "false"  # identical payloads would otherwise be served from cache
+os.environ["RATE_LIMIT_ENABLED"] = "false"  # one client would exhaust its quota
+os.environ["EVALUATION_STORE_PATH"] = ""  # keep fake results out of the evaluation store
+
+import httpx
+from app.main import app
+from app.router import index as router_module
+from app.service import index as service
+from benchmarks.fake_llm import FakeChatModel
+
+
+PAYLOAD = {
+    "question": {
+        "dimension": "visual",
+        "level": "basic",
+        "type": "text",
+        "prompt_html": "Look at this 4-bar melody in C major. Count how many notes move by step.",
+        "image_url": "https://example.com/image.png",
+        "audio_url": None,
+        "options": None,
+        "response_type": "text",
+        "response_text": "6",
+        "response_file_url": None
+    }
+}
+
+
+async def _blocking_evaluation(question):
+    return service.get_question_evaluation(question)
+
+
+async def run(requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post("/api/py/question", json=PAYLOAD) for _ in range(requests)
+        ))
+        elapsed = time.perf_counter() - start
+
+    failed = sum(1 for r in responses if r.status_code != 200)
+    if failed:
+        print(f"  {failed} requests failed")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency in seconds")
+    args = parser.parse_args()
+
+    service.model = FakeChatModel(latency=args.latency)
+
+    async_handler = router_module.aget_question_evaluation
+    results = {}
+    for label, handler in (("blocking", _blocking_evaluation), ("async", async_handler)):
+        router_module.aget_question_evaluation = handler
+        elapsed = asyncio.run(run(args.requests))
+        results[label] = elapsed
+        print(f"{label:>8}: {args.requests} requests in {elapsed:.2f}s ({args.requests / elapsed:.1f} req/s)")
+    router_module.aget_question_evaluation = async_handler
+
+    print(f"speedup: {results['blocking'] / results['async']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
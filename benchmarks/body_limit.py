@@ -0,0 +1,100 @@
+"""
+Memory and throughput of the request body limit under oversized-payload abuse.
+
+Sends `--clients` concurrent uploads of `--size-mb` straight to the ASGI app,
+once with a Content-Length header and once chunked, through:
+  legacy    the old BaseHTTPMiddleware that awaited request.body() first
+  streaming BodySizeLimitMiddleware
+
+Usage:
+    python -m benchmarks.body_limit --clients 20 --size-mb 20
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.middleware import BodySizeLimitMiddleware
+
+LIMIT = 1024 * 1024
+CHUNK = b"x" * 65536
+
+
+def build_app(mode: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(payload: dict):
+        return {"keys": len(payload)}
+
+    if mode == "legacy":
+        @app.middleware("http")
+        async def limit_payload_size(request: Request, call_next):
+            body = await request.body()
+            if len(body) > LIMIT:
+                return JSONResponse(status_code=413, content={"detail": "Payload too large (limit 1 MB)"})
+            return await call_next(request)
+    else:
+        app.add_middleware(BodySizeLimitMiddleware, max_body_size=LIMIT)
+    return app
+
+
+async def upload(app, size: int, declare_length: bool) -> int:
+    chunks = size // len(CHUNK)
+    sent = 0
+    status = 0
+    headers = [(b"content-type", b"application/json")]
+    if declare_length:
+        headers.append((b"content-length", str(chunks * len(CHUNK)).encode()))
+    scope = {"type": "http", "method": "POST", "path": "/echo", "raw_path": b"/echo", "query_string": b"",
+             "headers": headers, "http_version": "1.1", "scheme": "http", "server": ("bench", 80),
+             "client": ("127.0.0.1", 1), "root_path": "", "asgi": {"version": "3.0"}}
+
+    async def receive():
+        nonlocal sent
+        if sent >= chunks:
+            await asyncio.sleep(3600)  # body exhausted: wait for "disconnect"
+        sent += 1
+        await asyncio.sleep(0)
+        return {"type": "http.request", "body": CHUNK, "more_body": sent < chunks}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(app, clients: int, size: int, declare_length: bool) -> list:
+    return await asyncio.gather(*(upload(app, size, declare_length) for _ in range(clients)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--size-mb", type=int, default=20)
+    args = parser.parse_args()
+    size = args.size_mb * 1024 * 1024
+
+    print(f"{'middleware':<10} {'header':<15} {'seconds':>8} {'peak MB':>8} {'statuses'}")
+    for mode in ("legacy", "streaming"):
+        for declare_length in (True, False):
+            app = build_app(mode)
+            tracemalloc.start()
+            start = time.perf_counter()
+            statuses = asyncio.run(run(app, args.clients, size, declare_length))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            header = "content-length" if declare_length else "chunked"
+            print(f"{mode:<10} {header:<15} {elapsed:>8.2f} {peak / 2**20:>8.1f} {sorted(set(statuses))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+TLS handshakes and latency of LLM calls: the OpenAI SDK's default HTTP
+client vs the app's ClientRegistry pool.
+
+Runs a local HTTPS server, on its own event loop, that answers
+/v1/chat/completions like OpenAI after `--latency` seconds and counts
+the TLS connections it accepts. A localhost handshake is nearly free, so
+the first response on every new connection is delayed by `--setup`
+seconds, the TCP and TLS round trips a remote endpoint costs.
+
+Calls arrive through ChatOpenAI at `--rate` per second in `--bursts`
+bursts of `--burst-seconds`, with an idle `--gap` between them, as bursty
+production traffic does. The SDK default keeps idle connections for 5
+seconds, so after a pause calls pay for new handshakes; the registry is
+warmed up and keeps its pool open longer.
+
+Usage:
+    python -m benchmarks.connection_pool --rate 200 --bursts 4 --gap 6 --setup 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import openai
+from langchain_openai import ChatOpenAI
+from app.clients import ClientRegistry
+from app.providers import percentile
+from benchmarks.fake_llm import QUESTION_RESPONSE
+
+
+def self_signed_cert(directory: str) -> tuple:
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1", "-keyout", key, "-out", cert],
+        check=True, capture_output=True
+    )
+    return cert, key
+
+
+class MockOpenAI:
+    """HTTP/1.1 keep-alive server with a canned chat completion; counts accepted TLS connections."""
+
+    def __init__(self, latency: float, setup: float):
+        self.latency = latency
+        self.setup = setup
+        self.handshakes = 0
+        body = {
+            "id": "chatcmpl-mock", "object": "chat.completion", "created": 0, "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": json.dumps(QUESTION_RESPONSE)}}],
+            "usage": {"prompt_tokens": 200, "completion_tokens": 80, "total_tokens": 280}
+        }
+        self._body = json.dumps(body).encode()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.handshakes += 1
+        delay = self.setup  # paid once, by the first request on the connection
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                if not head.startswith(b"HEAD"):
+                    delay += self.latency
+                await asyncio.sleep(delay)
+                delay = 0.0
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\n"
+                    b"content-length: " + str(len(self._body)).encode() + b"\r\n\r\n"
+                    + (b"" if head.startswith(b"HEAD") else self._body)
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def serve(mock: MockOpenAI, cert: str, key: str) -> int:
+    """Starts the mock server on a daemon thread with its own event loop; returns its port."""
+    started = threading.Event()
+    port = []
+
+    async def run_server():
+        ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ctx.load_cert_chain(cert, key)
+        server = await asyncio.start_server(mock.handle, "127.0.0.1", 0, ssl=ctx, backlog=1024)
+        port.append(server.sockets[0].getsockname()[1])
+        started.set()
+        await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(run_server(),), daemon=True).start()
+    started.wait()
+    return port[0]
+
+
+async def drive(model, args) -> list:
+    latencies = []
+
+    async def call():
+        start = time.perf_counter()
+        await model.ainvoke("Evaluate the answer.")
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    for i in range(args.bursts):
+        if i:
+            await asyncio.sleep(args.gap)
+        for _ in range(int(args.rate * args.burst_seconds)):
+            tasks.append(asyncio.create_task(call()))
+            await asyncio.sleep(1 / args.rate)
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+async def run(args, use_registry: bool, cert: str, key: str) -> dict:
+    mock = MockOpenAI(args.latency, args.setup)
+    base_url = f"https://localhost:{serve(mock, cert, key)}/v1"
+
+    registry = None
+    if use_registry:
+        registry = ClientRegistry(warmup_connections=args.warmup, verify=cert)
+        http_client = registry.async_client("openai", base_url)
+        await registry.warm_up()
+    else:
+        http_client = openai.DefaultAsyncHttpxClient(verify=cert)
+    model = ChatOpenAI(model="gpt-4o-mini", api_key="sk-benchmark", base_url=base_url, http_async_client=http_client)
+
+    warmup_handshakes = mock.handshakes
+    latencies = await drive(model, args)
+    result = {
+        "calls": len(latencies),
+        "handshakes": mock.handshakes - warmup_handshakes,
+        "warmup_handshakes": warmup_handshakes,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000
+    }
+    if registry is not None:
+        await registry.aclose()
+    else:
+        await http_client.aclose()
+    return result
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = self_signed_cert(directory)
+        print(f"{args.rate:g} calls/s in {args.bursts} bursts of {args.burst_seconds:g}s, {args.gap:g}s apart, "
+              f"{args.latency * 1000:.0f}ms server latency, {args.setup * 1000:.0f}ms connection setup")
+        for use_registry in (False, True):
+            r = await run(args, use_registry, cert, key)
+            label = "registry" if use_registry else "sdk default"
+            print(f"  {label:<12} handshakes {r['handshakes']:>5} (+{r['warmup_handshakes']} at warm-up)  "
+                  f"p50 {r['p50_ms']:>7.1f}ms  p99 {r['p99_ms']:>7.1f}ms  calls {r['calls']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=200, help="calls per second during a burst")
+    parser.add_argument("--bursts", type=int, default=4)
+    parser.add_argument("--burst-seconds", type=float, default=2.0)
+    parser.add_argument("--gap", type=float, default=6.0, help="idle seconds between bursts")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock server latency in seconds")
+    parser.add_argument("--setup", type=float, default=0.1, help="extra delay on a new connection, in seconds")
+    parser.add_argument("--warmup", type=int, default=32, help="connections the registry opens up front")
+    asyncio.run(main(parser.parse_args()))
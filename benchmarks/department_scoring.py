@@ -0,0 +1,88 @@
+"""
+Compares department recommendation paths for a bulk of cognitive profiles.
+
+"llm" is the old behaviour: one model call per profile to pick the department.
+"local" ranks every profile with one NumPy matrix product; "local+narrative"
+also samples HR questions from the per-department pools. Cold pools do not
+hold the request up: they are generated in the background, at most nine
+model calls, and "pools ready" is when the last one is in.
+
+Usage:
+    python -m benchmarks.department_scoring --profiles 2000 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["HR_QUESTION_POOL_PATH"] = ""  # keep fake questions out of the real pool file
+os.environ["EVALUATION_STORE_PATH"] = ""  # keep fake results out of the evaluation store
+
+from app.service import index as service
+from benchmarks.fake_llm import FakeChatModel
+
+
+def make_profiles(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        {"visual": rng.uniform(0, 10), "auditory": rng.uniform(0, 10), "rhythmic": rng.uniform(0, 10),
+         "subconscious": rng.uniform(0, 10), "confidence": rng.random()}
+        for _ in range(count)
+    ]
+
+
+async def per_profile_llm(profiles: list):
+    """
+    One upstream call per profile, as the endpoint did before local scoring.
+    At most the scheduler's capacity in flight, so the bulk is not shed as queue_full.
+    """
+    semaphore = asyncio.Semaphore(service.scheduler.capacity)
+
+    async def one(profile):
+        async with semaphore:
+            await service._ainvoke(service._build_department_prompt(str(profile)))
+
+    await asyncio.gather(*(one(p) for p in profiles))
+
+
+async def main(count: int, latency: float):
+    fake = FakeChatModel(latency=latency)
+    service.model = fake
+    profiles = make_profiles(count)
+    service.department_scorer.warm_up()  # NumPy import, done by the lifespan in the app
+
+    start = time.perf_counter()
+    await per_profile_llm(profiles)
+    timings = {"llm": (time.perf_counter() - start, fake.calls)}
+
+    fake.calls = 0
+    start = time.perf_counter()
+    await service.aget_department_recommendations(profiles, narrative=False)
+    timings["local"] = (time.perf_counter() - start, fake.calls)
+
+    start = time.perf_counter()
+    await service.aget_department_recommendations(profiles, narrative=True)
+    timings["local+narrative"] = (time.perf_counter() - start, fake.calls)
+    await service.hr_question_pool.warm(service._agenerate_department_pool)  # joins the running generations
+    timings["pools ready"] = (time.perf_counter() - start, fake.calls)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        service.department_scorer.rank(profiles[:1])
+    single = (time.perf_counter() - start) / 1000 * 1e6
+
+    print(f"{count} profiles, fake model latency {latency * 1000:.0f}ms")
+    for name, (seconds, calls) in timings.items():
+        print(f"  {name:<16} {seconds:8.3f}s  {calls:>6} model calls")
+    print(f"  single profile rank: {single:.1f}µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.profiles, args.latency))
@@ -0,0 +1,139 @@
+"""
+Local stand-in for ChatOpenAI used by the benchmarks.
+
+Answers every prompt with a canned JSON payload that matches the endpoint
+the prompt was built for, after a sampled latency. Latencies, injected
+errors and malformed outputs come from a seeded RNG, so a run with the same
+settings draws the same sequence.
+"""
+
+import asyncio
+import json
+import random
+import time
+from pydantic import PrivateAttr
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+QUESTION_RESPONSE = {
+    "confidence": 0.9,
+    "is_correct": True,
+    "reason": "The user counted the stepwise motion correctly.",
+    "candidates_approach": "Scanned the melody bar by bar.",
+    "demonstrated_strengths": "Careful visual tracking.",
+    "omissions_or_delays": "None observed.",
+    "hr_interpretation": "Works methodically through structured material."
+}
+
+DEPARTMENT_RESPONSE = {
+    "primary_department": "Data & Analytics",
+    "secondary_department": "Product Management",
+    "reasoning": "Strong visual and subconscious pattern recognition.",
+    "hr_questions": [f"Question {i}?" for i in range(1, 10)]
+}
+
+TODAY_RESPONSE = {
+    "date": "2025-12-19",
+    "festivals": ["Festival A"],
+    "summary": "A quiet day."
+}
+
+
+def canned_response(prompt: str) -> str:
+    if "hr_questions" in prompt:
+        return json.dumps(DEPARTMENT_RESPONSE)
+    if "hr_interpretation" in prompt:
+        return json.dumps(QUESTION_RESPONSE)
+    return json.dumps(TODAY_RESPONSE)
+
+
+def malform(content: str, rng: random.Random) -> str:
+    """One of the ways real completions go wrong: fenced, wrapped in prose, truncated or not JSON."""
+    kind = rng.choice(("fenced", "prose", "truncated", "garbage"))
+    if kind == "fenced":
+        return f"```json\n{content}\n```"
+    if kind == "prose":
+        return f"Here is the evaluation:\n{content}\nLet me know if you need more."
+    if kind == "truncated":
+        return content[:rng.randint(1, len(content) - 1)]
+    return "I'm sorry, I can't produce JSON for this request."
+
+
+class FakeLLMError(RuntimeError):
+    """Injected upstream failure."""
+
+
+class FakeChatModel(BaseChatModel):
+    latency: float = 0.2  # median latency in seconds
+    distribution: str = "constant"  # constant | uniform | lognormal | exponential
+    jitter: float = 0.5  # spread: +/- fraction for uniform, sigma for lognormal
+    tail_rate: float = 0.0  # fraction of calls that take tail_latency instead
+    tail_latency: float = 0.0
+    error_rate: float = 0.0  # fraction of calls that raise FakeLLMError
+    malformed_rate: float = 0.0  # fraction of completions that are not clean JSON
+    chunk_size: int = 16  # characters per streamed chunk
+    seed: int = 0
+    calls: int = 0  # upstream calls received
+    _rng: random.Random = PrivateAttr(default=None)
+
+    def model_post_init(self, context):
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _sample_latency(self) -> float:
+        rng = self._rng
+        if self.tail_rate and rng.random() < self.tail_rate:
+            return self.tail_latency
+        if self.distribution == "uniform":
+            return self.latency * rng.uniform(1 - self.jitter, 1 + self.jitter)
+        if self.distribution == "lognormal":
+            return self.latency * rng.lognormvariate(0, self.jitter)
+        if self.distribution == "exponential":
+            return rng.expovariate(1 / self.latency) if self.latency else 0.0
+        return self.latency
+
+    def _maybe_fail(self):
+        self.calls += 1
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise FakeLLMError("injected upstream failure")
+
+    def _content(self, messages) -> str:
+        prompt = "\n".join(str(m.content) for m in messages)
+        content = canned_response(prompt)
+        if self.malformed_rate and self._rng.random() < self.malformed_rate:
+            content = malform(content, self._rng)
+        return content
+
+    def _result(self, messages) -> ChatResult:
+        content = self._content(messages)
+        # Rough token counts, so usage metrics have something to count
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        usage = {"input_tokens": prompt_chars // 4, "output_tokens": len(content) // 4,
+                 "total_tokens": (prompt_chars + len(content)) // 4}
+        message = AIMessage(content=content, usage_metadata=usage, response_metadata={"model_name": "fake-chat"})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self._sample_latency())
+        self._maybe_fail()
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self._sample_latency())
+        self._maybe_fail()
+        return self._result(messages)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        # Spread the latency across chunks, like a token stream
+        self._maybe_fail()
+        content = self._content(messages)
+        latency = self._sample_latency()
+        pieces = [content[i:i + self.chunk_size] for i in range(0, len(content), self.chunk_size)]
+        for piece in pieces:
+            await asyncio.sleep(latency / len(pieces))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
@@ -0,0 +1,61 @@
+"""
+p99 of question evaluation with and without hedging.
+
+The fake model answers in `--latency` seconds, except for `--tail-rate` of
+calls that take `--tail-latency`. Hedging races those stragglers against a
+duplicate once they outlive the p95 of observed latency.
+
+Usage:
+    python -m benchmarks.hedging --requests 2000 --tail-rate 0.03
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.hedging import Hedger
+from app.providers import percentile
+from benchmarks.fake_llm import FakeChatModel
+
+
+async def drive(model, hedger, requests: int, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            if hedger is None:
+                await model.ainvoke("hr_interpretation")
+            else:
+                await hedger.run(lambda: model.ainvoke("hr_interpretation"))
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--tail-rate", type=float, default=0.03)
+    parser.add_argument("--tail-latency", type=float, default=1.0)
+    parser.add_argument("--max-ratio", type=float, default=0.05, help="hedge budget")
+    args = parser.parse_args()
+
+    model = FakeChatModel(latency=args.latency, tail_rate=args.tail_rate, tail_latency=args.tail_latency)
+    hedger = Hedger(pct=95, max_ratio=args.max_ratio, min_samples=20, window=200)
+
+    baseline = asyncio.run(drive(model, None, args.requests, args.concurrency))
+    hedged = asyncio.run(drive(model, hedger, args.requests, args.concurrency))
+
+    print(f"{'mode':<10} {'p50':>7} {'p99':>7}")
+    for label, latencies in (("plain", baseline), ("hedged", hedged)):
+        print(f"{label:<10} {percentile(latencies, 50):>7.3f} {percentile(latencies, 99):>7.3f}")
+    print(hedger.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Load-test suite: drives /chat, /question and /assessment/department through
+the ASGI app at increasing concurrency, with a FakeChatModel in place of the
+provider pool. Reports RPS, p50/p95/p99 latency, errors and memory per
+endpoint and concurrency level, and stores everything as JSON so runs can be
+diffed between releases.
+
+The result cache is disabled and every request carries a distinct payload,
+so each one reaches the (fake) model.
+
+Usage:
+    python -m benchmarks.load_suite --concurrency 1,8,32,128 --requests 400
+    python -m benchmarks.load_suite --distribution lognormal --error-rate 0.01 --malformed-rate 0.05
+    python -m benchmarks.load_suite --compare benchmarks/results/old.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["CACHE_ENABLED"] = "false"
+os.environ["RATE_LIMIT_ENABLED"] = "false"  # every request comes from one client
+os.environ["HR_QUESTION_POOL_PATH"] = ""  # keep fake questions out of the real pool file
+os.environ["EVALUATION_STORE_PATH"] = ""  # keep fake results out of the evaluation store
+
+import httpx
+from app.main import app
+from app.providers import percentile
+from app.service import index as service
+from benchmarks.async_load import PAYLOAD
+from benchmarks.fake_llm import FakeChatModel
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def chat_request(i: int, rng: random.Random) -> tuple:
+    return "/api/py/chat", {"prompt": f"Summarise today for request {i}."}
+
+
+def question_request(i: int, rng: random.Random) -> tuple:
+    # No image_url, so the run measures the service and not media downloads
+    question = {**PAYLOAD["question"], "image_url": None, "response_text": str(i)}
+    return "/api/py/question", {"question": question}
+
+
+def department_request(i: int, rng: random.Random) -> tuple:
+    profile = {d: round(rng.uniform(0, 10), 2) for d in ("visual", "auditory", "rhythmic", "subconscious")}
+    return "/api/py/assessment/department", {"cognitive_profile": {**profile, "confidence": round(rng.random(), 2)}}
+
+
+SCENARIOS = {"chat": chat_request, "question": question_request, "department": department_request}
+
+
+def rss_mb() -> float:
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if platform.system() == "Darwin" else peak / 2 ** 10
+
+
+async def run_level(client: httpx.AsyncClient, build_request, concurrency: int, requests: int, seed: int) -> dict:
+    """Closed loop: `concurrency` clients send `requests` requests in total."""
+    rng = random.Random(seed)
+    payloads = [build_request(i, rng) for i in range(requests)]
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def client_loop():
+        nonlocal errors, next_index
+        while next_index < len(payloads):
+            path, body = payloads[next_index]
+            next_index += 1
+            start = time.perf_counter()
+            response = await client.post(path, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "rss_mb": round(rss_mb(), 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+async def run_suite(args) -> list:
+    fake = FakeChatModel(
+        latency=args.latency, distribution=args.distribution, jitter=args.jitter,
+        error_rate=args.error_rate, malformed_rate=args.malformed_rate, seed=args.seed
+    )
+    service.model = fake
+
+    results = []
+    # raise_app_exceptions=False: an unhandled error becomes a 500 and is counted, not raised
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for endpoint in args.endpoints:
+            for concurrency in args.concurrency:
+                requests = max(args.requests, concurrency)
+                level = await run_level(client, SCENARIOS[endpoint], concurrency, requests, args.seed)
+                results.append({"endpoint": endpoint, **level})
+                print(f"{endpoint:<11} c={concurrency:<4} {level['rps']:>9.1f} rps  "
+                      f"p50 {level['p50_ms']:>8.1f}ms  p95 {level['p95_ms']:>8.1f}ms  "
+                      f"p99 {level['p99_ms']:>8.1f}ms  errors {level['errors']:>4}  rss {level['rss_mb']:.0f}MB")
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(previous_path: str, results: list):
+    """Prints the change against a previous run for every endpoint / concurrency pair."""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {(r["endpoint"], r["concurrency"]): r for r in json.load(f)["results"]}
+
+    print(f"\nchange vs {previous_path}:")
+    for row in results:
+        old = previous.get((row["endpoint"], row["concurrency"]))
+        if old is None:
+            continue
+        deltas = "  ".join(
+            f"{key} {(row[key] - old[key]) / old[key] * 100:+.1f}%"
+            for key in ("rps", "p50_ms", "p99_ms") if old[key]
+        )
+        print(f"{row['endpoint']:<11} c={row['concurrency']:<4} {deltas}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default="chat,question,department")
+    parser.add_argument("--concurrency", default="1,8,32,128", help="comma-separated levels")
+    parser.add_argument("--requests", type=int, default=400, help="requests per level")
+    parser.add_argument("--latency", type=float, default=0.05, help="median fake LLM latency in seconds")
+    parser.add_argument("--distribution", default="lognormal", choices=("constant", "uniform", "lognormal", "exponential"))
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/load-<timestamp>.json)")
+    parser.add_argument("--compare", help="previous result file to diff against")
+    args = parser.parse_args()
+    args.endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+
+    results = asyncio.run(run_suite(args))
+
+    started = datetime.now(timezone.utc)
+    report = {
+        "meta": {
+            "timestamp": started.isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fake_model": {
+                "latency": args.latency, "distribution": args.distribution, "jitter": args.jitter,
+                "error_rate": args.error_rate, "malformed_rate": args.malformed_rate, "seed": args.seed
+            }
+        },
+        "results": results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{started.strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
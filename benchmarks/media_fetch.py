@@ -0,0 +1,135 @@
+"""
+Media ingestion against a local static file server.
+
+Serves a temp directory over HTTP/1.1 keep-alive and reports:
+  - cold downloads vs ETag / Last-Modified revalidation (304) of cached files
+  - the pooled shared client vs a fresh client per download
+  - oversized files being rejected
+  - URLs outside MEDIA_ALLOWED_HOSTS or on private addresses being refused
+  - an image question evaluated end to end with the image sent inline
+
+Usage:
+    python -m benchmarks.media_fetch --files 50
+"""
+
+import argparse
+import asyncio
+import functools
+import os
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["EVALUATION_STORE_PATH"] = ""  # keep fake results out of the evaluation store
+
+import httpx
+from app.media import MediaBlocked, MediaFetcher, MediaTooLarge
+from app.models.index import QuestionModel
+from app.service import index as service
+from benchmarks.fake_llm import FakeChatModel
+
+LOCAL = {"allowed_hosts": ["127.0.0.1"], "allow_private": True}  # the file server is on loopback
+
+
+class KeepAliveHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    request_queue_size = 128  # the default backlog of 5 drops concurrent connects into a 1s SYN retry
+
+
+def serve(directory: str) -> ThreadingHTTPServer:
+    handler = functools.partial(KeepAliveHandler, directory=directory)
+    server = Server(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def run(base: str, files: int):
+    urls = [f"{base}/img{i}.png" for i in range(files)]
+    fetcher = MediaFetcher(max_bytes=1024 * 1024, **LOCAL)
+
+    cold = await timed(asyncio.gather(*(fetcher.fetch(u) for u in urls)))
+    warm = await timed(asyncio.gather(*(fetcher.fetch(u) for u in urls)))
+    print(f"cold downloads:  {cold:.3f}s for {files} files")
+    print(f"revalidated:     {warm:.3f}s ({fetcher.revalidated} x 304)")
+
+    async def fresh_client(url):
+        async with httpx.AsyncClient() as client:
+            (await client.get(url)).raise_for_status()
+
+    pooled = MediaFetcher(max_bytes=1024 * 1024, cache_bytes=0, **LOCAL)
+    sequential_pooled = await timed(_sequential(pooled.fetch, urls))
+    sequential_fresh = await timed(_sequential(fresh_client, urls))
+    print(f"pooled client:   {sequential_pooled:.3f}s sequential")
+    print(f"fresh clients:   {sequential_fresh:.3f}s sequential")
+
+    try:
+        await fetcher.fetch(f"{base}/huge.bin")
+    except MediaTooLarge as e:
+        print(f"oversized:       rejected ({e})")
+
+    guarded = MediaFetcher(allowed_hosts=["127.0.0.1", "169.254.169.254"])
+    for url in (urls[0], "http://169.254.169.254/latest/meta-data/", "file:///etc/passwd"):
+        try:
+            await guarded.fetch(url)
+        except MediaBlocked as e:
+            print(f"refused:         {e}")
+    await guarded.aclose()
+
+    service.media_fetcher.allowed_hosts = LOCAL["allowed_hosts"]
+    service.media_fetcher.allow_private = LOCAL["allow_private"]
+
+    service.model = FakeChatModel(latency=0.05)
+    question = QuestionModel(
+        dimension="visual", level="basic", type="image", prompt_html="What do you see?",
+        image_url=urls[0], response_type="image", response_file_url=urls[1]
+    )
+    messages, _ = await service._abuild_question_prompt(question)
+    kinds = [part["type"] for part in messages[-1].content]
+    result = await service.aget_question_evaluation(question)
+    print(f"end to end:      content parts {kinds}, is_correct={result['is_correct']}")
+
+    await fetcher.aclose()
+    await pooled.aclose()
+    await service.media_fetcher.aclose()
+
+
+async def _sequential(fetch, urls):
+    for url in urls:
+        await fetch(url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(args.files):
+            with open(os.path.join(directory, f"img{i}.png"), "wb") as f:
+                f.write(b"\x89PNG\r\n\x1a\n" + os.urandom(64 * 1024))
+        with open(os.path.join(directory, "huge.bin"), "wb") as f:
+            f.write(os.urandom(2 * 1024 * 1024))
+
+        server = serve(directory)
+        try:
+            asyncio.run(run(f"http://127.0.0.1:{server.server_address[1]}", args.files))
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
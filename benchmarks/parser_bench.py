@@ -0,0 +1,79 @@
+"""
+Micro-benchmark: single-pass parse_json_object vs the old triple-fallback parse.
+
+The corpus mixes well-formed, fenced, prose-wrapped and truncated completions.
+For each kind it reports microseconds per parse and how many fields survive.
+
+Usage:
+    python -m benchmarks.parser_bench --iterations 2000
+"""
+
+import argparse
+import json
+import time
+
+from app.parser import parse_json_object
+from benchmarks.fake_llm import QUESTION_RESPONSE, DEPARTMENT_RESPONSE
+
+
+def legacy_parse(content: str) -> dict:
+    """The strict -> json.loads -> {...} slice chain the service used before."""
+    text = content.strip()
+    try:
+        if text.startswith("```json"):
+            text = text.removeprefix("```json").removesuffix("```").strip()
+        return json.loads(text)
+    except json.JSONDecodeError:
+        raw = content.strip()
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            start, end = raw.find("{"), raw.rfind("}")
+            if start != -1 and end != -1:
+                try:
+                    return json.loads(raw[start:end + 1])
+                except json.JSONDecodeError:
+                    return {}
+            return {}
+
+
+def build_corpus() -> dict:
+    corpus = {"well_formed": [], "fenced": [], "prose": [], "truncated": []}
+    for payload in (QUESTION_RESPONSE, DEPARTMENT_RESPONSE):
+        text = json.dumps(payload, indent=2)
+        corpus["well_formed"].append(text)
+        corpus["fenced"].append(f"```json\n{text}\n```")
+        corpus["prose"].append(f"Here is the evaluation:\n{text}\nLet me know if you need more.")
+        corpus["truncated"].append(text[:int(len(text) * 0.8)])
+    return corpus
+
+
+def run(parse, documents: list, iterations: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for doc in documents:
+            parse(doc)
+    elapsed = time.perf_counter() - start
+    fields = sum(len(parse(doc)) for doc in documents)
+    return elapsed / (iterations * len(documents)) * 1e6, fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    parsers = {
+        "legacy": legacy_parse,
+        "single-pass": lambda doc: parse_json_object(doc)[0]
+    }
+
+    print(f"{'corpus':<12} {'parser':<12} {'us/parse':>10} {'fields':>7}")
+    for kind, documents in build_corpus().items():
+        for name, parse in parsers.items():
+            micros, fields = run(parse, documents, args.iterations)
+            print(f"{kind:<12} {name:<12} {micros:>10.1f} {fields:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Prompt-prefix stability and, optionally, provider cache hits and TTFT.
+
+Local mode renders question prompts for a varied corpus and reports how
+much of each prompt is a prefix shared by every request (what the
+provider-side prompt cache can reuse) and how long rendering takes. The
+one-off template compile (which imports langchain_core, as the app does at
+startup) is timed on its own, so the render time is the per-request cost.
+
+--live sends the prompts to the configured provider pool and reports the
+cached-token ratio from usage metadata and time-to-first-token. Requires
+API keys and network.
+
+Usage:
+    python -m benchmarks.prompt_cache
+    python -m benchmarks.prompt_cache --live --requests 20
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["EVALUATION_STORE_PATH"] = ""  # keep fake results out of the evaluation store
+
+from app.models.index import QuestionModel
+from app.prompts.index import compile_prompts
+from app.service import index as service
+
+
+def build_corpus(size: int) -> list:
+    questions = []
+    for i in range(size):
+        questions.append(QuestionModel(
+            dimension=("visual", "auditory", "subconscious")[i % 3],
+            level=("basic", "intermediate", "advanced")[i % 3],
+            type="text",
+            prompt_html=f"<p>Question {i}: count how many notes move by <b>step</b> in bar {i % 4 + 1}.</p>",
+            image_url=f"https://example.com/q{i}.png",
+            response_type="text",
+            response_text=str(i % 9)
+        ))
+    return questions
+
+
+def flatten(messages: list) -> str:
+    return "\n".join(f"{m.type}: {m.content}" for m in messages)
+
+
+def common_prefix_length(texts: list) -> int:
+    first = texts[0]
+    length = len(first)
+    for text in texts[1:]:
+        i = 0
+        limit = min(length, len(text))
+        while i < limit and first[i] == text[i]:
+            i += 1
+        length = i
+    return length
+
+
+def local_report(questions: list):
+    start = time.perf_counter()
+    compile_prompts()
+    compile_millis = (time.perf_counter() - start) * 1e3
+    service._build_question_prompt(questions[0])  # first render, outside the steady-state figure
+
+    start = time.perf_counter()
+    rendered = [service._build_question_prompt(q) for q in questions]
+    render_micros = (time.perf_counter() - start) / len(questions) * 1e6
+
+    texts = [flatten(messages) for messages in rendered]
+    prefix = common_prefix_length(texts)
+    average = sum(len(t) for t in texts) / len(texts)
+    print(f"shared prefix: {prefix} chars of {average:.0f} on average ({prefix / average:.0%})")
+    print(f"compile time:  {compile_millis:.1f} ms once per worker (startup)")
+    print(f"render time:   {render_micros:.1f} us per prompt")
+
+
+async def live_report(questions: list):
+    cached, prompt_tokens, ttfts = 0, 0, []
+    for question in questions:
+        messages = service._build_question_prompt(question)
+        response = await service.model.ainvoke(messages)
+        usage = getattr(response, "usage_metadata", None) or {}
+        prompt_tokens += usage.get("input_tokens", 0)
+        cached += usage.get("input_token_details", {}).get("cache_read", 0)
+
+        start = time.perf_counter()
+        async for _ in service.model.astream(messages):
+            ttfts.append(time.perf_counter() - start)
+            break
+
+    ttfts.sort()
+    print(f"cached tokens: {cached} of {prompt_tokens} ({cached / max(prompt_tokens, 1):.0%})")
+    print(f"TTFT p50:      {ttfts[len(ttfts) // 2]:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    questions = build_corpus(args.requests)
+    local_report(questions)
+    if args.live:
+        asyncio.run(live_report(questions))
+
+
+if __name__ == "__main__":
+    main()
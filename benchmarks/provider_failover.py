@@ -0,0 +1,66 @@
+"""
+Tail latency under a provider brownout: single provider vs ProviderPool.
+
+Halfway through the run the primary fake provider slows down and starts
+failing. The pool routes around it on recent p50 / error rate, fails over
+on errors and per-attempt timeouts, and opens the primary's circuit.
+
+Usage:
+    python -m benchmarks.provider_failover --requests 400
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.providers import CircuitBreaker, Provider, ProviderPool, percentile
+from benchmarks.fake_llm import FakeChatModel
+
+
+async def drive(model, primary: FakeChatModel, requests: int, concurrency: int) -> tuple:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            if i == requests // 2:
+                # 🔹 Brownout
+                primary.latency = 1.0
+                primary.error_rate = 0.5
+            start = time.perf_counter()
+            try:
+                await model.ainvoke("hr_interpretation")
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    primary = FakeChatModel(latency=0.05)
+    single_latencies, single_errors = asyncio.run(drive(primary, primary, args.requests, args.concurrency))
+
+    primary = FakeChatModel(latency=0.05)
+    pool = ProviderPool([
+        Provider("primary", primary, breaker=CircuitBreaker(failure_threshold=3, reset_seconds=5)),
+        Provider("secondary", FakeChatModel(latency=0.08))
+    ], attempt_timeout=0.3)
+    pool_latencies, pool_errors = asyncio.run(drive(pool, primary, args.requests, args.concurrency))
+
+    print(f"{'setup':<8} {'p50':>7} {'p99':>7} {'errors':>7}")
+    for label, latencies, errors in (("single", single_latencies, single_errors),
+                                     ("pool", pool_latencies, pool_errors)):
+        print(f"{label:<8} {percentile(latencies, 50):>7.3f} {percentile(latencies, 99):>7.3f} {errors:>7}")
+    print(pool.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Shows why the quota counters have to live in a shared store.
+
+Simulates N uvicorn workers, each with its own RateLimiter, receiving one
+tenant's traffic round-robin. With per-worker stores (what a per-process
+limiter does) the tenant gets N times its quota; with one shared store it
+gets exactly its quota. The in-memory store stands in for Redis here.
+
+Usage:
+    python -m benchmarks.rate_limit --workers 4 --requests 1000
+"""
+
+import argparse
+import asyncio
+import time
+
+from limits import storage
+from app.ratelimit import RateLimiter
+
+QUOTA = "100/minute"
+
+
+async def simulate(workers: int, requests: int, shared: bool, tokens_per_request: int) -> dict:
+    shared_store = storage.storage_from_string("async+memory://") if shared else None
+    limiters = [
+        RateLimiter("memory://", QUOTA, "50000/minute", store=shared_store)
+        for _ in range(workers)
+    ]
+
+    admitted = 0
+    start = time.perf_counter()
+    for i in range(requests):
+        limiter = limiters[i % workers]
+        quota = limiter.quota_for("tenant-key", "10.0.0.1")
+        if await limiter.admit(quota, "/api/py/question", cost=1) is None:
+            admitted += 1
+            await limiter.charge(quota, "/api/py/question", tokens_per_request)
+    elapsed = time.perf_counter() - start
+    return {"admitted": admitted, "us_per_decision": elapsed / requests * 1e6}
+
+
+async def main(workers: int, requests: int, tokens_per_request: int):
+    print(f"{workers} workers, {requests} requests from one tenant, quota {QUOTA} and 50000 tokens/minute")
+    for shared in (False, True):
+        result = await simulate(workers, requests, shared, tokens_per_request)
+        label = "shared store" if shared else "per-worker"
+        print(f"  {label:<13} admitted {result['admitted']:>5}  ({result['us_per_decision']:.1f}µs per decision)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--tokens-per-request", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.requests, args.tokens_per_request))
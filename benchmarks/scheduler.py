@@ -0,0 +1,78 @@
+"""
+Interactive latency under a bulk flood, with and without priority classes.
+
+A bulk job queues `--bulk` upstream calls at once; meanwhile interactive
+calls arrive at a steady rate. Every call holds a slot for `--latency`
+seconds. In FIFO mode all calls share the bulk class, so interactive
+calls wait behind the whole flood; with priorities they overtake it and
+are only shed if they still cannot start within their deadline.
+
+Usage:
+    python -m benchmarks.scheduler --capacity 8 --bulk 400 --interactive 100
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.providers import percentile
+from app.scheduler import OverloadedError, PriorityScheduler
+
+
+async def call(scheduler: PriorityScheduler, priority: str, latency: float, waits: list, shed: list):
+    queued_at = time.perf_counter()
+    try:
+        async with scheduler.slot(priority):
+            waits.append(time.perf_counter() - queued_at)
+            await asyncio.sleep(latency)
+    except OverloadedError:
+        shed.append(priority)
+
+
+async def simulate(args, fifo: bool) -> dict:
+    deadlines = {"interactive": args.deadline, "batch": 30.0, "bulk": 3600.0}
+    scheduler = PriorityScheduler(args.capacity, max_queue=args.bulk + args.interactive, deadlines=deadlines)
+    interactive_class = "bulk" if fifo else "interactive"
+
+    waits = {"interactive": [], "bulk": []}
+    shed = []
+    start = time.perf_counter()
+    tasks = [
+        asyncio.create_task(call(scheduler, "bulk", args.latency, waits["bulk"], shed)) for _ in range(args.bulk)
+    ]
+    for _ in range(args.interactive):
+        await asyncio.sleep(args.interval)
+        tasks.append(asyncio.create_task(
+            call(scheduler, interactive_class, args.latency, waits["interactive"], shed)
+        ))
+    await asyncio.gather(*tasks)
+    return {
+        "seconds": time.perf_counter() - start,
+        "interactive_p50": percentile(waits["interactive"], 50) if waits["interactive"] else float("nan"),
+        "interactive_p99": percentile(waits["interactive"], 99) if waits["interactive"] else float("nan"),
+        "interactive_served": len(waits["interactive"]),
+        "interactive_shed": shed.count("interactive")
+    }
+
+
+async def main(args):
+    print(f"capacity {args.capacity}, {args.bulk} bulk calls queued at once, {args.interactive} interactive "
+          f"calls every {args.interval * 1000:.0f}ms, {args.latency * 1000:.0f}ms per call, "
+          f"interactive deadline {args.deadline:g}s")
+    for fifo in (True, False):
+        result = await simulate(args, fifo)
+        label = "fifo" if fifo else "priority"
+        print(f"  {label:<9} interactive wait p50 {result['interactive_p50'] * 1000:>8.1f}ms  "
+              f"p99 {result['interactive_p99'] * 1000:>8.1f}ms  served {result['interactive_served']:>4}  "
+              f"shed {result['interactive_shed']:>4}  total {result['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--bulk", type=int, default=400)
+    parser.add_argument("--interactive", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.01, help="seconds between interactive arrivals")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds each call holds its slot")
+    parser.add_argument("--deadline", type=float, default=1.0, help="interactive deadline in seconds")
+    asyncio.run(main(parser.parse_args()))
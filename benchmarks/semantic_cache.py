@@ -0,0 +1,157 @@
+"""
+Hit rate and grading drift of the near-duplicate answer cache, offline.
+
+Replays text answers in arrival order through a SemanticAnswerCache, as the
+service would: a hit reuses an earlier graded result, a miss is graded in
+full and indexed. Every hit is compared with the full grade of the same
+answer. Drift is the share of hits with a different `is_correct`.
+
+By default the answers are synthetic rewordings of counting answers
+("six", "6 notes", "I heard six notes", "seven", ...), graded by the
+number they state, and of higher / lower answers, graded by their words.
+`--store` replays real results from the evaluation store
+(EVALUATION_STORE_PATH) instead, graded as the model graded them.
+
+Usage:
+    python -m benchmarks.semantic_cache --answers 5000 --thresholds 0.8,0.9,0.92,0.95
+    python -m benchmarks.semantic_cache --store .cache/evaluation_store.sqlite3
+"""
+
+import argparse
+import random
+import time
+
+from app.cache import make_cache_key
+from app.models.index import QuestionModel
+from app.semantic_cache import NUMBER_WORDS, SemanticAnswerCache
+from app.store import EvaluationStore
+
+# (prompt, correct count, unit)
+QUESTIONS = [
+    ("<p>How many notes do you hear in the melody?</p>", 6, "notes"),
+    ("<p>How many beats are in one bar of this rhythm?</p>", 4, "beats"),
+    ("<p>How many times does the drum pattern repeat?</p>", 3, "times"),
+    ("<p>How many different instruments can you hear?</p>", 5, "instruments"),
+    ("<p>Count the chords played in the clip.</p>", 8, "chords"),
+]
+
+# Wordings of an answer stating {n}; a wording with {m} also states a second number
+TEMPLATES = [
+    "{n}", "{w}", "{n} {unit}", "{w} {unit}", "{W} {unit}.", "I heard {w} {unit}", "there are {n} {unit}",
+    "I think {w}", "{w} {unit}, maybe", "about {n}", "not sure, maybe {w}", "{n} or {m}", "{W}!"
+]
+
+# A question graded on wording alone: (prompt, correct answers, incorrect answers)
+DIRECTION = (
+    "<p>Is the second note higher or lower than the first?</p>",
+    ["higher", "the second note is higher", "it is higher", "higher than the first one", "it goes up", "up",
+     "the second one is higher", "higher pitch"],
+    ["lower", "the second note is lower", "it is lower", "lower than the first one", "it goes down", "down",
+     "the second one is lower", "lower pitch", "the same"]
+)
+
+PREFIXES = ["", "", "", "hmm ", "probably ", "i'd say ", "definitely ", "ok so "]
+
+WORDS = {int(digit): word for word, digit in NUMBER_WORDS.items()}
+
+
+def typo(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def synthetic_answers(count: int, seed: int) -> list:
+    """
+    (question, full grade) pairs. A counting answer is correct when it states
+    the right count and nothing else; a direction answer when it says "higher".
+    """
+    rng = random.Random(seed)
+    items = []
+    for _ in range(count):
+        if rng.random() < 1 / (len(QUESTIONS) + 1):
+            prompt, correct, wrong = DIRECTION
+            is_correct = rng.random() < 0.6
+            text = rng.choice(PREFIXES) + rng.choice(correct if is_correct else wrong)
+        else:
+            prompt, correct, unit = rng.choice(QUESTIONS)
+            n = correct if rng.random() < 0.6 else max(1, correct + rng.choice((-2, -1, 1, 2)))
+            template = rng.choice(TEMPLATES)
+            if rng.random() < 0.15:
+                unit = typo(unit, rng)
+            text = rng.choice(PREFIXES) + template.format(
+                n=n, m=n + 1, w=WORDS[n], W=WORDS[n].capitalize(), unit=unit
+            )
+            is_correct = n == correct and "{m}" not in template
+        question = QuestionModel(
+            dimension="auditory", level="basic", type="text", prompt_html=prompt,
+            response_type="text", response_text=text
+        )
+        items.append((question, {"is_correct": is_correct, "confidence": 0.9}, "", ""))
+    return items
+
+
+def stored_answers(path: str, limit: int = None) -> list:
+    """Text answers from the evaluation store, oldest first, with the grade the model gave them."""
+    items = []
+    for row in EvaluationStore(path).iter_results(kind="question", limit=limit):
+        question = QuestionModel.model_validate(row["request"])
+        if SemanticAnswerCache.applies(question):
+            items.append((question, row["result"], row["prompt_version"] or "", row["model"] or ""))
+    return items
+
+
+def replay(items: list, threshold: float, max_answers: int) -> dict:
+    cache = SemanticAnswerCache(threshold=threshold, max_questions=len(items) or 1, max_answers=max_answers)
+    seen = set()  # what the exact-match cache would have hit
+    hits = exact_hits = drifted = 0
+    confidence_delta = 0.0
+    start = time.perf_counter()
+    for question, graded, prompt_version, model in items:
+        payload = question.model_dump(mode="json", exclude={"response_text"})
+        key = make_cache_key("evaluate_question", payload, prompt_version, model)
+        exact_hits += (key, question.response_text) in seen
+        seen.add((key, question.response_text))
+        reused = cache.lookup(key, question)
+        if reused is None:
+            cache.add(key, question, graded)
+            continue
+        hits += 1
+        drifted += bool(reused.get("is_correct")) != bool(graded.get("is_correct"))
+        confidence_delta += abs(reused.get("confidence", 0.0) - graded.get("confidence", 0.0))
+    elapsed = time.perf_counter() - start
+    return {
+        "hit_rate": hits / len(items) if items else 0.0,
+        "exact_hit_rate": exact_hits / len(items) if items else 0.0,
+        "drift": drifted / hits if hits else 0.0,
+        "drifted": drifted,
+        "confidence_delta": confidence_delta / hits if hits else 0.0,
+        "us_per_answer": elapsed / len(items) * 1e6 if items else 0.0
+    }
+
+
+def main(args):
+    if args.store:
+        items = stored_answers(args.store, args.limit)
+        source = f"{len(items)} stored text answers from {args.store}"
+    else:
+        items = synthetic_answers(args.answers, args.seed)
+        source = f"{len(items)} synthetic answers to {len(QUESTIONS)} questions"
+    print(f"{source}, up to {args.max_answers} indexed answers per question")
+    for i, threshold in enumerate(float(t) for t in args.thresholds.split(",")):
+        r = replay(items, threshold, args.max_answers)
+        if not i:
+            print(f"  exact match     hit rate {r['exact_hit_rate']:>6.1%}")
+        print(f"  threshold {threshold:.2f}  hit rate {r['hit_rate']:>6.1%}  drift {r['drift']:>6.2%} "
+              f"({r['drifted']} reused grades differ)  |confidence delta| {r['confidence_delta']:.3f}  "
+              f"{r['us_per_answer']:.0f}us per answer")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=5000, help="synthetic answers to replay")
+    parser.add_argument("--store", help="replay an evaluation store file instead")
+    parser.add_argument("--limit", type=int, default=None, help="stored rows to read")
+    parser.add_argument("--thresholds", default="0.8,0.9,0.92,0.95,0.99")
+    parser.add_argument("--max-answers", type=int, default=128)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
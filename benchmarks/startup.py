@@ -0,0 +1,113 @@
+"""
+Worker cold start: import time, app construction, provider SDK loading and
+resident memory, each measured in a fresh interpreter.
+
+The app imports only what it needs to serve; the provider SDKs are loaded
+by the lifespan warm-up, which flips GET /ready. The "eager" line is the
+old behaviour: the SDKs were imported before the worker could listen.
+
+Usage:
+    python -m benchmarks.startup --runs 5 --top 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD_ENV = {
+    "OPENAI_API_KEY": "sk-benchmark",
+    "HR_QUESTION_POOL_PATH": "",  # no pool file to read or write
+    "EVALUATION_STORE_PATH": ""
+}
+
+# Runs in the child; keeps its own imports to the standard library until it times app.main
+CHILD = """
+import json, os, resource, time
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10
+
+baseline_mb = rss_mb()
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+app.main.create_app()
+created = time.perf_counter()
+serving_mb = rss_mb()
+from app.service.index import load_models
+load_models()
+loaded = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "create_ms": (created - imported) * 1000,
+    "load_ms": (loaded - created) * 1000,
+    "baseline_mb": baseline_mb,
+    "serving_mb": serving_mb,
+    "ready_mb": rss_mb()
+}))
+"""
+
+
+def run_child(*flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", CHILD], env={**os.environ, **CHILD_ENV},
+        capture_output=True, text=True, check=True
+    )
+
+
+def interpreter_ms() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def slowest_imports(top: int) -> list:
+    """Direct imports of app.main by cumulative time, from `python -X importtime`."""
+    children = []
+    for line in run_child("-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:  # a module imported by the child script; its children were listed before it
+            if name.strip() == "app.main":
+                break
+            children = []
+        elif depth == 1:
+            children.append((name.strip(), int(cumulative) / 1000))
+    return sorted(children, key=lambda item: -item[1])[:top]
+
+
+def main(args):
+    runs = [json.loads(run_child().stdout) for _ in range(args.runs)]
+    median = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+    python_ms = statistics.median(interpreter_ms() for _ in range(args.runs))
+    serving_ms = median["import_ms"] + median["create_ms"]
+
+    print(f"median of {args.runs} cold starts, interpreter start {python_ms:.0f}ms not included")
+    print(f"  import app.main   {median['import_ms']:>7.0f}ms")
+    print(f"  create_app()      {median['create_ms']:>7.0f}ms")
+    print(f"  load provider SDK {median['load_ms']:>7.0f}ms  (lifespan warm-up, before /ready)")
+    print(f"  lazy   serving after {serving_ms:>6.0f}ms, ready after {serving_ms + median['load_ms']:>6.0f}ms")
+    print(f"  eager  serving after {serving_ms + median['load_ms']:>6.0f}ms")
+    print(f"  rss    {median['baseline_mb']:.0f}MB interpreter, {median['serving_mb']:.0f}MB serving, "
+          f"{median['ready_mb']:.0f}MB ready")
+    if args.top:
+        print("slowest imports of app.main (cumulative):")
+        for module, ms in slowest_imports(args.top):
+            print(f"  {module:<24} {ms:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest imports")
+    main(parser.parse_args())
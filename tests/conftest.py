@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Settings are read at import time: no network, no files left behind
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ["EVALUATION_STORE_PATH"] = ""
+os.environ["HR_QUESTION_POOL_PATH"] = ""
+os.environ["HR_QUESTION_POOL_WARM"] = "false"
+os.environ["LLM_WARMUP_CONNECTIONS"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,32 @@
+import asyncio
+
+from app.models.index import QuestionModel
+from app.service import index as service
+from benchmarks.fake_llm import FakeChatModel
+
+
+def question(answer: str) -> QuestionModel:
+    return QuestionModel(
+        dimension="auditory", level="basic", type="text", prompt_html="<p>How many beats are in the bar?</p>",
+        response_type="text", response_text=answer
+    )
+
+
+def test_batch_keeps_order_and_shares_identical_calls(monkeypatch):
+    fake = FakeChatModel(latency=0.05)
+    monkeypatch.setattr(service, "model", fake)
+    questions = [question("four"), question("four"), question("three"), question("four")]
+
+    results = asyncio.run(service.aget_question_evaluations(questions, max_concurrency=4))
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert all(r["ok"] for r in results)
+    assert fake.calls == 2  # one per distinct answer
+
+
+def test_failed_item_does_not_fail_the_batch(monkeypatch):
+    fake = FakeChatModel(latency=0.0, error_rate=1.0)
+    monkeypatch.setattr(service, "model", fake)
+
+    results = asyncio.run(service.aget_question_evaluations([question("five beats")]))
+    assert results[0]["ok"] is False
+    assert "injected" in results[0]["error"]
@@ -0,0 +1,40 @@
+import asyncio
+import json
+
+from app import bulk
+from app.service import index as service
+
+QUESTION = {"dimension": "visual", "level": "basic", "type": "text", "prompt_html": "<p>2 + 2?</p>",
+            "response_type": "text", "response_text": "4"}
+
+
+def write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+
+def read_rows(path) -> dict:
+    return {row["id"]: row for row in map(json.loads, path.read_text(encoding="utf-8").splitlines())}
+
+
+def test_read_records_flags_lines_that_are_not_objects(tmp_path):
+    source = tmp_path / "in.jsonl"
+    write_lines(source, [json.dumps({"id": "a", **QUESTION}), "{not json", "", "[1, 2]", json.dumps(QUESTION)])
+    assert list(bulk.read_records(str(source))) == [("a", QUESTION), ("2", None), ("4", None), ("5", QUESTION)]
+
+
+def test_bad_lines_do_not_stop_the_run(tmp_path, monkeypatch):
+    async def evaluate(question):
+        return {"is_correct": True}
+
+    monkeypatch.setattr(service, "aget_question_evaluation", evaluate)
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, [json.dumps({"id": "a", **QUESTION}), "{not json", json.dumps({"id": "b", **QUESTION})])
+
+    summary = asyncio.run(bulk.run(str(source), str(output), concurrency=2))
+    assert (summary["evaluated"], summary["failed"]) == (2, 1)
+    rows = read_rows(output)
+    assert rows["2"] == {"id": "2", "error": "invalid record"}
+    assert rows["a"]["result"] == rows["b"]["result"] == {"is_correct": True}
+
+    resumed = asyncio.run(bulk.run(str(source), str(output), concurrency=2))
+    assert (resumed["evaluated"], resumed["failed"], resumed["skipped"]) == (0, 1, 2)
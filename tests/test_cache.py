@@ -0,0 +1,50 @@
+import asyncio
+
+from app.cache import EvaluationCache, LRUCache, SQLiteBackend, make_cache_key
+
+PAYLOAD = {"prompt_html": "<p>How many notes?</p>", "response_text": "6"}
+
+
+def test_key_changes_with_prompt_version_and_model():
+    key = make_cache_key("evaluate_question", PAYLOAD, "v1", "gpt-4o-mini")
+    assert key == make_cache_key("evaluate_question", dict(reversed(PAYLOAD.items())), "v1", "gpt-4o-mini")
+    assert key != make_cache_key("evaluate_question", PAYLOAD, "v2", "gpt-4o-mini")
+    assert key != make_cache_key("evaluate_question", PAYLOAD, "v1", "gpt-4o")
+    assert key != make_cache_key("evaluate_question", {**PAYLOAD, "response_text": "7"}, "v1", "gpt-4o-mini")
+
+
+def test_hit_and_miss_are_counted():
+    cache = EvaluationCache(LRUCache(10, 60))
+    assert cache.get("k") is None
+    cache.set("k", {"is_correct": True})
+    assert cache.get("k") == {"is_correct": True}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_lru_evicts_the_least_recently_used():
+    local = LRUCache(2, 60)
+    local.set("a", 1)
+    local.set("b", 2)
+    local.get("a")
+    local.set("c", 3)
+    assert local.get("b") is None
+    assert (local.get("a"), local.get("c")) == (1, 3)
+    assert local.evictions == 1
+
+
+def test_expired_entries_miss():
+    local = LRUCache(10, 0)
+    local.set("k", 1)
+    assert local.get("k") is None
+    assert local.expirations == 1
+
+
+def test_shared_hits_are_promoted_to_the_local_tier(tmp_path):
+    shared = SQLiteBackend(str(tmp_path / "cache.sqlite3"), 60)
+    EvaluationCache(LRUCache(10, 60), shared).set("k", {"confidence": 0.9})
+
+    other_worker = EvaluationCache(LRUCache(10, 60), shared)
+    assert asyncio.run(other_worker.aget("k")) == {"confidence": 0.9}
+    assert other_worker.stats()["shared_hits"] == 1
+    assert other_worker.local.get("k") == {"confidence": 0.9}
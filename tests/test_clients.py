@@ -0,0 +1,87 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_openai import ChatOpenAI
+
+from app.clients import ClientRegistry
+
+COMPLETION = {
+    "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "gpt-4o-mini",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "pong"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+}
+
+
+class ChatCompletionHandler(BaseHTTPRequestHandler):
+    """Answers every request with the same chat completion, over keep-alive connections."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChatCompletionHandler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+
+
+def chat_model(registry: ClientRegistry, base_url: str) -> ChatOpenAI:
+    """Built once, as the service builds its models, and kept across lifespans."""
+    return ChatOpenAI(
+        model="gpt-4o-mini", api_key="sk-test", base_url=base_url, max_retries=0,
+        http_async_client=registry.async_client("openai", base_url), http_client=registry.sync_client("openai")
+    )
+
+
+def test_model_outlives_a_lifespan(base_url):
+    registry = ClientRegistry(warmup_connections=0)
+    model = chat_model(registry, base_url)
+
+    async def lifespan():
+        try:
+            return (await model.ainvoke("ping")).content
+        finally:
+            await registry.aclose()
+
+    # Each asyncio.run is a new event loop, like a second app in the same process
+    assert asyncio.run(lifespan()) == "pong"
+    assert asyncio.run(lifespan()) == "pong"
+    assert registry.connections == 2  # the closed pool was replaced, not reused
+    assert registry.in_flight == 0
+
+
+def test_sync_client_reopens_after_close(base_url):
+    registry = ClientRegistry(warmup_connections=0)
+    model = chat_model(registry, base_url)
+    assert model.invoke("ping").content == "pong"
+    asyncio.run(registry.aclose())
+    assert model.invoke("ping").content == "pong"
+
+
+def test_warm_up_opens_connections_again_after_close(base_url):
+    registry = ClientRegistry(warmup_connections=3)
+    registry.async_client("openai", base_url)
+
+    async def lifespan():
+        await registry.warm_up()
+        await registry.aclose()
+
+    asyncio.run(lifespan())
+    asyncio.run(lifespan())
+    assert registry.warmed == 6
+    assert registry.connections == 6
@@ -0,0 +1,52 @@
+import asyncio
+
+from app.hedging import Hedger
+from app.scheduler import PriorityScheduler
+
+
+def hedged(capacity: int) -> tuple:
+    """Runs one call that stalls past the hedge delay under a scheduler of `capacity`."""
+    scheduler = PriorityScheduler(capacity=capacity, max_queue=10)
+    hedger = Hedger(pct=50, max_ratio=1.0, min_samples=1, window=10)
+    hedger.upstream_latencies.append(0.01)
+    calls = []
+
+    async def call():
+        calls.append(scheduler.active)
+        await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    async def run():
+        async with scheduler.slot("interactive"):
+            return await hedger.run(call, acquire=scheduler.try_acquire)
+
+    result = asyncio.run(run())
+    return result, hedger, scheduler, calls
+
+
+def test_hedge_takes_a_slot_of_its_own():
+    result, hedger, scheduler, calls = hedged(capacity=2)
+    assert result == 2
+    assert hedger.hedges == 1 and hedger.hedge_wins == 1
+    assert calls == [1, 2]  # the hedge started while holding a second slot
+    assert scheduler.active == 0
+
+
+def test_hedge_is_skipped_without_a_free_slot():
+    result, hedger, scheduler, calls = hedged(capacity=1)
+    assert result == 1
+    assert hedger.hedges == 0 and hedger.slot_denied == 1
+    assert scheduler.active == 0
+
+
+def test_try_acquire_does_not_overtake_queued_calls():
+    async def run():
+        scheduler = PriorityScheduler(capacity=1, max_queue=10)
+        async with scheduler.slot("interactive"):
+            waiter = asyncio.ensure_future(scheduler._acquire("bulk"))
+            await asyncio.sleep(0)
+            denied = scheduler.try_acquire("interactive")
+        await waiter
+        return denied
+
+    assert asyncio.run(run()) is None
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from app.hr_pool import HRQuestionPool
+
+QUESTIONS = [f"Question {i}?" for i in range(5)]
+
+
+def pool(path=None, **options) -> HRQuestionPool:
+    return HRQuestionPool(["Finance", "Operations"], version="v1", path=path, min_questions=3, **options)
+
+
+def test_cold_pool_returns_at_once_and_fills_in_the_background():
+    hr = pool()
+    release = None
+
+    async def generate(department):
+        await release.wait()
+        return {"reasoning": f"{department} fits", "hr_questions": QUESTIONS}
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        assert hr.ensure("Finance", generate) is False
+        assert hr.ensure("Finance", generate) is False  # shares the generation already running
+        assert hr.sample("Finance", 2) is None
+        release.set()
+        await asyncio.sleep(0.01)
+        assert hr.ensure("Finance", generate) is True
+
+    asyncio.run(run())
+    assert hr.generated == 1
+    assert len(hr.sample("Finance", 2, seed="x")["hr_questions"]) == 2
+
+
+def test_failed_generation_is_retried_only_after_the_cooldown():
+    hr = pool(retry_seconds=60)
+    calls = 0
+
+    async def generate(department):
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("model down")
+
+    async def run():
+        hr.ensure("Finance", generate)
+        await asyncio.sleep(0.01)
+        hr.ensure("Finance", generate)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert calls == 1
+    assert hr.failures == 1
+
+
+def test_saved_pools_are_merged_with_other_workers(tmp_path):
+    path = str(tmp_path / "pools.json")
+    first, second = pool(path), pool(path)
+
+    async def generate(department):
+        return {"reasoning": department, "hr_questions": QUESTIONS}
+
+    async def run():
+        assert await first.refresh("Finance", generate)
+        assert await second.refresh("Operations", generate)
+
+    asyncio.run(run())
+    with open(path, encoding="utf-8") as f:
+        assert set(json.load(f)) == {"Finance", "Operations"}
+    assert [p.name for p in tmp_path.iterdir()] == ["pools.json"]  # no temporary files left behind
+    assert pool(path).is_warm("Finance")
@@ -0,0 +1,94 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.media import MediaBlocked, MediaFetcher, host_allowed, is_public_address
+
+
+def fetcher(handler, **options) -> MediaFetcher:
+    """A fetcher whose requests are answered by `handler` instead of the network."""
+    media = MediaFetcher(**options)
+    media._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=False)
+    return media
+
+
+def fetch(media: MediaFetcher, url: str):
+    return asyncio.run(media.fetch(url))
+
+
+def png(request):
+    return httpx.Response(200, headers={"content-type": "image/png"}, content=b"\x89PNG")
+
+
+def test_host_allowlist():
+    assert host_allowed("cdn.example.com", ["cdn.example.com"])
+    assert host_allowed("img.example.org", ["*.example.org"])
+    assert not host_allowed("example.org.evil.com", ["*.example.org"])
+    assert not host_allowed("cdn.example.com", [])
+
+
+@pytest.mark.parametrize("address", ["127.0.0.1", "10.0.0.8", "192.168.1.1", "169.254.169.254", "::1",
+                                     "fe80::1", "::ffff:127.0.0.1", "0.0.0.0", "224.0.0.1"])
+def test_non_public_addresses_are_refused(address):
+    assert not is_public_address(address)
+
+
+def test_public_address():
+    assert is_public_address("93.184.216.34")
+
+
+@pytest.mark.parametrize("url", ["file:///etc/passwd", "ftp://127.0.0.1/a.png", "http://10.1.2.3/a.png"])
+def test_blocked_urls_are_never_requested(url):
+    requested = []
+    media = fetcher(lambda request: requested.append(request) or png(request), allowed_hosts=["*"])
+    with pytest.raises(MediaBlocked):
+        fetch(media, url)
+    assert requested == []
+
+
+def test_private_hosts_need_allow_private():
+    media = fetcher(png, allowed_hosts=["127.0.0.1"], allow_private=True)
+    assert fetch(media, "http://127.0.0.1/a.png").data == b"\x89PNG"
+
+
+def test_redirect_to_a_private_address_is_refused():
+    def handler(request):
+        if request.url.path == "/a.png":
+            return httpx.Response(302, headers={"location": "http://169.254.169.254/latest/meta-data/"})
+        return png(request)
+
+    media = fetcher(handler, allowed_hosts=["93.184.216.34", "169.254.169.254"])
+    assert fetch(media, "http://93.184.216.34/b.png").data == b"\x89PNG"
+    with pytest.raises(MediaBlocked, match="non-public"):
+        fetch(media, "http://93.184.216.34/a.png")
+
+
+def test_redirect_to_a_host_off_the_allowlist_is_refused():
+    media = fetcher(lambda request: httpx.Response(302, headers={"location": "http://127.0.0.2/x"}),
+                    allowed_hosts=["127.0.0.1"], allow_private=True)
+    with pytest.raises(MediaBlocked, match="MEDIA_ALLOWED_HOSTS"):
+        fetch(media, "http://127.0.0.1/a.png")
+
+
+def test_question_with_blocked_media_is_cached(monkeypatch):
+    from app.models.index import QuestionModel
+    from app.service import index as service
+    from benchmarks.fake_llm import FakeChatModel
+
+    fake = FakeChatModel(latency=0.0)
+    monkeypatch.setattr(service, "model", fake)
+    monkeypatch.setattr(service.media_fetcher, "allowed_hosts", [])
+    question = QuestionModel(
+        dimension="visual", level="basic", type="image", prompt_html="<p>How many circles are blue?</p>",
+        image_url="https://example.com/circles.png", response_type="text", response_text="three"
+    )
+    assert service._question_media_urls(question) == []
+
+    async def twice():
+        return [await service.aget_question_evaluation(question) for _ in range(2)]
+
+    first, second = asyncio.run(twice())
+    assert first == second
+    assert fake.calls == 1
+    assert service.media_fetcher.blocked == 0
@@ -0,0 +1,29 @@
+import asyncio
+
+import httpx
+from fastapi import APIRouter, FastAPI
+
+from app.metrics import MetricsMiddleware, http_requests
+
+
+def test_routes_are_labelled_with_their_full_path():
+    router = APIRouter()
+
+    @router.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/py")
+    app.add_middleware(MetricsMiddleware)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/api/py/items/42")
+            await client.get("/missing")
+
+    asyncio.run(run())
+    exposed = "\n".join(http_requests.render())
+    assert 'route="/api/py/items/{item_id}",status="200"' in exposed
+    assert 'route="unmatched",status="404"' in exposed
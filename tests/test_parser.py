@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from app.parser import IncrementalJSONParser, JSONOutputParser, parse_json_object
+
+COMPLETION = json.dumps({
+    "confidence": 0.9,
+    "is_correct": True,
+    "reason": "Counted \"6\" notes, {not} [nested].",
+    "hr_questions": ["First?", "Second?", "Third?"]
+})
+
+
+def chunks(text: str, size: int) -> list:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 16, 1000])
+def test_chunked_input_gives_the_same_fields(size):
+    parser = IncrementalJSONParser()
+    events = [event for chunk in chunks(COMPLETION, size) for event in parser.feed(chunk)]
+    assert parser.done
+    assert parser.close() == json.loads(COMPLETION)
+    assert ("field", "reason", 'Counted "6" notes, {not} [nested].') in events
+    assert [e[3] for e in events if e[0] == "item"] == ["First?", "Second?", "Third?"]
+
+
+def test_fenced_and_prose_wrapped_output():
+    for text in (f"```json\n{COMPLETION}\n```", f"Here is the evaluation:\n{COMPLETION}\nHope this helps."):
+        assert parse_json_object(text) == (json.loads(COMPLETION), True)
+
+
+def test_truncated_output_keeps_complete_fields():
+    cut = COMPLETION[:COMPLETION.index('"Second')]  # cut between two array items
+    fields, complete = parse_json_object(cut)
+    assert not complete
+    assert fields["confidence"] == 0.9 and fields["is_correct"] is True
+    assert fields["hr_questions"] == ["First?"]
+
+
+def test_truncated_string_is_closed():
+    fields, complete = parse_json_object('{"confidence": 0.5, "reason": "The user cou')
+    assert not complete
+    assert fields == {"confidence": 0.5, "reason": "The user cou"}
+
+
+def test_output_parser_rejects_incomplete_json():
+    assert JSONOutputParser().parse(COMPLETION)["is_correct"] is True
+    with pytest.raises(ValueError):
+        JSONOutputParser().parse("I'm sorry, I can't produce JSON for this request.")
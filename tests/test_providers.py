@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from app.providers import CircuitBreaker, Provider, ProviderPool, ProviderUnavailableError
+
+
+class FakeModel:
+    """Answers with its own name after `latency` seconds, or raises when `fails`."""
+
+    def __init__(self, name: str, latency: float = 0.0, fails: bool = False):
+        self.model_name = name
+        self.latency = latency
+        self.fails = fails
+        self.calls = 0
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.fails:
+            raise ConnectionError(f"{self.model_name} is down")
+        return self.model_name
+
+
+def provider(name: str, **options) -> Provider:
+    # A high threshold keeps circuits closed, so only the ranking decides the order
+    return Provider(name, FakeModel(name, **options), breaker=CircuitBreaker(failure_threshold=1000),
+                    failure_cost=1.0)
+
+
+def names(pool: ProviderPool) -> list:
+    return [p.name for p in pool.ranked()]
+
+
+def call(pool: ProviderPool, times: int = 1) -> list:
+    async def run():
+        return [await pool.ainvoke("ping") for _ in range(times)]
+
+    return asyncio.run(run())
+
+
+def test_provider_that_only_failed_ranks_last():
+    down, up = provider("down", fails=True), provider("up", latency=0.01)
+    pool = ProviderPool([down, up])
+    assert call(pool) == ["up"]  # "down" was tried first, failed, and the call failed over
+    assert pool.failovers == 1
+    assert names(pool) == ["up", "down"]
+
+    assert call(pool, 3) == ["up"] * 3
+    assert down.model.calls == 1
+    assert pool.failovers == 1
+
+
+def test_untried_provider_is_tried_before_a_failing_one():
+    down, spare = provider("down", fails=True), provider("spare")
+    down.record_failure()
+    assert names(ProviderPool([down, spare])) == ["spare", "down"]
+
+
+def test_error_rate_outweighs_a_small_latency_lead():
+    fast, steady = provider("fast"), provider("steady")
+    for _ in range(5):
+        fast.record_success(0.05)
+        steady.record_success(0.2)
+    fast.record_failure()
+    fast.record_failure()  # 2 of 7 calls failed
+    assert names(ProviderPool([fast, steady])) == ["steady", "fast"]
+
+
+def test_all_providers_failing_raises_the_last_error():
+    pool = ProviderPool([provider("a", fails=True), provider("b", fails=True)])
+    with pytest.raises(ConnectionError, match="is down"):
+        call(pool)
+
+
+def test_open_circuits_make_the_pool_unavailable():
+    only = Provider("only", FakeModel("only", fails=True), breaker=CircuitBreaker(failure_threshold=1))
+    pool = ProviderPool([only])
+    with pytest.raises(ConnectionError):
+        call(pool)
+    with pytest.raises(ProviderUnavailableError):
+        call(pool)
@@ -0,0 +1,38 @@
+from app.models.index import QuestionModel
+from app.question_bank import QuestionBank
+
+ENTRIES = [
+    {"prompt_html": "<p>How many notes move by <b>step</b>?</p>", "answer": "6", "accepted": ["six"]},
+    {"prompt_html": "<p>Which clef is shown?</p>", "image_url": "https://example.com/clef.png",
+     "answer": "Treble", "options": ["Treble", "Bass", "Alto"]},
+]
+
+
+def question(prompt_html: str, response_text: str, image_url: str = None) -> QuestionModel:
+    return QuestionModel(
+        dimension="visual", level="basic", type="text", prompt_html=prompt_html, image_url=image_url,
+        response_type="text", response_text=response_text
+    )
+
+
+def bank() -> QuestionBank:
+    questions = QuestionBank()
+    assert questions.load(ENTRIES) == 2
+    return questions
+
+
+def test_accepted_answer_is_graded_locally():
+    result = bank().grade(question("<p>How many notes move by step?</p>", " Six "))
+    assert result["is_correct"] is True and result["confidence"] == 1.0
+
+
+def test_other_option_is_graded_incorrect():
+    result = bank().grade(question("<p>Which clef is shown?</p>", "bass", "https://example.com/clef.png"))
+    assert result["is_correct"] is False
+
+
+def test_anything_else_goes_to_the_model():
+    questions = bank()
+    assert questions.grade(question("<p>How many notes move by step?</p>", "about seven")) is None
+    assert questions.grade(question("<p>Which clef is shown?</p>", "treble")) is None  # media is part of the key
+    assert questions.stats()["served_locally"] == 0
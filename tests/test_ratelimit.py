@@ -0,0 +1,49 @@
+import asyncio
+import secrets
+
+import httpx
+
+from app.ratelimit import RateLimiter, RateLimitMiddleware
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def statuses(limiter: RateLimiter, requests: int, headers) -> list:
+    """Status codes of `requests` POSTs to /api/py/question through the middleware, from one client IP."""
+    async def run():
+        transport = httpx.ASGITransport(app=RateLimitMiddleware(ok_app, limiter))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [(await client.post("/api/py/question", headers=headers())).status_code for _ in range(requests)]
+
+    return asyncio.run(run())
+
+
+def limiter(tenants: dict = None) -> RateLimiter:
+    return RateLimiter("memory://", "5/minute", "1000000/hour", tenants)
+
+
+def test_requests_without_key_are_limited_by_ip():
+    assert statuses(limiter(), 8, dict).count(429) == 3
+
+
+def test_rotating_unknown_keys_cannot_get_past_the_limit():
+    codes = statuses(limiter(), 8, lambda: {"x-api-key": secrets.token_hex(8)})
+    assert codes.count(200) == 5
+    assert codes.count(429) == 3
+
+
+def test_unknown_keys_share_the_ip_quota_with_keyless_requests():
+    shared = limiter()
+    statuses(shared, 5, dict)
+    assert statuses(shared, 1, lambda: {"x-api-key": "made-up"}) == [429]
+
+
+def test_configured_key_has_its_own_quota():
+    shared = limiter({"tenant-key": {"tenant": "acme", "requests": "10/minute"}})
+    statuses(shared, 5, dict)  # the IP quota is used up
+    codes = statuses(shared, 12, lambda: {"x-api-key": "tenant-key"})
+    assert codes.count(200) == 10
+    assert codes.count(429) == 2
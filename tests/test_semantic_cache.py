@@ -0,0 +1,40 @@
+from app.models.index import QuestionModel
+from app.semantic_cache import SemanticAnswerCache
+
+PROMPT = "<p>How many notes do you hear in the melody?</p>"
+GRADED = {"is_correct": True, "confidence": 0.9}
+
+
+def answer(text: str, prompt_html: str = PROMPT) -> QuestionModel:
+    return QuestionModel(
+        dimension="auditory", level="basic", type="text", prompt_html=prompt_html,
+        response_type="text", response_text=text
+    )
+
+
+def cache(threshold: float = 0.9) -> SemanticAnswerCache:
+    answers = SemanticAnswerCache(threshold=threshold, max_questions=10, max_answers=8)
+    answers.add("q", answer("six notes"), GRADED)
+    return answers
+
+
+def test_reworded_answer_reuses_the_grade():
+    answers = cache()
+    assert answers.lookup("q", answer("I heard 6 notes")) == GRADED
+    assert answers.stats()["hits"] == 1
+
+
+def test_different_number_or_negation_misses():
+    answers = cache()
+    assert answers.lookup("q", answer("seven notes")) is None
+    assert answers.lookup("q", answer("not six notes")) is None
+
+
+def test_threshold_decides_a_loose_match():
+    loose = "the melody has six notes"  # cosine ~0.64 to "six notes"
+    assert cache(threshold=0.5).lookup("q", answer(loose)) == GRADED
+    assert cache(threshold=0.99).lookup("q", answer(loose)) is None
+
+
+def test_answers_to_other_questions_are_not_reused():
+    assert cache().lookup("other", answer("six notes", "<p>How many beats?</p>")) is None
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.sessions import AssessmentSession, SessionStore, SQLiteSessionBackend
+
+
+def test_retried_answer_is_not_counted_twice():
+    session = AssessmentSession("s")
+    session.add_answer("q1", "visual", "basic", True, 0.9)
+    before = session.profile()
+    assert session.add_answer("q1", "visual", "basic", True, 0.9)
+    assert session.answers == 1
+    assert session.profile() == before
+
+
+def test_repeated_answer_replaces_the_earlier_one():
+    session = AssessmentSession("s")
+    session.add_answer("q1", "visual", "basic", False, 1.0)
+    session.add_answer("q2", "visual", "basic", True, 1.0)
+    session.add_answer("q1", "visual", "basic", True, 0.5)
+    assert session.answers == 2
+    assert session.profile()["visual"] == 10.0
+    assert session.profile()["confidence"] == 0.75
+
+
+def test_replacing_survives_the_shared_backend(tmp_path):
+    async def run():
+        store = SessionStore(10, 60, SQLiteSessionBackend(str(tmp_path / "sessions.sqlite3"), 60))
+        session = await store.acreate()
+        for is_correct in (False, True):
+            session = await store.aadd_answer(
+                session.session_id, "q1", "auditory", "advanced", {"is_correct": is_correct, "confidence": 1.0}
+            )
+        return session, store.stats()
+
+    session, stats = asyncio.run(run())
+    assert session.answers == 1
+    assert session.profile()["auditory"] == 10.0
+    assert stats["replaced"] == 1
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"is_correct": True}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", compute) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert results == [{"is_correct": True}] * 10
+    assert flight.stats()["collapsed"] == 9
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_keys_do_not_share():
+    flight = SingleFlight()
+
+    async def run():
+        return await asyncio.gather(flight.do("a", lambda: asyncio.sleep(0, "a")),
+                                    flight.do("b", lambda: asyncio.sleep(0, "b")))
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert flight.calls == 2
+
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        outcomes = await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+        retried = await flight.do("k", lambda: asyncio.sleep(0, "ok"))
+        return outcomes, retried
+
+    outcomes, retried = asyncio.run(run())
+    assert all(isinstance(o, RuntimeError) for o in outcomes)
+    assert retried == "ok"
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", lambda: asyncio.sleep(0.02, "done")))
+        second = asyncio.ensure_future(flight.do("k", lambda: asyncio.sleep(0.02, "unused")))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
@@ -0,0 +1,42 @@
+from app.models.index import QuestionModel
+from app.store import EvaluationStore, attributed
+
+QUESTION = QuestionModel(
+    dimension="auditory", level="advanced", type="text", prompt_html="<p>Name the interval.</p>",
+    response_type="text", response_text="a fifth"
+)
+
+
+def test_round_trip_through_a_wal_flush(tmp_path):
+    path = str(tmp_path / "evaluations.sqlite3")
+    store = EvaluationStore(path, batch_size=2, flush_seconds=0.01)
+    with attributed("cand-1", "sess-1"):
+        store.record("question", QUESTION, {"is_correct": True}, "v3", "gpt-4o-mini", "fp", "auditory", "advanced")
+    for i in range(3):
+        store.record("department", {"profile": i}, {"primary_department": "Design"}, "v1")
+    store.flush()
+
+    rows = list(EvaluationStore(path).iter_results())  # a fresh connection, as the export uses
+    assert [row["kind"] for row in rows] == ["question", "department", "department", "department"]
+    first = rows[0]
+    assert (first["candidate_id"], first["session_id"], first["fingerprint"]) == ("cand-1", "sess-1", "fp")
+    assert first["request"]["response_text"] == "a fifth" and first["result"] == {"is_correct": True}
+    assert store.stats()["written"] == 4 and store.stats()["batches"] >= 2
+    store.close()
+
+
+def test_filters_and_limit(tmp_path):
+    store = EvaluationStore(str(tmp_path / "evaluations.sqlite3"), flush_seconds=0.01)
+    for level in ("basic", "advanced", "advanced"):
+        store.record("question", {}, {}, dimension="visual", level=level)
+    store.close()
+
+    assert len(list(store.iter_results(level="advanced"))) == 2
+    assert len(list(store.iter_results(kind="question", limit=1))) == 1
+    assert list(store.iter_results(kind="department")) == []
+
+
+def test_without_a_path_nothing_is_recorded():
+    store = EvaluationStore("")
+    store.record("question", {}, {})
+    assert store.stats()["recorded"] == 0 and list(store.iter_results()) == []
@@ -0,0 +1,43 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.router.index import router
+from app.scheduler import PriorityScheduler
+from app.service import index as service
+from benchmarks.fake_llm import FakeChatModel
+
+QUESTION = {
+    "dimension": "visual", "level": "basic", "type": "text", "prompt_html": "<p>How many bars are shown?</p>",
+    "response_type": "text"
+}
+
+
+def post_stream(answer: str) -> httpx.Response:
+    app = FastAPI()
+    app.include_router(router, prefix="/api/py")
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/py/question/stream", json={"question": {**QUESTION, "response_text": answer}})
+
+    return asyncio.run(run())
+
+
+def test_shed_stream_returns_503(monkeypatch):
+    monkeypatch.setattr(service, "model", FakeChatModel(latency=0.0))
+    busy = PriorityScheduler(capacity=1, max_queue=0)
+    busy.active = 1  # every slot taken and no room to queue
+    monkeypatch.setattr(service, "scheduler", busy)
+    response = post_stream("four bars")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+def test_stream_ends_with_the_result(monkeypatch):
+    monkeypatch.setattr(service, "model", FakeChatModel(latency=0.0))
+    response = post_stream("two bars")
+    assert response.status_code == 200
+    assert response.text.splitlines()[-1].startswith('{"event": "result"')